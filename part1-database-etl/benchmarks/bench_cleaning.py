@@ -0,0 +1,89 @@
+"""
+Flexi Mart - cleaning kernel benchmark
+
+Checks the vectorized column kernels against the scalar helpers they replace
+(normalize_null / standardize_phone / standardize_category) on a generated dirty frame,
+then reports the speedup.
+
+Usage (from project root):
+    python part1-database-etl/benchmarks/bench_cleaning.py --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from etl_pipeline import (  # noqa: E402
+    STRING_DTYPE,
+    normalize_null,
+    normalize_nulls,
+    standardize_phone,
+    standardize_phones,
+    standardize_category,
+    standardize_categories,
+)
+
+PHONE_SAMPLES = [
+    "9876543210", "-9988776564", "+91 98765 43210", "919812345678", "98765-43210",
+    "9.87654321E9", "12345", "", "NULL", "  9123456789  ", "(91) 9000000001", None,
+]
+CATEGORY_SAMPLES = [
+    "Electronics", "electronics", "ELECTRONICS", "fashion", " Fashion ", "groceries",
+    "home & kitchen", "", "null", "None", None,
+]
+TEXT_SAMPLES = ["Rahul", "  Priya ", "nan", "NaN", "none", "", "NULL", "Mumbai", None]
+
+
+def generate_frame(rows: int, seed: int = 42) -> pd.DataFrame:
+    rnd = random.Random(seed)
+    return pd.DataFrame({
+        "city": [rnd.choice(TEXT_SAMPLES) for _ in range(rows)],
+        "phone": [rnd.choice(PHONE_SAMPLES) for _ in range(rows)],
+        "category": [rnd.choice(CATEGORY_SAMPLES) for _ in range(rows)],
+    }, dtype=str)
+
+
+def same_values(expected: pd.Series, actual: pd.Series) -> bool:
+    return expected.astype(object).where(expected.notna(), None).tolist() == actual.tolist()
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized cleaning kernels")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = generate_frame(args.rows)
+    print(f"rows={args.rows:,}  string dtype={STRING_DTYPE}")
+    print(f"{'kernel':<24}{'scalar (s)':>12}{'vector (s)':>12}{'speedup':>10}  equal")
+
+    cases = [
+        ("normalize_null", "city", normalize_null, normalize_nulls),
+        ("standardize_phone", "phone", standardize_phone, standardize_phones),
+        ("standardize_category", "category", standardize_category, standardize_categories),
+    ]
+    ok = True
+    for name, col, scalar_fn, vector_fn in cases:
+        expected, t_scalar = timed(df[col].apply, scalar_fn)
+        actual, t_vector = timed(vector_fn, df[col])
+        equal = same_values(expected, actual)
+        ok &= equal
+        print(f"{name:<24}{t_scalar:>12.3f}{t_vector:>12.3f}{t_scalar / t_vector:>9.1f}x  {equal}")
+
+    if not ok:
+        sys.exit("Vectorized kernels differ from the scalar helpers.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Flexi Mart - ETL benchmark harness
+
+Generates (or reuses) dirty raw CSVs at a given scale, runs every transform_* and load_* step of
+etl_pipeline.py against them, and records throughput (rows/sec) and memory (peak RSS growth during
+the step) per step. Results are written as JSON; with --baseline the run is compared against an
+earlier results file and regressions beyond --tolerance are flagged (exit code 1).
+
+Loads run against a local PostgreSQL in a dedicated schema (dropped and recreated each run).
+The loaders use COPY / ON CONFLICT, so there is no SQLite stand-in; without --db-url only the
+transforms are benchmarked.
+
+Usage (from project root):
+    python part1-database-etl/benchmarks/bench_etl.py --sales 1000000 \
+        --db-url postgresql+psycopg2://postgres:<PASSWORD>@localhost:5432/fleximart_bench \
+        --output bench_1m.json [--baseline bench_1m_main.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from etl_pipeline import (  # noqa: E402
+    get_engine,
+    load_customers_and_build_map,
+    load_orders_and_items,
+    load_products_and_build_map,
+    safe_read_csv,
+    transform_customers,
+    transform_products,
+    transform_sales_to_orders,
+)
+from generate_data import generate  # noqa: E402
+
+BENCH_SCHEMA_DDL = """
+DROP SCHEMA IF EXISTS {schema} CASCADE;
+CREATE SCHEMA {schema};
+
+CREATE TABLE customers (
+    customer_id INT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL,
+    phone VARCHAR(20),
+    city VARCHAR(50),
+    registration_date DATE
+);
+
+CREATE TABLE products (
+    product_id INT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    product_name VARCHAR(100) NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    price DECIMAL(10,2) NOT NULL,
+    stock_quantity INT DEFAULT 0
+);
+
+CREATE TABLE orders (
+    order_id INT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    customer_id INT NOT NULL REFERENCES customers(customer_id),
+    order_date DATE NOT NULL,
+    total_amount DECIMAL(12,2) NOT NULL,
+    status VARCHAR(20) DEFAULT 'Pending'
+);
+
+CREATE TABLE order_items (
+    order_item_id INT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    order_id INT NOT NULL REFERENCES orders(order_id),
+    product_id INT NOT NULL REFERENCES products(product_id),
+    quantity INT NOT NULL,
+    unit_price DECIMAL(10,2) NOT NULL,
+    subtotal DECIMAL(12,2) NOT NULL
+);
+"""
+
+
+class RssSampler:
+    """Samples this process's RSS every interval seconds (Linux /proc) to get the peak during one step."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.start_mb: Optional[float] = None
+        self.peak_mb: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def rss_mb() -> Optional[float]:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, self.rss_mb())
+
+    def __enter__(self):
+        self.start_mb = self.peak_mb = self.rss_mb()
+        if self.start_mb is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.peak_mb = max(self.peak_mb, self.rss_mb())
+
+    @property
+    def growth_mb(self) -> Optional[float]:
+        return None if self.start_mb is None else self.peak_mb - self.start_mb
+
+
+def bench_step(results: Dict[str, dict], name: str, rows: int, fn: Callable, *args):
+    with RssSampler() as mem:
+        start = time.perf_counter()
+        out = fn(*args)
+        seconds = time.perf_counter() - start
+    results[name] = {
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_s": round(rows / seconds, 1) if seconds > 0 else None,
+        "peak_rss_growth_mb": round(mem.growth_mb, 1) if mem.growth_mb is not None else None,
+    }
+    rate = f"{rows / seconds:>14,.0f}" if seconds > 0 else f"{'-':>14}"
+    growth = f"{mem.growth_mb:>10.1f}" if mem.growth_mb is not None else f"{'n/a':>10}"
+    print(f"  {name:<24}{rows:>12,}{seconds:>10.3f}{rate}{growth}")
+    return out
+
+
+def run_benchmark(args, logger: logging.Logger) -> dict:
+    data_dir = args.data_dir
+    if not os.path.exists(os.path.join(data_dir, "sales_raw.csv")) or args.regenerate:
+        print(f"Generating data in {data_dir} ...")
+        generate(data_dir, args.customers, args.products, args.sales, args.seed)
+
+    customers_raw = safe_read_csv(os.path.join(data_dir, "customers_raw.csv"), logger)
+    products_raw = safe_read_csv(os.path.join(data_dir, "products_raw.csv"), logger)
+    sales_raw = safe_read_csv(os.path.join(data_dir, "sales_raw.csv"), logger)
+
+    steps: Dict[str, dict] = {}
+    print(f"  {'step':<24}{'rows':>12}{'seconds':>10}{'rows/s':>14}{'rss+MB':>10}")
+    customers_t, _, _ = bench_step(steps, "transform_customers", len(customers_raw), transform_customers, customers_raw, logger)
+    products_t, _, _ = bench_step(steps, "transform_products", len(products_raw), transform_products, products_raw, logger)
+
+    if args.db_url:
+        engine = get_engine_with_schema(args.db_url, args.schema)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(BENCH_SCHEMA_DDL.format(schema=args.schema))
+
+        customer_map = bench_step(steps, "load_customers", len(customers_t), load_customers_and_build_map,
+                                  engine, customers_t, logger, args.mode, args.batch_size)
+        product_map = bench_step(steps, "load_products", len(products_t), load_products_and_build_map,
+                                 engine, products_t, logger, args.mode, args.batch_size)
+    else:
+        # no DB: map source keys to fake sequential ids so the sales transform still runs end to end
+        customer_map = {k: i for i, k in enumerate(customers_t["customer_id"], start=1)}
+        product_map = {k: i for i, k in enumerate(products_t["product_id"], start=1)}
+
+    orders_t, items_t, _, _ = bench_step(steps, "transform_sales_to_orders", len(sales_raw), transform_sales_to_orders,
+                                         sales_raw, customer_map, product_map, logger)
+    if args.db_url:
+        bench_step(steps, "load_orders_and_items", len(orders_t) + len(items_t), load_orders_and_items,
+                   engine, orders_t, items_t, logger, args.mode, args.batch_size)
+
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "customers": args.customers, "products": args.products, "sales": args.sales,
+            "seed": args.seed, "mode": args.mode, "batch_size": args.batch_size, "db": bool(args.db_url),
+        },
+        "steps": steps,
+    }
+
+
+def get_engine_with_schema(db_url: str, schema: str):
+    """
+    Engine whose connections only see the benchmark schema (temp tables are unaffected).
+    search_path is a connection startup option, so no rollback can reset it to the real tables in public.
+    """
+    return get_engine(db_url, connect_args={"options": f"-csearch_path={schema}"})
+
+
+def compare_to_baseline(current: dict, baseline: dict, tolerance: float, min_mb: float = 5.0) -> bool:
+    """
+    Print a per-step comparison and return True if any step regressed:
+    throughput below (1 - tolerance) x baseline, or RSS growth above (1 + tolerance) x baseline (and > min_mb more).
+    """
+    if current["config"] != baseline.get("config"):
+        print(f"WARNING: config differs from baseline ({baseline.get('config')}); comparison may be meaningless.")
+
+    regressed = False
+    print(f"\n  {'step':<24}{'base rows/s':>14}{'rows/s':>14}{'ratio':>8}{'base MB':>9}{'MB':>9}  verdict")
+    for name, cur in current["steps"].items():
+        base = baseline.get("steps", {}).get(name)
+        if not base:
+            print(f"  {name:<24}{'(new step)':>14}")
+            continue
+        ratio = (cur["rows_per_s"] or 0) / base["rows_per_s"] if base.get("rows_per_s") else None
+        slow = ratio is not None and ratio < 1 - tolerance
+        cur_mb, base_mb = cur.get("peak_rss_growth_mb"), base.get("peak_rss_growth_mb")
+        fat = (cur_mb is not None and base_mb is not None
+               and cur_mb > base_mb * (1 + tolerance) and cur_mb - base_mb > min_mb)
+        verdict = "REGRESSION" + (" (throughput)" if slow else "") + (" (memory)" if fat else "") if slow or fat else "ok"
+        regressed |= slow or fat
+        print(f"  {name:<24}{base['rows_per_s'] or 0:>14,.0f}{cur['rows_per_s'] or 0:>14,.0f}"
+              f"{ratio if ratio is not None else 0:>8.2f}{base_mb if base_mb is not None else 0:>9.1f}"
+              f"{cur_mb if cur_mb is not None else 0:>9.1f}  {verdict}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark etl_pipeline transforms and loaders")
+    parser.add_argument("--sales", type=int, default=100_000, help="sales rows (10K .. 100M)")
+    parser.add_argument("--customers", type=int, help="default: sales / 10")
+    parser.add_argument("--products", type=int, help="default: sales / 100 (min 20)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", help="default: ./data/bench/<sales>")
+    parser.add_argument("--regenerate", action="store_true", help="regenerate CSVs even if present")
+    parser.add_argument("--db-url", default=os.getenv("BENCH_DB_URL", ""), help="PostgreSQL URL; loaders are skipped without it")
+    parser.add_argument("--schema", default="fleximart_bench", help="scratch schema (dropped and recreated)")
+    parser.add_argument("--mode", default="bulk", choices=["bulk", "row"])
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown / memory growth")
+    args = parser.parse_args()
+
+    args.customers = args.customers or max(args.sales // 10, 20)
+    args.products = args.products or max(args.sales // 100, 20)
+    args.data_dir = args.data_dir or os.path.join(".", "data", "bench", str(args.sales))
+
+    logger = logging.getLogger("fleximart_bench")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    print(f"Benchmark: {args.sales:,} sales / {args.customers:,} customers / {args.products:,} products "
+          f"(mode={args.mode}, db={'yes' if args.db_url else 'no'})")
+    results = run_benchmark(args, logger)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare_to_baseline(results, baseline, args.tolerance):
+            sys.exit("Performance regression against baseline.")
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Flexi Mart - sales frame memory report
+
+Reads a sales CSV in both frame modes (object: all Python str; compact: SALES_FRAME=compact),
+runs clean_sales and map_sales_to_orders on each and reports deep memory per row (per column and
+total) after every step, plus a check that both modes produce the same orders/items.
+
+Usage (from project root):
+    python part1-database-etl/benchmarks/bench_memory.py --sales 1000000 [--output bench_memory.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from etl_pipeline import (  # noqa: E402
+    SALES_CATEGORICAL_COLUMNS,
+    clean_sales,
+    frame_bytes_per_row,
+    map_sales_to_orders,
+    safe_read_csv,
+)
+from generate_data import generate  # noqa: E402
+
+
+def run_mode(sales_path: str, categorical, customer_map, product_map, logger: logging.Logger) -> dict:
+    start = time.perf_counter()
+    raw = safe_read_csv(sales_path, logger, categorical=categorical)
+    clean, _, _ = clean_sales(raw, logger)
+    orders, items, _ = map_sales_to_orders(clean, customer_map, product_map, logger)
+    return {
+        "seconds": round(time.perf_counter() - start, 3),
+        "bytes_per_row": {
+            "read": frame_bytes_per_row(raw),
+            "clean": frame_bytes_per_row(clean),
+            "items": frame_bytes_per_row(items),
+            "orders": frame_bytes_per_row(orders),
+        },
+        "frames": (orders, items),
+    }
+
+
+def same_output(a: tuple, b: tuple) -> bool:
+    """Orders/items equal after normalizing dtypes (compact frames use int32/categorical/datetime64)."""
+    def norm(df: pd.DataFrame) -> pd.DataFrame:
+        out = df.astype({c: str for c in df.columns if c in ("order_date", "status", "transaction_id")})
+        out = out.astype({c: "int64" for c in out.columns if c in ("customer_id", "product_id", "quantity")})
+        return out.sort_values(list(out.columns)).reset_index(drop=True)
+    return all(norm(x).equals(norm(y)) for x, y in zip(a, b))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per row of the sales frames, object vs compact")
+    parser.add_argument("--sales", type=int, default=1_000_000, help="sales rows")
+    parser.add_argument("--customers", type=int, help="default: sales / 10")
+    parser.add_argument("--products", type=int, help="default: sales / 100 (min 20)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", help="default: ./data/bench/<sales>")
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    args.customers = args.customers or max(args.sales // 10, 20)
+    args.products = args.products or max(args.sales // 100, 20)
+    args.data_dir = args.data_dir or os.path.join(".", "data", "bench", str(args.sales))
+    sales_path = os.path.join(args.data_dir, "sales_raw.csv")
+    if not os.path.exists(sales_path):
+        print(f"Generating data in {args.data_dir} ...")
+        generate(args.data_dir, args.customers, args.products, args.sales, args.seed)
+
+    logger = logging.getLogger("fleximart_bench")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    # map every source key to a fake sequential id, as bench_etl.py does without a DB
+    keys = safe_read_csv(sales_path, logger, categorical=("customer_id", "product_id"))
+    customer_map = {k: i for i, k in enumerate(keys["customer_id"].cat.categories, start=1)}
+    product_map = {k: i for i, k in enumerate(keys["product_id"].cat.categories, start=1)}
+    del keys
+
+    report = {}
+    for mode, categorical in (("object", ()), ("compact", SALES_CATEGORICAL_COLUMNS)):
+        report[mode] = run_mode(sales_path, categorical, customer_map, product_map, logger)
+
+    print(f"  {'step':<10}{'object B/row':>14}{'compact B/row':>15}{'ratio':>8}")
+    for step in ("read", "clean", "items", "orders"):
+        before = report["object"]["bytes_per_row"][step]["total"]
+        after = report["compact"]["bytes_per_row"][step]["total"]
+        print(f"  {step:<10}{before:>14,.1f}{after:>15,.1f}{before / after if after else 0:>7.1f}x")
+    print(f"  time: object {report['object']['seconds']:.2f}s, compact {report['compact']['seconds']:.2f}s")
+
+    identical = same_output(report["object"].pop("frames"), report["compact"].pop("frames"))
+    print(f"  same orders/items: {'yes' if identical else 'NO'}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "same_output": identical, **report}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if not identical:
+        sys.exit("Compact and object frames produced different orders/items.")
+
+
+if __name__ == "__main__":
+    main()
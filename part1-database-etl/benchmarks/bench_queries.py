@@ -0,0 +1,168 @@
+"""
+Flexi Mart - business query plan check
+
+Loads a generated dataset into a scratch PostgreSQL schema (the schema from schema_documentation.md,
+primary keys only), runs every query in business_queries.sql under EXPLAIN (ANALYZE, BUFFERS), applies
+migrations/*.sql in file order, runs the queries again and reports per query: planner cost, median
+execution time over --repeat runs, and the indexes the plan used. Results are written as JSON.
+
+Usage (from project root):
+    python part1-database-etl/benchmarks/bench_queries.py --sales 1000000 \
+        --db-url postgresql+psycopg2://postgres:<PASSWORD>@localhost:5432/fleximart_bench \
+        --output bench_queries_1m.json
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import statistics
+import sys
+from datetime import datetime
+from typing import Dict, List, Set
+
+from sqlalchemy.engine import Engine
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_etl import BENCH_SCHEMA_DDL, get_engine_with_schema  # noqa: E402
+from etl_pipeline import (  # noqa: E402
+    load_customers_and_build_map,
+    load_orders_and_items,
+    load_products_and_build_map,
+    safe_read_csv,
+    transform_customers,
+    transform_products,
+    transform_sales_to_orders,
+)
+from generate_data import generate  # noqa: E402
+
+PART1_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+VACUUM_TABLES = "VACUUM ANALYZE customers, products, orders, order_items"
+
+
+def sql_statements(path: str) -> List[str]:
+    """Statements of a .sql file: -- comments stripped, split on ';' (no ';' inside literals in these files)."""
+    with open(path, encoding="utf-8") as f:
+        body = "\n".join(line.split("--", 1)[0] for line in f)
+    return [s.strip() for s in body.split(";") if s.strip()]
+
+
+def load_dataset(engine: Engine, data_dir: str, logger: logging.Logger, batch_size: int):
+    customers = transform_customers(safe_read_csv(os.path.join(data_dir, "customers_raw.csv"), logger), logger)[0]
+    products = transform_products(safe_read_csv(os.path.join(data_dir, "products_raw.csv"), logger), logger)[0]
+    customer_map = load_customers_and_build_map(engine, customers, logger, "bulk", batch_size)
+    product_map = load_products_and_build_map(engine, products, logger, "bulk", batch_size)
+    sales = safe_read_csv(os.path.join(data_dir, "sales_raw.csv"), logger)
+    orders, items, _, _ = transform_sales_to_orders(sales, customer_map, product_map, logger)
+    load_orders_and_items(engine, orders, items, logger, "bulk", batch_size)
+
+
+def plan_indexes(node: dict) -> Set[str]:
+    found = {node["Index Name"]} if "Index Name" in node else set()
+    for child in node.get("Plans", []):
+        found |= plan_indexes(child)
+    return found
+
+
+def explain_queries(engine: Engine, queries: List[str], repeat: int) -> Dict[str, dict]:
+    """EXPLAIN ANALYZE each query repeat times (after one warm-up run); median execution time."""
+    results = {}
+    with engine.connect() as conn:
+        for i, query in enumerate(queries, start=1):
+            conn.exec_driver_sql(query).fetchall()
+            runs = [conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}").scalar()[0]
+                    for _ in range(repeat)]
+            results[f"query_{i}"] = {
+                "total_cost": runs[0]["Plan"]["Total Cost"],
+                "execution_ms": round(statistics.median(r["Execution Time"] for r in runs), 3),
+                "indexes": sorted(plan_indexes(runs[0]["Plan"])),
+            }
+    return results
+
+
+def apply_migrations(engine: Engine, paths: List[str]):
+    """Run the DDL of each migration (the SELECT pre-checks are skipped) outside a transaction, as psql would."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for path in paths:
+            for stmt in sql_statements(path):
+                if not stmt.upper().startswith("SELECT"):
+                    conn.exec_driver_sql(stmt)
+            print(f"  applied {os.path.basename(path)}")
+
+
+def print_comparison(before: Dict[str, dict], after: Dict[str, dict]):
+    print(f"\n  {'query':<10}{'cost before':>14}{'cost after':>14}{'ms before':>12}{'ms after':>12}{'speedup':>9}  indexes used")
+    for name, b in before.items():
+        a = after[name]
+        speedup = b["execution_ms"] / a["execution_ms"] if a["execution_ms"] else 0
+        print(f"  {name:<10}{b['total_cost']:>14,.0f}{a['total_cost']:>14,.0f}{b['execution_ms']:>12.1f}"
+              f"{a['execution_ms']:>12.1f}{speedup:>8.2f}x  {', '.join(a['indexes']) or '-'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE business_queries.sql before/after the index migrations")
+    parser.add_argument("--sales", type=int, default=1_000_000, help="sales rows")
+    parser.add_argument("--customers", type=int, help="default: sales / 10")
+    parser.add_argument("--products", type=int, help="default: sales / 100 (min 20)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", help="default: ./data/bench/<sales>")
+    parser.add_argument("--regenerate", action="store_true", help="regenerate CSVs even if present")
+    parser.add_argument("--db-url", default=os.getenv("BENCH_DB_URL", ""), help="PostgreSQL URL (required)")
+    parser.add_argument("--schema", default="fleximart_bench", help="scratch schema (dropped and recreated)")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3, help="EXPLAIN ANALYZE runs per query (median is reported)")
+    parser.add_argument("--queries", default=os.path.join(PART1_DIR, "business_queries.sql"))
+    parser.add_argument("--migrations", nargs="*", help="default: migrations/*.sql in file order")
+    parser.add_argument("--output", default="bench_queries.json")
+    args = parser.parse_args()
+
+    if not args.db_url:
+        parser.error("--db-url (or BENCH_DB_URL) is required")
+    args.customers = args.customers or max(args.sales // 10, 20)
+    args.products = args.products or max(args.sales // 100, 20)
+    args.data_dir = args.data_dir or os.path.join(".", "data", "bench", str(args.sales))
+    migrations = args.migrations or sorted(glob.glob(os.path.join(PART1_DIR, "migrations", "*.sql")))
+
+    logger = logging.getLogger("fleximart_bench")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    if not os.path.exists(os.path.join(args.data_dir, "sales_raw.csv")) or args.regenerate:
+        print(f"Generating data in {args.data_dir} ...")
+        generate(args.data_dir, args.customers, args.products, args.sales, args.seed)
+
+    engine = get_engine_with_schema(args.db_url, args.schema)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(BENCH_SCHEMA_DDL.format(schema=args.schema))
+    print(f"Loading {args.sales:,} sales into schema {args.schema} ...")
+    load_dataset(engine, args.data_dir, logger, args.batch_size)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql(VACUUM_TABLES)
+
+    queries = sql_statements(args.queries)
+    print("Before migrations ...")
+    before = explain_queries(engine, queries, args.repeat)
+    apply_migrations(engine, migrations)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql(VACUUM_TABLES)  # visibility map, so index-only scans skip the heap
+    print("After migrations ...")
+    after = explain_queries(engine, queries, args.repeat)
+    print_comparison(before, after)
+
+    results = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {"customers": args.customers, "products": args.products, "sales": args.sales,
+                   "seed": args.seed, "repeat": args.repeat,
+                   "migrations": [os.path.basename(p) for p in migrations]},
+        "before": before,
+        "after": after,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
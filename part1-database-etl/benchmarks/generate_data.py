@@ -0,0 +1,176 @@
+"""
+Flexi Mart - synthetic raw data generator
+
+Writes customers_raw.csv / products_raw.csv / sales_raw.csv with the same columns and the same
+kinds of dirt as data/raw/*.csv, at any scale (10K .. 100M sales rows):
+- mixed date formats (m/d/Y, dd/mm/Y, ISO), missing/NULL-like values
+- phones as negatives, floats in scientific notation, +91- prefixed, too short
+- mixed-case categories, missing prices / stock
+- duplicate customers (same email) and duplicate transaction_ids
+- sales pointing at missing or unknown customers/products, zero/negative quantities
+
+Rows are generated and appended chunk by chunk, so memory stays flat regardless of scale.
+
+Usage (from project root):
+    python part1-database-etl/benchmarks/generate_data.py --sales 1000000 --out data/bench
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+FIRST_NAMES = ["Rahul", "Priya", "Amit", "Sneha", "Vikram", "Anjali", "Ravi", "Pooja", "Karthik", "Deepa",
+               "Arjun", "Lakshmi", "Suresh", "Neha", "Manish", "Divya", "Rajesh", "Kavya", "Arun", "Swati"]
+LAST_NAMES = ["Sharma", "Patel", "Kumar", "Reddy", "Singh", "Mehta", "Verma", "Iyer", "Nair", "Gupta",
+              "Rao", "Krishnan", "Shah", "Joshi", "Menon", "Pillai", "Desai", "Bose", "Jain", "Kapoor"]
+DOMAINS = ["gmail.com", "yahoo.com", "outlook.com"]
+CITIES = ["Bangalore", "Mumbai", "Delhi", "Hyderabad", "Chennai", "Pune", "Kochi", "Ahmedabad", "Jaipur",
+          "Kolkata", "Indore", "Chandigarh", "Trivandrum", "Lucknow"]
+CATEGORIES = ["Electronics", "electronics", "ELECTRONICS", "Fashion", "fashion", "FASHION",
+              "Groceries", "groceries", "Home & Kitchen", "home & kitchen"]
+PRODUCT_WORDS = ["Samsung Galaxy", "Nike Running Shoes", "Apple MacBook", "Levi's Jeans", "Sony Headphones",
+                 "Organic Almonds", "HP Laptop", "Adidas T-Shirt", "Basmati Rice", "OnePlus Nord",
+                 "Dell Monitor", "Woodland Shoes", "Organic Honey", "Boat Earbuds", "Masoor Dal"]
+STATUSES = ["Completed", "Completed", "Completed", "Pending", "Cancelled"]
+
+DATE_START = np.datetime64("2022-01-01")
+DATE_DAYS = 3 * 365
+
+
+def source_keys(prefix: str, ids: np.ndarray, width: int) -> pd.Series:
+    return prefix + pd.Series(ids).astype(str).str.zfill(width)
+
+
+def dirty_dates(rng: np.random.Generator, n: int) -> pd.Series:
+    """60% m/d/Y (unpadded), 20% dd/mm/Y (padded), 20% ISO."""
+    d = pd.to_datetime(DATE_START + rng.integers(0, DATE_DAYS, n).astype("timedelta64[D]"))
+    y, m, day = d.year.astype(str), d.month.astype(str), d.day.astype(str)
+    mdy = pd.Series(m + "/" + day + "/" + y)
+    dmy = pd.Series(day.str.zfill(2) + "/" + m.str.zfill(2) + "/" + y)
+    iso = pd.Series(d.strftime("%Y-%m-%d"))
+    pick = rng.random(n)
+    return mdy.where(pick < 0.6, dmy.where(pick < 0.8, iso))
+
+
+def blank(rng: np.random.Generator, values: pd.Series, rate: float) -> pd.Series:
+    """Blank out ~rate of values (written as empty CSV fields)."""
+    return values.where(rng.random(len(values)) >= rate, "")
+
+
+def with_duplicates(rng: np.random.Generator, df: pd.DataFrame, rate: float) -> pd.DataFrame:
+    """Append ~rate extra copies of random rows (same keys), then shuffle them in."""
+    extra = df.sample(frac=rate, random_state=int(rng.integers(1 << 31)))
+    return pd.concat([df, extra]).sample(frac=1.0, random_state=int(rng.integers(1 << 31)))
+
+
+def customers_chunk(rng: np.random.Generator, start: int, n: int, width: int) -> pd.DataFrame:
+    ids = np.arange(start + 1, start + n + 1)
+    first = pd.Series(np.array(FIRST_NAMES)[rng.integers(0, len(FIRST_NAMES), n)])
+    last = pd.Series(np.array(LAST_NAMES)[rng.integers(0, len(LAST_NAMES), n)])
+    email = (first.str.lower() + "." + last.str.lower() + pd.Series(ids).astype(str) + "@"
+             + pd.Series(np.array(DOMAINS)[rng.integers(0, len(DOMAINS), n)]))
+
+    digits = pd.Series(rng.integers(9_000_000_000, 9_999_999_999, n)).astype(str)
+    pick = rng.random(n)
+    phone = digits.where(pick < 0.75, ("-" + digits).where(pick < 0.85, ("+91-" + digits).where(
+        pick < 0.92, ("9.1" + digits.str.slice(0, 4) + "E+11").where(pick < 0.97, digits.str.slice(0, 6)))))
+
+    df = pd.DataFrame({
+        "customer_id": source_keys("C", ids, width),
+        "first_name": first,
+        "last_name": last,
+        "email": blank(rng, email, 0.05),
+        "phone": blank(rng, phone, 0.02),
+        "city": blank(rng, pd.Series(np.array(CITIES)[rng.integers(0, len(CITIES), n)]), 0.03),
+        "registration_date": blank(rng, dirty_dates(rng, n), 0.02),
+    })
+    return with_duplicates(rng, df, 0.02)
+
+
+def products_chunk(rng: np.random.Generator, start: int, n: int, width: int) -> pd.DataFrame:
+    ids = np.arange(start + 1, start + n + 1)
+    names = pd.Series(np.array(PRODUCT_WORDS)[rng.integers(0, len(PRODUCT_WORDS), n)]) + " " + pd.Series(ids).astype(str)
+    price = pd.Series(np.round(rng.lognormal(7.5, 1.2, n))).astype(int).astype(str)
+    return pd.DataFrame({
+        "product_id": source_keys("P", ids, width),
+        "product_name": names,
+        "category": pd.Series(np.array(CATEGORIES)[rng.integers(0, len(CATEGORIES), n)]),
+        "price": blank(rng, price, 0.10),
+        "stock_quantity": blank(rng, pd.Series(rng.integers(0, 500, n)).astype(str), 0.05),
+    })
+
+
+def sales_chunk(rng: np.random.Generator, start: int, n: int, n_customers: int, n_products: int,
+                widths: tuple) -> pd.DataFrame:
+    tx_w, c_w, p_w = widths
+    ids = np.arange(start + 1, start + n + 1)
+    # ~1% point at keys that do not exist in the dimension files
+    cust = rng.integers(1, int(n_customers * 1.01) + 2, n)
+    prod = rng.integers(1, int(n_products * 1.01) + 2, n)
+    qty = rng.integers(1, 11, n)
+    qty = np.where(rng.random(n) < 0.02, rng.integers(-2, 1, n), qty)
+    df = pd.DataFrame({
+        "transaction_id": source_keys("T", ids, tx_w),
+        "customer_id": blank(rng, source_keys("C", cust, c_w), 0.03),
+        "product_id": blank(rng, source_keys("P", prod, p_w), 0.03),
+        "quantity": pd.Series(qty).astype(str),
+        "unit_price": blank(rng, pd.Series(np.round(rng.lognormal(7.5, 1.2, n), 2)).astype(str), 0.02),
+        "transaction_date": blank(rng, dirty_dates(rng, n), 0.01),
+        "status": blank(rng, pd.Series(np.array(STATUSES)[rng.integers(0, len(STATUSES), n)]), 0.05),
+    })
+    return with_duplicates(rng, df, 0.01)
+
+
+def write_chunked(path: str, total: int, chunk_rows: int, make_chunk) -> int:
+    written = 0
+    for i, start in enumerate(range(0, total, chunk_rows)):
+        df = make_chunk(start, min(chunk_rows, total - start))
+        df.to_csv(path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        written += len(df)
+    return written
+
+
+def generate(out_dir: str, customers: int, products: int, sales: int, seed: int = 42,
+             chunk_rows: int = 1_000_000) -> dict:
+    """Write the three raw CSVs into out_dir. Returns {file_name: rows_written}."""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    widths = (max(3, len(str(sales))), max(3, len(str(customers))), max(3, len(str(products))))
+
+    return {
+        "customers_raw.csv": write_chunked(
+            os.path.join(out_dir, "customers_raw.csv"), customers, chunk_rows,
+            lambda s, n: customers_chunk(rng, s, n, widths[1])),
+        "products_raw.csv": write_chunked(
+            os.path.join(out_dir, "products_raw.csv"), products, chunk_rows,
+            lambda s, n: products_chunk(rng, s, n, widths[2])),
+        "sales_raw.csv": write_chunked(
+            os.path.join(out_dir, "sales_raw.csv"), sales, chunk_rows,
+            lambda s, n: sales_chunk(rng, s, n, customers, products, widths)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate dirty Flexi Mart raw CSVs at scale")
+    parser.add_argument("--sales", type=int, default=100_000, help="sales rows (10K .. 100M)")
+    parser.add_argument("--customers", type=int, help="default: sales / 10")
+    parser.add_argument("--products", type=int, help="default: sales / 100 (min 20)")
+    parser.add_argument("--out", default="./data/bench")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    customers = args.customers or max(args.sales // 10, 20)
+    products = args.products or max(args.sales // 100, 20)
+    start = time.perf_counter()
+    rows = generate(args.out, customers, products, args.sales, args.seed, args.chunk_rows)
+    for name, n in rows.items():
+        print(f"{name:<20} {n:>12,} rows")
+    print(f"Generated in {time.perf_counter() - start:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
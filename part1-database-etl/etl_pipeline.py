@@ -12,19 +12,47 @@ Deliverables:
 - etl.log
 """
 
+import cProfile
+import gzip
+import hashlib
+import inspect
+import json
 import os
 import re
 import sys
+import threading
+import time
+import types
+import uuid
 import logging
-from dataclasses import dataclass
-from typing import Dict, Optional, Tuple, List
-
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Set, Tuple, List, Union
+
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.exc import SQLAlchemyError
 
+try:
+    import resource  # POSIX only: peak RSS per stage
+except ImportError:
+    resource = None
+
+try:
+    import pyarrow  # noqa: F401  (optional: Arrow-backed strings for the cleaning kernels)
+    import pyarrow.parquet as pq  # optional: transform cache files
+    STRING_DTYPE = pd.StringDtype("pyarrow")
+except ImportError:
+    pq = None
+    STRING_DTYPE = pd.StringDtype("python")
+
 
 # ---------------------------- Metrics ----------------------------
 
@@ -35,6 +63,10 @@ class DQMetrics:
     duplicates_removed: int = 0
     missing_values_handled: int = 0
     records_loaded_successfully: int = 0
+    records_skipped_unchanged: int = 0
+    values_imputed: Dict[str, int] = field(default_factory=dict)  # strategy -> values filled
+    rejects: Dict[str, int] = field(default_factory=dict)  # reason -> rows dropped (REJECTS_DIR runs)
+    reject_samples: Dict[str, List[dict]] = field(default_factory=dict)  # reason -> sampled rows
 
 
 # ---------------------------- Logging ----------------------------
@@ -57,6 +89,213 @@ def setup_logger(log_path: str) -> logging.Logger:
     return logger
 
 
+# ---------------------------- Instrumentation ----------------------------
+
+class SqlStats:
+    """
+    DB round trips and SQL time, attributed to the stage running when the statement executed.
+    Statements are counted via SQLAlchemy cursor events; COPY streams call record() directly.
+    """
+
+    def __init__(self):
+        self.current: Optional[str] = None
+        self.round_trips: Dict[str, int] = defaultdict(int)
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()  # sharded loads record from several threads
+
+    def attach(self, engine: Engine):
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("fleximart_query_start", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        self.record(time.perf_counter() - conn.info["fleximart_query_start"].pop())
+
+    def record(self, seconds: float):
+        key = self.current or "unscoped"
+        with self._lock:
+            self.round_trips[key] += 1
+            self.seconds[key] += seconds
+
+    @contextmanager
+    def scope(self, name: str):
+        previous, self.current = self.current, name
+        try:
+            yield
+        finally:
+            self.current = previous
+
+
+SQL_STATS = SqlStats()
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    High-water mark of this process's resident memory over its whole lifetime (None where the resource
+    module is unavailable). Not per stage: a stage run inline in the parent reports the parent's peak so far.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def count_rows(result: Any) -> int:
+    """Rows a stage produced: a DataFrame's length, the first DataFrame (or list of them) in a tuple, or a mapping's size."""
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, dict):
+        return len(result)
+    if isinstance(result, (list, tuple)):
+        for item in result:
+            if isinstance(item, pd.DataFrame):
+                return len(item)
+            if isinstance(item, list) and item and all(isinstance(x, pd.DataFrame) for x in item):
+                return sum(len(x) for x in item)
+    return 0
+
+def write_metrics_json(path: str, timings: List["StageTiming"], metrics: List[DQMetrics], logger: logging.Logger):
+    """Structured per-stage metrics (+ DQ counts and critical path) for dashboards / run comparisons."""
+    t0 = min((t.start for t in timings), default=0.0)
+    payload = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "total_seconds": round(max((t.end for t in timings), default=t0) - t0, 4),
+        "critical_path": [t.name for t in critical_path(timings)],
+        "stages": [
+            {
+                "name": t.name,
+                "start_offset_s": round(t.start - t0, 4),
+                "wall_s": round(t.seconds, 4),
+                "cpu_s": round(t.cpu, 4),
+                "rows": t.rows,
+                "rows_per_s": round(t.rows / t.seconds, 1) if t.seconds > 0 else None,
+                "process_peak_rss_mb": round(t.process_peak_rss_mb, 1) if t.process_peak_rss_mb is not None else None,
+                "sql_round_trips": t.sql_round_trips,
+                "sql_seconds": round(t.sql_seconds, 4),
+                "pid": t.pid,
+                "deps": list(t.deps),
+            }
+            for t in sorted(timings, key=lambda t: t.start)
+        ],
+        "data_quality": [asdict(m) for m in metrics],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    logger.info(f"Stage metrics written to: {path}")
+
+
+# ---------------------------- Data Quality Rejects ----------------------------
+
+class RejectStore:
+    """
+    Append-only store of rows dropped by the transforms, one directory per run:
+      <directory>/<run_id>/<source>-<pid>-<id>.jsonl.gz           one JSON object per rejected row
+                                                                  (its columns + _reason + _row = source row index)
+      <directory>/<run_id>/<source>-<pid>-<id>.summary.json       per-reason counts + reservoir samples
+    Only the configuration is pickled, so a store can be passed to worker processes; every
+    transform call opens its own RejectWriter (and part file) with writer().
+    Reason codes: missing_email, duplicate_email, missing_product_name, missing_price, duplicate_product_id,
+    missing_customer_id, missing_product_id, invalid_quantity, invalid_unit_price, missing_date,
+    unparseable_date, duplicate_transaction_id, unmapped_customer, unmapped_product.
+    """
+
+    def __init__(self, directory: str, run_id: str, buffer_rows: int = 10000, sample_size: int = 5):
+        self.run_dir = os.path.join(directory, run_id)
+        self.buffer_rows = max(int(buffer_rows), 1)
+        self.sample_size = sample_size
+
+    def writer(self, source: str) -> "RejectWriter":
+        return RejectWriter(self, source)
+
+    def summary(self) -> Dict[str, Dict[str, dict]]:
+        """source -> reason -> {"count": n, "samples": [...]}, merged over every part written in this run."""
+        parts: Dict[str, List[dict]] = defaultdict(list)
+        if os.path.isdir(self.run_dir):
+            for name in sorted(os.listdir(self.run_dir)):
+                if name.endswith(".summary.json"):
+                    with open(os.path.join(self.run_dir, name), encoding="utf-8") as f:
+                        part = json.load(f)
+                    parts[part["source"]].append(part["reasons"])
+        return {source: merge_reject_summaries(reasons, self.sample_size) for source, reasons in parts.items()}
+
+class RejectWriter:
+    """
+    Streams rejected rows of one source to a gzip JSONL part file, buffer_rows rows at a time
+    (each flush appends a gzip member), and keeps per-reason counts plus a reservoir sample
+    (Algorithm R) of sample_size rows per reason. close() flushes and writes the summary sidecar.
+    """
+
+    def __init__(self, store: RejectStore, source: str):
+        self.store = store
+        self.source = source
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.samples: Dict[str, List[dict]] = defaultdict(list)
+        self.buffer: List[dict] = []
+        self.path: Optional[str] = None
+        self.rng = np.random.default_rng()
+
+    def reject(self, rows: pd.DataFrame, reason: str):
+        for start in range(0, len(rows), self.store.buffer_rows):
+            chunk = rows.iloc[start:start + self.store.buffer_rows]
+            records = frame_records(chunk.assign(_reason=reason, _row=chunk.index))
+            self._sample(reason, records)
+            self.counts[reason] += len(records)
+            self.buffer.extend(records)
+            if len(self.buffer) >= self.store.buffer_rows:
+                self.flush()
+
+    def _sample(self, reason: str, records: List[dict]):
+        reservoir, k, seen = self.samples[reason], self.store.sample_size, self.counts[reason]
+        fill = max(min(k - len(reservoir), len(records)), 0)
+        reservoir.extend(records[:fill])
+        if fill < len(records):
+            # record i (0-based, overall position seen + i) replaces slot j if j = randint(0, seen + i) < k
+            positions = np.arange(fill, len(records))
+            slots = self.rng.integers(0, seen + positions + 1)
+            for i, j in zip(positions[slots < k], slots[slots < k]):
+                reservoir[j] = records[i]
+
+    def flush(self):
+        if not self.buffer:
+            return
+        if self.path is None:
+            os.makedirs(self.store.run_dir, exist_ok=True)
+            name = f"{os.path.splitext(self.source)[0]}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            self.path = os.path.join(self.store.run_dir, name + ".jsonl.gz")
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            f.writelines(json.dumps(r, default=str) + "\n" for r in self.buffer)
+        self.buffer = []
+
+    def summary(self) -> Dict[str, dict]:
+        return {reason: {"count": n, "samples": self.samples[reason]} for reason, n in self.counts.items()}
+
+    def close(self) -> Dict[str, dict]:
+        self.flush()
+        if self.path is not None:
+            with open(self.path[:-len(".jsonl.gz")] + ".summary.json", "w", encoding="utf-8") as f:
+                json.dump({"source": self.source, "reasons": self.summary()}, f, default=str)
+        return self.summary()
+
+def merge_reject_summaries(parts: List[Dict[str, dict]], sample_size: int) -> Dict[str, dict]:
+    """Add up counts; re-sample the reservoirs with each sample weighted by the rows it stands for."""
+    rng = np.random.default_rng()
+    merged: Dict[str, dict] = {}
+    for reason in sorted({r for part in parts for r in part}):
+        entries = [part[reason] for part in parts if reason in part]
+        pool = [s for e in entries for s in e["samples"]]
+        weights = np.array([e["count"] / len(e["samples"]) for e in entries for _ in e["samples"]], dtype=float)
+        k = min(sample_size, len(pool))
+        picked = rng.choice(len(pool), size=k, replace=False, p=weights / weights.sum()) if k else []
+        merged[reason] = {"count": sum(e["count"] for e in entries), "samples": [pool[i] for i in sorted(picked)]}
+    return merged
+
+def drop_rejected(df: pd.DataFrame, mask: pd.Series, reason: str, writer: Optional[RejectWriter]) -> pd.DataFrame:
+    """df without the rows in mask; those rows go to writer (when rejects are enabled) under reason."""
+    if writer is not None and mask.any():
+        writer.reject(df[mask], reason)
+    return df[~mask]
+
+
 # ---------------------------- Helpers ----------------------------
 
 NULL_LIKE = {"", "nan", "NaN", "none", "None", "null", "NULL"}
@@ -69,12 +308,101 @@ def normalize_null(x):
         return None
     return s
 
-def safe_read_csv(path: str, logger: logging.Logger) -> pd.DataFrame:
+def normalize_nulls(values: pd.Series) -> pd.Series:
+    """
+    Column version of normalize_null: strip, map NULL_LIKE/missing to None.
+    Runs on STRING_DTYPE (Arrow-backed when pyarrow is installed); returns object dtype with None
+    so downstream code and DB parameters see the same values as .apply(normalize_null).
+    Needs pandas 3 to pay off: read_csv(dtype=str) columns are then already Arrow strings, while on
+    pandas 2 the object -> Arrow -> object round trip costs more than the scalar loop.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return normalize_null_categories(values)
+    s = values.astype(STRING_DTYPE).str.strip()
+    s = s.mask(s.isin(NULL_LIKE))
+    return s.astype(object).where(s.notna(), None)
+
+def normalize_null_categories(values: pd.Series) -> pd.Series:
+    """
+    normalize_nulls for categorical columns (compact sales frames): normalizes each category once and
+    remaps the codes, so the column stays categorical. Categories that normalize alike are merged.
+    """
+    normalized = normalize_nulls(pd.Series(values.cat.categories, dtype=object))
+    new_codes, uniques = pd.factorize(normalized, use_na_sentinel=True)
+    codes = np.append(new_codes, -1)[values.cat.codes.to_numpy()]  # code -1 (missing) stays -1
+    return pd.Series(pd.Categorical.from_codes(codes, categories=uniques), index=values.index)
+
+def fill_missing(values: pd.Series, default: str) -> pd.Series:
+    """fillna that also works for categorical columns (adds default as a category if needed)."""
+    if isinstance(values.dtype, pd.CategoricalDtype) and default not in values.cat.categories:
+        values = values.cat.add_categories([default])
+    return values.fillna(default)
+
+def standardize_phones(values: pd.Series) -> pd.Series:
+    """
+    Column version of standardize_phone: 10 digits or 91 + 10 digits -> +91-XXXXXXXXXX, else unchanged.
+    """
+    s = values.astype(STRING_DTYPE).str.strip()
+    s = s.mask(s.isin(NULL_LIKE))
+    digits = s.str.replace(r"\D", "", regex=True)
+    n = digits.str.len()
+    out = s.copy()
+    ten = (n == 10).fillna(False).astype(bool)
+    intl = ((n == 12) & digits.str.startswith("91")).fillna(False).astype(bool)
+    out[ten] = "+91-" + digits[ten]
+    out[intl] = "+91-" + digits[intl].str.slice(2)
+    return out.astype(object).where(out.notna(), None)
+
+def standardize_categories(values: pd.Series) -> pd.Series:
+    """
+    Column version of standardize_category. Categories repeat heavily, so casing is done once per
+    distinct value (with Python str semantics, identical to the scalar function) and broadcast back.
+    """
+    codes, uniques = pd.factorize(normalize_nulls(values), use_na_sentinel=True)
+    cased = pd.Series(uniques, dtype=object).str.lower().str.title().to_numpy(dtype=object)
+    out = pd.Series("Unknown", index=values.index, dtype=object)
+    known = codes != -1
+    out[known] = cased.take(codes[known])
+    return out
+
+def safe_read_csv(
+    path: str,
+    logger: logging.Logger,
+    chunksize: Optional[int] = None,
+    categorical: Sequence[str] = ()
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """
+    Read a CSV as all-string columns. With chunksize, returns an iterator of DataFrames instead.
+    categorical: columns to read as pandas categoricals (dictionary-encoded: one copy of each distinct string).
+    """
     if not os.path.exists(path):
         raise FileNotFoundError(f"CSV not found: {path}")
-    logger.info(f"Reading CSV: {path}")
+    logger.info(f"Reading CSV: {path}" + (f" (chunks of {chunksize} rows)" if chunksize else ""))
     # Read everything as string to avoid phone becoming float/scientific notation
-    return pd.read_csv(path, dtype=str)
+    dtype = defaultdict(lambda: str, {c: "category" for c in categorical}) if categorical else str
+    return pd.read_csv(path, dtype=dtype, chunksize=chunksize)
+
+# Compact sales frames (SALES_FRAME=compact): repetitive columns are read as categoricals and stay compact
+# through clean_sales / map_sales_to_orders (int32 ids and quantities, datetime64 order_date).
+SALES_CATEGORICAL_COLUMNS = ("customer_id", "product_id", "transaction_date", "status")
+SALES_FRAME_MODES = ("object", "compact")
+
+def is_compact_sales_frame(df: pd.DataFrame) -> bool:
+    return isinstance(df["customer_id"].dtype, pd.CategoricalDtype)
+
+def compact_sales_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Cleaned sales -> compact dtypes: Arrow/categorical strings, datetime64 order_date."""
+    return df.assign(
+        transaction_id=df["transaction_id"].astype(STRING_DTYPE),
+        order_date=pd.to_datetime(df["order_date"], format="%Y-%m-%d"),
+        status=df["status"].astype("category"),
+    )
+
+def frame_bytes_per_row(df: pd.DataFrame) -> Dict[str, float]:
+    """Deep memory use per row, by column and in total (object columns include their Python strings)."""
+    usage = df.memory_usage(deep=True, index=False)
+    rows = max(len(df), 1)
+    return {**{c: round(b / rows, 1) for c, b in usage.items()}, "total": round(usage.sum() / rows, 1)}
 
 def standardize_phone(phone: Optional[str]) -> Optional[str]:
     """
@@ -135,18 +463,136 @@ def parse_date_to_yyyy_mm_dd(value: Optional[str]) -> Optional[str]:
 
     return None
 
-def get_engine(db_url: str) -> Engine:
-    return create_engine(db_url, pool_pre_ping=True)
+# Date classes the column parser handles with one vectorized pd.to_datetime(format=...) call each.
+# Anything else (2-digit years, month names, timestamps, ...) goes through the scalar heuristic.
+ISO_DATE_RE = r"^[1-9]\d{3}-\d{1,2}-\d{1,2}$"
+SLASH_DATE_RE = r"^\d{1,2}/\d{1,2}/[1-9]\d{3}$"
+
+@lru_cache(maxsize=100_000)
+def cached_parse_date(value: str) -> Optional[str]:
+    return parse_date_to_yyyy_mm_dd(value)
+
+def parse_dates_to_yyyy_mm_dd(values: pd.Series) -> pd.Series:
+    """
+    Column-level equivalent of values.apply(parse_date_to_yyyy_mm_dd).
+    - Factorizes first, so each distinct date string is parsed once (sales dates repeat heavily)
+    - ISO (YYYY-MM-DD) -> one pd.to_datetime(format="%Y-%m-%d")
+    - m/d/Y, then d/m/Y where m/d/Y is not a valid date -> same outcome as the
+      dayfirst heuristic (ambiguous values resolve month-first)
+    - Everything else -> scalar parse_date_to_yyyy_mm_dd, memoized across calls
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    raw = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    raw = raw.where(~raw.isin(NULL_LIKE))
+
+    parsed = pd.Series(pd.NaT, index=raw.index, dtype="datetime64[us]")
+
+    iso = raw.str.match(ISO_DATE_RE, na=False)
+    parsed[iso] = pd.to_datetime(raw[iso], format="%Y-%m-%d", errors="coerce")
+
+    slash = raw.str.match(SLASH_DATE_RE, na=False)
+    parsed[slash] = pd.to_datetime(raw[slash], format="%m/%d/%Y", errors="coerce")
+    day_first = slash & parsed.isna()
+    parsed[day_first] = pd.to_datetime(raw[day_first], format="%d/%m/%Y", errors="coerce")
+
+    out = parsed.dt.strftime("%Y-%m-%d").astype(object)
+    out = out.where(parsed.notna(), None)
+
+    other = raw.notna() & ~iso & ~slash
+    out[other] = [cached_parse_date(v) for v in raw[other]]
+
+    result = out.to_numpy(dtype=object).take(codes)
+    result[codes == -1] = None
+    return pd.Series(result, index=values.index, dtype=object)
+
+def get_engine(db_url: str, pool_size: int = 5, connect_args: Optional[dict] = None) -> Engine:
+    """
+    pool_size: connections kept open; size it to the number of concurrent loaders (LOAD_WORKERS).
+    connect_args: passed to the DBAPI connect (e.g. {"options": "-csearch_path=..."}).
+    """
+    engine = create_engine(db_url, pool_pre_ping=True, pool_size=pool_size, max_overflow=2,
+                           connect_args=connect_args or {})
+    SQL_STATS.attach(engine)
+    return engine
+
+def transaction(bind: Union[Engine, Connection]):
+    """
+    Engine -> new transaction (engine.begin()).
+    Connection -> the caller's already-open transaction, so several loads can commit atomically.
+    """
+    if isinstance(bind, Engine):
+        return bind.begin()
+    return nullcontext(bind)
+
+LOAD_MODES = ("bulk", "row")
+
+class FrameCsvStream:
+    """
+    Read-only file-like object that renders a DataFrame as CSV, batch_size rows at a time.
+    Lets a single COPY FROM STDIN stream an arbitrarily large frame with bounded buffering.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: List[str], batch_size: int = 10000):
+        self._df = df[columns]
+        self._batch_size = max(int(batch_size), 1)
+        self._next_row = 0
+        self._buf = ""
+
+    def _fill(self):
+        start = self._next_row
+        self._next_row += self._batch_size
+        self._buf += self._df.iloc[start:self._next_row].to_csv(header=False, index=False)
+
+    def read(self, size: int = -1) -> str:
+        while (size < 0 or len(self._buf) < size) and self._next_row < len(self._df):
+            self._fill()
+        if size < 0:
+            size = len(self._buf)
+        out, self._buf = self._buf[:size], self._buf[size:]
+        return out
+
+    readline = read
+
+
+def copy_frame_to_table(conn, df: pd.DataFrame, table: str, columns: List[str], batch_size: int = 10000) -> int:
+    """
+    Stream a DataFrame into a table with one COPY FROM STDIN (CSV), rendered batch_size rows at a time.
+    Uses the raw psycopg2 cursor of the SQLAlchemy connection, so it joins the open transaction.
+    None/NaN are written as empty unquoted fields, which COPY reads as NULL.
+    """
+    if df.empty:
+        return 0
+    cur = conn.connection.cursor()
+    start = time.perf_counter()
+    try:
+        cur.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            FrameCsvStream(df, columns, batch_size),
+            size=1 << 16
+        )
+    finally:
+        cur.close()
+        SQL_STATS.record(time.perf_counter() - start)
+    return len(df)
 
 def ensure_cols(df: pd.DataFrame, required: List[str], name: str):
     missing = [c for c in required if c not in df.columns]
     if missing:
         raise ValueError(f"{name} missing required columns {missing}. Found: {list(df.columns)}")
 
+def frame_records(df: pd.DataFrame) -> List[dict]:
+    """Rows as dicts of Python objects, None for missing (iterrows would turn None into NaN in str columns)."""
+    df = df.astype(object)
+    return df.where(df.notna(), None).to_dict("records")
+
 
 # ---------------------------- Transform: Customers ----------------------------
 
-def transform_customers(df: pd.DataFrame, logger: logging.Logger) -> Tuple[pd.DataFrame, int, int]:
+def transform_customers(
+    df: pd.DataFrame,
+    logger: logging.Logger,
+    rejects: Optional[RejectStore] = None
+) -> Tuple[pd.DataFrame, int, int]:
     """
     Input columns (your file): customer_id, first_name, last_name, email, phone, city, registration_date
     - Drop missing email (NOT NULL + UNIQUE)
@@ -154,31 +600,33 @@ def transform_customers(df: pd.DataFrame, logger: logging.Logger) -> Tuple[pd.Da
     - Standardize phone
     - Standardize registration_date
     Keep source_customer_key = raw customer_id like C001 for mapping later (not loaded to DB).
+    rejects: dropped rows are streamed there (missing_email / duplicate_email).
     """
     df = df.copy()
     missing_handled = 0
+    writer = rejects.writer("customers_raw.csv") if rejects is not None else None
 
     ensure_cols(df, ["customer_id", "first_name", "last_name", "email"], "customers_raw.csv")
 
     # normalize
     for c in ["customer_id", "first_name", "last_name", "email", "phone", "city", "registration_date"]:
-        df[c] = df[c].apply(normalize_null)
+        df[c] = normalize_nulls(df[c])
 
     # drop missing email
     before = len(df)
-    df = df.dropna(subset=["email"])
+    df = drop_rejected(df, df["email"].isna(), "missing_email", writer)
     dropped = before - len(df)
     missing_handled += dropped
     if dropped:
         logger.info(f"Customers: dropped {dropped} rows due to missing email.")
 
     # standardize phone/date
-    df["phone"] = df["phone"].apply(standardize_phone)
-    df["registration_date"] = df["registration_date"].apply(parse_date_to_yyyy_mm_dd)
+    df["phone"] = standardize_phones(df["phone"])
+    df["registration_date"] = parse_dates_to_yyyy_mm_dd(df["registration_date"])
 
     # remove duplicates by email
     before = len(df)
-    df = df.drop_duplicates(subset=["email"], keep="first")
+    df = drop_rejected(df, df.duplicated(subset=["email"], keep="first"), "duplicate_email", writer)
     dup_removed = before - len(df)
     if dup_removed:
         logger.info(f"Customers: removed {dup_removed} duplicate rows by email.")
@@ -194,37 +642,137 @@ def transform_customers(df: pd.DataFrame, logger: logging.Logger) -> Tuple[pd.Da
         "registration_date"
     ]].copy()
 
+    if writer is not None:
+        writer.close()
     return out, dup_removed, missing_handled
 
 
+# ---------------------------- Price imputation ----------------------------
+
+# A price imputer takes the products frame (observed prices, NaN where missing) and returns a fill value
+# per row (NaN where it has none). transform_products applies them in order to the prices still missing.
+PriceImputer = Callable[[pd.DataFrame], pd.Series]
+
+def category_median(df: pd.DataFrame) -> pd.Series:
+    """Median price of the row's category (one groupby, broadcast back with map)."""
+    return df["category"].map(df.groupby("category", sort=False)["price"].median())
+
+def subcategory_median(df: pd.DataFrame) -> pd.Series:
+    """Median price of the row's (category, subcategory); no fills if the file has no subcategory column."""
+    if "subcategory" not in df.columns:
+        return pd.Series(float("nan"), index=df.index)
+    medians = df.groupby(["category", "subcategory"], sort=False)["price"].median()
+    return pd.Series(medians.reindex(pd.MultiIndex.from_frame(df[["category", "subcategory"]])).to_numpy(), index=df.index)
+
+def global_median(df: pd.DataFrame) -> pd.Series:
+    return pd.Series(df["price"].median(), index=df.index)
+
+class LastKnownPrice:
+    """Price already stored for the same (product_name, category) in the products table (see fetch_last_known_prices)."""
+    __name__ = "last_known_price"
+
+    def __init__(self, prices: Dict[Tuple[str, str], float]):
+        self.prices = prices
+
+    def __call__(self, df: pd.DataFrame) -> pd.Series:
+        known = pd.Series(self.prices, dtype=float)
+        if known.empty:
+            return pd.Series(float("nan"), index=df.index)
+        keys = pd.MultiIndex.from_arrays([df["product_name"], df["category"]])
+        return pd.Series(known.reindex(keys).to_numpy(), index=df.index)
+
+    def fingerprint(self) -> str:
+        return self.__name__ + ":" + hashlib.sha256(repr(sorted(self.prices.items())).encode()).hexdigest()
+
+PRICE_IMPUTERS = {"category_median": category_median, "subcategory_median": subcategory_median, "global_median": global_median}
+
+def default_price_imputers() -> List[PriceImputer]:
+    return [category_median, global_median]
+
+def fetch_last_known_prices(engine: Union[Engine, Connection]) -> Dict[Tuple[str, str], float]:
+    with transaction(engine) as conn:
+        rows = conn.execute(text("""
+            SELECT DISTINCT ON (product_name, category) product_name, category, price
+            FROM products
+            ORDER BY product_name, category, product_id;
+        """))
+        return {(name, cat): float(price) for name, cat, price in rows}
+
+def parse_price_imputers(spec: str, engine: Optional[Union[Engine, Connection]] = None) -> List[PriceImputer]:
+    """Comma-separated strategy names (PRICE_IMPUTERS keys or last_known_price, which needs engine)."""
+    imputers: List[PriceImputer] = []
+    for name in (n.strip() for n in spec.split(",") if n.strip()):
+        if name == "last_known_price":
+            if engine is None:
+                raise ValueError("last_known_price imputation needs a database connection")
+            imputers.append(LastKnownPrice(fetch_last_known_prices(engine)))
+        elif name in PRICE_IMPUTERS:
+            imputers.append(PRICE_IMPUTERS[name])
+        else:
+            raise ValueError(f"Unknown price imputation strategy {name!r}. Expected one of "
+                             f"{sorted(PRICE_IMPUTERS) + ['last_known_price']}")
+    return imputers
+
+def imputers_fingerprint(imputers: Sequence[PriceImputer]) -> str:
+    """Identifies a strategy list for the transform cache: code version of each function, data of LastKnownPrice."""
+    return "|".join(i.fingerprint() if hasattr(i, "fingerprint") else transform_version(i) for i in imputers)
+
+def impute_prices(df: pd.DataFrame, imputers: Sequence[PriceImputer]) -> Tuple[pd.Series, Dict[str, int]]:
+    """
+    Fill missing df["price"] with each imputer in turn (later ones only see what earlier ones left missing).
+    Every imputer computes its fills from the observed prices, never from other imputers' fills.
+    Returns (filled prices, values filled per strategy).
+    """
+    price = df["price"]
+    filled: Dict[str, int] = {}
+    for imputer in imputers:
+        missing = price.isna()
+        if not missing.any():
+            filled[imputer.__name__] = 0
+            continue
+        fills = imputer(df)
+        use = missing & fills.notna()
+        filled[imputer.__name__] = int(use.sum())
+        price = price.mask(use, fills)
+    return price, filled
+
+
 # ---------------------------- Transform: Products ----------------------------
 
-def transform_products(df: pd.DataFrame, logger: logging.Logger) -> Tuple[pd.DataFrame, int, int]:
+def transform_products(
+    df: pd.DataFrame,
+    logger: logging.Logger,
+    imputers: Optional[Sequence[PriceImputer]] = None,
+    rejects: Optional[RejectStore] = None
+) -> Tuple[pd.DataFrame, int, int]:
     """
     Input columns (your file): product_id, product_name, category, price, stock_quantity
     - Standardize category
     - Fill missing stock_quantity with 0
-    - Fill missing price with category median then global median (then drop if still missing)
+    - Fill missing price with each imputer in turn (default: category median, then global median),
+      then drop if still missing; values filled per strategy are in out.attrs["price_imputed"]
     - Dedupe by product_id (source key)
+    rejects: dropped rows are streamed there (missing_product_name / missing_price / duplicate_product_id).
     """
     df = df.copy()
     missing_handled = 0
+    writer = rejects.writer("products_raw.csv") if rejects is not None else None
 
     ensure_cols(df, ["product_id", "product_name", "category", "price"], "products_raw.csv")
 
     for c in ["product_id", "product_name", "category", "price", "stock_quantity"]:
-        df[c] = df[c].apply(normalize_null)
+        df[c] = normalize_nulls(df[c])
 
     # drop missing product_name (NOT NULL)
     before = len(df)
-    df = df.dropna(subset=["product_name"])
+    df = drop_rejected(df, df["product_name"].isna(), "missing_product_name", writer)
     dropped = before - len(df)
     missing_handled += dropped
     if dropped:
         logger.info(f"Products: dropped {dropped} rows due to missing product_name.")
 
     # category standardize
-    df["category"] = df["category"].apply(standardize_category)
+    df["category"] = standardize_categories(df["category"])
 
     # stock fill
     df["stock_quantity"] = pd.to_numeric(df["stock_quantity"], errors="coerce").fillna(0).astype(int)
@@ -233,12 +781,12 @@ def transform_products(df: pd.DataFrame, logger: logging.Logger) -> Tuple[pd.Dat
     df["price"] = pd.to_numeric(df["price"], errors="coerce")
 
     # fill missing prices
-    global_median = df["price"].median()
-    df["price"] = df.groupby("category")["price"].transform(lambda s: s.fillna(s.median()))
-    df["price"] = df["price"].fillna(global_median)
+    df["price"], price_imputed = impute_prices(df, default_price_imputers() if imputers is None else imputers)
+    if any(price_imputed.values()):
+        logger.info(f"Products: imputed missing prices {price_imputed}.")
 
     before = len(df)
-    df = df.dropna(subset=["price"])
+    df = drop_rejected(df, df["price"].isna(), "missing_price", writer)
     dropped = before - len(df)
     missing_handled += dropped
     if dropped:
@@ -246,7 +794,7 @@ def transform_products(df: pd.DataFrame, logger: logging.Logger) -> Tuple[pd.Dat
 
     # remove duplicates by source product_id
     before = len(df)
-    df = df.drop_duplicates(subset=["product_id"], keep="first")
+    df = drop_rejected(df, df.duplicated(subset=["product_id"], keep="first"), "duplicate_product_id", writer)
     dup_removed = before - len(df)
     if dup_removed:
         logger.info(f"Products: removed {dup_removed} duplicate rows by product_id.")
@@ -258,22 +806,96 @@ def transform_products(df: pd.DataFrame, logger: logging.Logger) -> Tuple[pd.Dat
         "price",
         "stock_quantity"
     ]].copy()
+    out.attrs["price_imputed"] = price_imputed
 
+    if writer is not None:
+        writer.close()
     return out, dup_removed, missing_handled
 
 
 # ---------------------------- Load Customers / Products + Build Mapping ----------------------------
 
-def load_customers_and_build_map(engine: Engine, customers: pd.DataFrame, logger: logging.Logger) -> Dict[str, int]:
+def load_customers_and_build_map(
+    engine: Union[Engine, Connection],
+    customers: pd.DataFrame,
+    logger: logging.Logger,
+    mode: str = "bulk",
+    batch_size: int = 10000
+) -> Dict[str, int]:
     """
     Insert into customers WITHOUT customer_id (identity).
     Use email (unique) for upsert to support reruns.
     Build mapping: source_customer_key(C001) -> db_customer_id(1)
+
+    mode="bulk": COPY the frame into a temp staging table (batch_size rows per COPY),
+                 then one set-based INSERT ... SELECT ... ON CONFLICT (email) ... RETURNING.
+    mode="row":  original one-statement-per-row upsert (fallback).
     """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode {mode!r}. Expected one of {LOAD_MODES}")
+    if mode == "row":
+        return load_customers_rowwise(engine, customers, logger)
+
     mapping: Dict[str, int] = {}
+    if customers.empty:
+        logger.info("Loaded/merged customers: 0")
+        return mapping
+
+    stage = customers.reset_index(drop=True)
+    stage.insert(0, "seq", range(len(stage)))
+
+    with transaction(engine) as conn:
+        conn.execute(text("""
+            CREATE TEMP TABLE stg_customers (
+                seq               BIGINT,
+                source_key        TEXT,
+                first_name        TEXT,
+                last_name         TEXT,
+                email             TEXT,
+                phone             TEXT,
+                city              TEXT,
+                registration_date DATE
+            ) ON COMMIT DROP;
+        """))
+        copy_frame_to_table(
+            conn,
+            stage.rename(columns={"customer_id": "source_key"}),
+            "stg_customers",
+            ["seq", "source_key", "first_name", "last_name", "email", "phone", "city", "registration_date"],
+            batch_size
+        )
+
+        # ORDER BY seq keeps identity values in file order, same as the row-by-row path
+        rows = conn.execute(text("""
+            INSERT INTO customers (first_name, last_name, email, phone, city, registration_date)
+            SELECT first_name, last_name, email, phone, city, registration_date
+            FROM stg_customers
+            ORDER BY seq
+            ON CONFLICT (email) DO UPDATE SET
+                first_name = EXCLUDED.first_name,
+                last_name  = EXCLUDED.last_name,
+                phone      = EXCLUDED.phone,
+                city       = EXCLUDED.city,
+                registration_date = EXCLUDED.registration_date
+            RETURNING customer_id, email;
+        """)).fetchall()
+
+    id_by_email = {email: int(customer_id) for customer_id, email in rows}
+    for source_key, email in zip(stage["customer_id"], stage["email"]):
+        mapping[str(source_key)] = id_by_email[email]
+
+    logger.info(f"Loaded/merged customers: {len(mapping)} (bulk, batch_size={batch_size})")
+    return mapping
 
-    with engine.begin() as conn:
-        for _, r in customers.iterrows():
+
+def load_customers_rowwise(engine: Union[Engine, Connection], customers: pd.DataFrame, logger: logging.Logger) -> Dict[str, int]:
+    """
+    Row-by-row fallback: one INSERT ... ON CONFLICT (email) ... RETURNING per customer.
+    """
+    mapping: Dict[str, int] = {}
+
+    with transaction(engine) as conn:
+        for r in frame_records(customers):
             source_key = r["customer_id"]
             payload = {
                 "first_name": r["first_name"],
@@ -303,19 +925,125 @@ def load_customers_and_build_map(engine: Engine, customers: pd.DataFrame, logger
     return mapping
 
 
-def load_products_and_build_map(engine: Engine, products: pd.DataFrame, logger: logging.Logger) -> Dict[str, int]:
+def load_products_and_build_map(
+    engine: Union[Engine, Connection],
+    products: pd.DataFrame,
+    logger: logging.Logger,
+    mode: str = "bulk",
+    batch_size: int = 10000
+) -> Dict[str, int]:
     """
     Insert into products WITHOUT product_id (identity).
-    No unique constraint exists, so we do:
-    - Check if product already exists by (product_name, category)
+    Products are matched on (product_name, category):
     - If exists: update price/stock and reuse id
     - Else: insert and RETURNING product_id
     Build mapping: source_product_key(P001) -> db_product_id(1)
+
+    mode="bulk": merge engine - read all existing (product_name, category) -> product_id pairs
+                 in one query, split inserts/updates in memory, COPY both into a staging table,
+                 then one UPDATE ... FROM and one INSERT ... SELECT ... RETURNING.
+                 Uses ON CONFLICT when migrations/001_products_name_category_unique.sql is applied.
+    mode="row":  original SELECT + UPDATE/INSERT per row (fallback).
     """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode {mode!r}. Expected one of {LOAD_MODES}")
+    if mode == "row":
+        return load_products_rowwise(engine, products, logger)
+
     mapping: Dict[str, int] = {}
+    if products.empty:
+        logger.info("Loaded/merged products: 0")
+        return mapping
+
+    df = products.reset_index(drop=True)
+    keys = list(zip(df["product_name"], df["category"]))
+
+    with transaction(engine) as conn:
+        existing: Dict[Tuple[str, str], int] = {
+            (name, cat): int(pid)
+            for name, cat, pid in conn.execute(text("""
+                SELECT product_name, category, MIN(product_id)
+                FROM products
+                GROUP BY product_name, category;
+            """))
+        }
+        has_unique_key = conn.execute(text("""
+            SELECT EXISTS (
+                SELECT 1 FROM pg_indexes
+                WHERE schemaname = current_schema()
+                  AND tablename = 'products' AND indexname = 'uq_products_name_category'
+            );
+        """)).scalar()
+
+        # One staging row per (product_name, category): first occurrence fixes the insert order,
+        # last occurrence wins for price/stock (same end state as the row-by-row path).
+        stage = df.assign(seq=range(len(df)))
+        first_seq = stage.groupby(["product_name", "category"], sort=False)["seq"].transform("min")
+        stage = stage.assign(seq=first_seq).drop_duplicates(subset=["product_name", "category"], keep="last")
+        stage["existing_id"] = [existing.get(k) for k in zip(stage["product_name"], stage["category"])]
+        stage["existing_id"] = stage["existing_id"].astype("Int64")
+        stage["stock_quantity"] = stage["stock_quantity"].astype(int)
+
+        conn.execute(text("""
+            CREATE TEMP TABLE stg_products (
+                seq            BIGINT,
+                existing_id    INT,
+                product_name   TEXT,
+                category       TEXT,
+                price          NUMERIC(10,2),
+                stock_quantity INT
+            ) ON COMMIT DROP;
+        """))
+        copy_frame_to_table(
+            conn, stage, "stg_products",
+            ["seq", "existing_id", "product_name", "category", "price", "stock_quantity"],
+            batch_size
+        )
+
+        updated = conn.execute(text("""
+            UPDATE products p
+            SET price = s.price,
+                stock_quantity = s.stock_quantity
+            FROM stg_products s
+            WHERE s.existing_id IS NOT NULL
+              AND p.product_id = s.existing_id;
+        """)).rowcount
+
+        on_conflict = """
+            ON CONFLICT (product_name, category) DO UPDATE SET
+                price = EXCLUDED.price,
+                stock_quantity = EXCLUDED.stock_quantity
+        """ if has_unique_key else ""
+        inserted = conn.execute(text(f"""
+            INSERT INTO products (product_name, category, price, stock_quantity)
+            SELECT product_name, category, price, stock_quantity
+            FROM stg_products
+            WHERE existing_id IS NULL
+            ORDER BY seq
+            {on_conflict}
+            RETURNING product_id, product_name, category;
+        """)).fetchall()
+
+    for product_id, name, cat in inserted:
+        existing[(name, cat)] = int(product_id)
+    for source_key, key in zip(df["product_id"], keys):
+        mapping[str(source_key)] = existing[key]
+
+    logger.info(
+        f"Loaded/merged products: {len(mapping)} "
+        f"(bulk, {len(inserted)} inserted, {updated} updated, batch_size={batch_size})"
+    )
+    return mapping
 
-    with engine.begin() as conn:
-        for _, r in products.iterrows():
+
+def load_products_rowwise(engine: Union[Engine, Connection], products: pd.DataFrame, logger: logging.Logger) -> Dict[str, int]:
+    """
+    Row-by-row fallback: SELECT by (product_name, category), then UPDATE or INSERT per product.
+    """
+    mapping: Dict[str, int] = {}
+
+    with transaction(engine) as conn:
+        for r in frame_records(products):
             source_key = r["product_id"]
             payload = {
                 "product_name": r["product_name"],
@@ -359,7 +1087,9 @@ def transform_sales_to_orders(
     sales_df: pd.DataFrame,
     customer_map: Dict[str, int],
     product_map: Dict[str, int],
-    logger: logging.Logger
+    logger: logging.Logger,
+    seen_transaction_ids: Optional[Set[str]] = None,
+    reject_writer: Optional[RejectWriter] = None
 ) -> Tuple[pd.DataFrame, pd.DataFrame, int, int]:
     """
     Your sales file columns:
@@ -372,6 +1102,28 @@ def transform_sales_to_orders(
     - Drop rows with missing/invalid mapping
     - Create orders grouped by (customer_id, order_date, status)
     - Create order_items per row
+
+    seen_transaction_ids: when transforming a file chunk by chunk, pass the same set for every chunk;
+    transaction_ids kept by earlier chunks are then removed as duplicates too (and new ones are added).
+    reject_writer: writer for the dropped rows (shared by every chunk of a file).
+    """
+    df, dup_removed, missing_handled = clean_sales(sales_df, logger, seen_transaction_ids, reject_writer)
+    orders, items, unmapped = map_sales_to_orders(df, customer_map, product_map, logger, reject_writer)
+    return orders, items, dup_removed, missing_handled + unmapped
+
+
+def clean_sales(
+    sales_df: pd.DataFrame,
+    logger: logging.Logger,
+    seen_transaction_ids: Optional[Set[str]] = None,
+    reject_writer: Optional[RejectWriter] = None
+) -> Tuple[pd.DataFrame, int, int]:
+    """
+    Sales cleaning that does not need the ID maps: normalize, parse numbers/dates,
+    drop incomplete rows, default status, dedupe transaction_id, drop invalid quantity/unit_price.
+    Every duplicate of a transaction_id must be in the same frame (or share seen_transaction_ids).
+    reject_writer: dropped rows are streamed there, with the first failed check as reason.
+    Returns (clean_df, duplicates_removed, missing_handled).
     """
     df = sales_df.copy()
     missing_handled = 0
@@ -379,59 +1131,96 @@ def transform_sales_to_orders(
     ensure_cols(df, ["transaction_id", "customer_id", "product_id", "quantity", "unit_price", "transaction_date"], "sales_raw.csv")
 
     for c in ["transaction_id", "customer_id", "product_id", "transaction_date", "status"]:
-        df[c] = df[c].apply(normalize_null)
+        df[c] = normalize_nulls(df[c])
 
     # numeric fields
     df["quantity"] = pd.to_numeric(df["quantity"], errors="coerce")
     df["unit_price"] = pd.to_numeric(df["unit_price"], errors="coerce")
 
     # date
-    df["order_date"] = df["transaction_date"].apply(parse_date_to_yyyy_mm_dd)
+    df["order_date"] = parse_dates_to_yyyy_mm_dd(df["transaction_date"])
 
     # drop missing required for load
     before = len(df)
-    df = df.dropna(subset=["customer_id", "product_id", "quantity", "unit_price", "order_date"])
+    for column, reason in (
+        ("customer_id", "missing_customer_id"),
+        ("product_id", "missing_product_id"),
+        ("quantity", "invalid_quantity"),
+        ("unit_price", "invalid_unit_price"),
+        ("transaction_date", "missing_date"),
+        ("order_date", "unparseable_date"),
+    ):
+        df = drop_rejected(df, df[column].isna(), reason, reject_writer)
     dropped = before - len(df)
     missing_handled += dropped
     if dropped:
         logger.info(f"Sales: dropped {dropped} rows due to missing ids/qty/price/date.")
 
     # status default
-    df["status"] = df["status"].fillna("Pending")
+    df["status"] = fill_missing(df["status"], "Pending")
 
     # remove duplicate transactions
     before = len(df)
-    df = df.drop_duplicates(subset=["transaction_id"], keep="first")
+    df = drop_rejected(df, df.duplicated(subset=["transaction_id"], keep="first"), "duplicate_transaction_id", reject_writer)
+    if seen_transaction_ids is not None:
+        df = drop_rejected(df, df["transaction_id"].isin(seen_transaction_ids), "duplicate_transaction_id", reject_writer)
+        seen_transaction_ids.update(df["transaction_id"])
     dup_removed = before - len(df)
     if dup_removed:
         logger.info(f"Sales: removed {dup_removed} duplicate rows by transaction_id.")
 
     # sanity checks
     before = len(df)
-    df = df[(df["quantity"] >= 1) & (df["unit_price"] >= 0)]
+    df = drop_rejected(df, df["quantity"] < 1, "invalid_quantity", reject_writer)
+    df = drop_rejected(df, df["unit_price"] < 0, "invalid_unit_price", reject_writer)
     dropped = before - len(df)
     missing_handled += dropped
     if dropped:
         logger.info(f"Sales: dropped {dropped} rows due to invalid quantity/unit_price.")
 
+    if is_compact_sales_frame(df):
+        df = compact_sales_frame(df)
+    return df, dup_removed, missing_handled
+
+
+def map_sales_to_orders(
+    df: pd.DataFrame,
+    customer_map: Dict[str, int],
+    product_map: Dict[str, int],
+    logger: logging.Logger,
+    reject_writer: Optional[RejectWriter] = None
+) -> Tuple[pd.DataFrame, pd.DataFrame, int]:
+    """
+    Map cleaned sales (from clean_sales) to DB keys and build orders/order_items.
+    Compact frames keep int32 ids/quantities (see compact_sales_frame).
+    reject_writer: rows without a mapping are streamed there (unmapped_customer / unmapped_product).
+    Frames that already carry db_customer_id / db_product_id (apply_premapped_keys) are not re-mapped.
+    Returns (orders, items, rows_dropped_for_missing_mapping).
+    """
+    df = df.copy()
+    int_dtype = "int32" if is_compact_sales_frame(df) else int
+
     # map to DB keys
-    df["db_customer_id"] = df["customer_id"].map(customer_map)
-    df["db_product_id"] = df["product_id"].map(product_map)
+    if "db_customer_id" not in df.columns:
+        df["db_customer_id"] = map_source_keys(df["customer_id"], customer_map)
+    if "db_product_id" not in df.columns:
+        df["db_product_id"] = map_source_keys(df["product_id"], product_map)
 
     before = len(df)
-    df = df.dropna(subset=["db_customer_id", "db_product_id"])
+    df = drop_rejected(df, df["db_customer_id"].isna(), "unmapped_customer", reject_writer)
+    df = drop_rejected(df, df["db_product_id"].isna(), "unmapped_product", reject_writer)
     dropped = before - len(df)
-    missing_handled += dropped
     if dropped:
         logger.info(f"Sales: dropped {dropped} rows due to missing customer/product mapping.")
 
-    df["db_customer_id"] = df["db_customer_id"].astype(int)
-    df["db_product_id"] = df["db_product_id"].astype(int)
-    df["quantity"] = df["quantity"].astype(int)
+    df["db_customer_id"] = df["db_customer_id"].astype(int_dtype)
+    df["db_product_id"] = df["db_product_id"].astype(int_dtype)
+    df["quantity"] = df["quantity"].astype(int_dtype)
     df["unit_price"] = df["unit_price"].astype(float)
 
     # order_items
     items = pd.DataFrame({
+        "transaction_id": df["transaction_id"],
         "customer_id": df["db_customer_id"],
         "order_date": df["order_date"],
         "status": df["status"],
@@ -443,7 +1232,7 @@ def transform_sales_to_orders(
 
     # orders grouped
     orders = (
-        items.groupby(["customer_id", "order_date", "status"], as_index=False)["subtotal"]
+        items.groupby(["customer_id", "order_date", "status"], as_index=False, observed=True)["subtotal"]
         .sum()
         .rename(columns={"subtotal": "total_amount"})
     )
@@ -451,14 +1240,102 @@ def transform_sales_to_orders(
     logger.info(f"Sales -> Orders to load: {len(orders)}")
     logger.info(f"Sales -> Order items to load: {len(items)}")
 
-    return orders, items, dup_removed, missing_handled
+    return orders, items, dropped
+
+
+def map_source_keys(keys: pd.Series, mapping: Dict[str, int]) -> pd.Series:
+    """
+    Vectorized dict lookup: each distinct key (categorical codes are reused) is looked up once,
+    then the ids are gathered with one array take. Unknown/missing keys -> NaN.
+    """
+    codes, uniques = pd.factorize(keys, use_na_sentinel=True)
+    ids = pd.Series(uniques, dtype=object).map(mapping).to_numpy(dtype=float)
+    return pd.Series(np.append(ids, np.nan)[codes], index=keys.index)
 
 
 # ---------------------------- Load Orders + Order Items ----------------------------
 
-def load_orders_and_items(engine: Engine, orders: pd.DataFrame, items: pd.DataFrame, logger: logging.Logger) -> Tuple[int, int]:
+def load_orders_and_items(
+    engine: Union[Engine, Connection],
+    orders: pd.DataFrame,
+    items: pd.DataFrame,
+    logger: logging.Logger,
+    mode: str = "bulk",
+    batch_size: int = 10000
+) -> Tuple[int, int]:
     """
-    Insert orders row-by-row with RETURNING order_id, then insert matching order_items.
+    mode="bulk": COPY orders into a staging table, insert them with one INSERT ... SELECT ... RETURNING,
+                 join the new order_ids back onto items by (customer_id, order_date, status),
+                 then stream every order_item in a single COPY FROM STDIN.
+    mode="row":  insert orders row-by-row with RETURNING order_id, then insert matching order_items (fallback).
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode {mode!r}. Expected one of {LOAD_MODES}")
+    if mode == "row":
+        return load_orders_and_items_rowwise(engine, orders, items, logger)
+
+    if orders.empty or items.empty:
+        logger.info("No orders/items to load.")
+        return 0, 0
+
+    order_key = ["customer_id", "order_date", "status"]
+    stage = orders.reset_index(drop=True)
+    stage = stage.assign(
+        seq=range(len(stage)),
+        customer_id=stage["customer_id"].astype(int),
+        order_date=stage["order_date"].astype(str),
+        status=stage["status"].fillna("Pending").astype(str)
+    )
+
+    with transaction(engine) as conn:
+        conn.execute(text("""
+            CREATE TEMP TABLE stg_orders (
+                seq          BIGINT,
+                customer_id  INT,
+                order_date   DATE,
+                status       TEXT,
+                total_amount NUMERIC(10,2)
+            ) ON COMMIT DROP;
+        """))
+        copy_frame_to_table(conn, stage, "stg_orders", ["seq", "customer_id", "order_date", "status", "total_amount"], batch_size)
+
+        # Each (customer_id, order_date, status) is one order, so RETURNING can be joined back on that key
+        returned = conn.execute(text("""
+            INSERT INTO orders (customer_id, order_date, total_amount, status)
+            SELECT customer_id, order_date, total_amount, status
+            FROM stg_orders
+            ORDER BY seq
+            RETURNING order_id, customer_id, order_date, status;
+        """)).fetchall()
+
+        order_ids = pd.DataFrame(returned, columns=["order_id", *order_key])
+        order_ids["customer_id"] = order_ids["customer_id"].astype(int)
+        order_ids["order_date"] = order_ids["order_date"].astype(str)
+        order_ids = order_ids.merge(stage[order_key + ["seq"]], on=order_key, how="inner")
+
+        # Items keep file order within each order, and orders keep staging order (same ids as row mode)
+        payload_items = items.assign(
+            customer_id=items["customer_id"].astype(int),
+            order_date=items["order_date"].astype(str),
+            status=items["status"].fillna("Pending").astype(str),
+            item_pos=range(len(items))
+        ).merge(order_ids, on=order_key, how="inner", sort=False)
+        payload_items = payload_items.sort_values(["seq", "item_pos"], kind="mergesort")
+
+        items_inserted = copy_frame_to_table(
+            conn, payload_items, "order_items",
+            ["order_id", "product_id", "quantity", "unit_price", "subtotal"],
+            batch_size
+        )
+
+    orders_inserted = len(returned)
+    logger.info(f"Loaded {orders_inserted} orders and {items_inserted} order_items (bulk, batch_size={batch_size}).")
+    return orders_inserted, items_inserted
+
+
+def load_orders_and_items_rowwise(engine: Union[Engine, Connection], orders: pd.DataFrame, items: pd.DataFrame, logger: logging.Logger) -> Tuple[int, int]:
+    """
+    Row-by-row fallback: insert orders one at a time with RETURNING order_id, then insert matching order_items.
     """
     if orders.empty or items.empty:
         logger.info("No orders/items to load.")
@@ -469,11 +1346,11 @@ def load_orders_and_items(engine: Engine, orders: pd.DataFrame, items: pd.DataFr
 
     # group items per order key
     grouped: Dict[Tuple[int, str, str], pd.DataFrame] = {}
-    for (cid, od, st), g in items.groupby(["customer_id", "order_date", "status"]):
+    for (cid, od, st), g in items.groupby(["customer_id", "order_date", "status"], observed=True):
         grouped[(int(cid), str(od), str(st))] = g.copy()
 
-    with engine.begin() as conn:
-        for _, o in orders.iterrows():
+    with transaction(engine) as conn:
+        for o in frame_records(orders):
             key = (int(o["customer_id"]), str(o["order_date"]), str(o["status"]))
             g = grouped.get(key)
             if g is None or g.empty:
@@ -493,7 +1370,7 @@ def load_orders_and_items(engine: Engine, orders: pd.DataFrame, items: pd.DataFr
             orders_inserted += 1
 
             payload_items = []
-            for _, r in g.iterrows():
+            for r in frame_records(g):
                 payload_items.append({
                     "order_id": int(order_id),
                     "product_id": int(r["product_id"]),
@@ -513,6 +1390,1148 @@ def load_orders_and_items(engine: Engine, orders: pd.DataFrame, items: pd.DataFr
     return orders_inserted, items_inserted
 
 
+# ---------------------------- Streaming Sales Load ----------------------------
+
+def stream_sales_to_orders(
+    engine: Union[Engine, Connection],
+    sales_path: str,
+    customer_map: Dict[str, int],
+    product_map: Dict[str, int],
+    logger: logging.Logger,
+    chunk_size: int,
+    batch_size: int = 10000,
+    incremental: bool = False,
+    categorical: Sequence[str] = (),
+    rejects: Optional[RejectStore] = None,
+    file_state: Optional[Tuple[str, str]] = None
+) -> Tuple[int, int, int, int, int, int]:
+    """
+    Read sales_raw.csv chunk_size rows at a time, transform each chunk and load its orders/items
+    before reading the next, so peak memory is bounded by the chunk size, not the file size.
+
+    Cross-chunk correctness:
+    - transaction_id dedupe: the ids kept so far live in a temp table (stream_seen_tx), so memory does not
+      grow with the file; each chunk only pulls back which of its own ids were seen before
+    - order grouping: a temp table holds (customer_id, order_date, status) -> order_id for this run;
+      a key seen in an earlier chunk gets its items appended and total_amount increased
+      instead of a second order row.
+    incremental=True: rows whose transaction_id was loaded by a previous run are skipped, and the
+    transaction_ids loaded here are recorded in the same transaction as the orders.
+    categorical: passed to safe_read_csv (SALES_CATEGORICAL_COLUMNS for compact frames).
+    rejects: dropped rows of every chunk go to one writer.
+    file_state=(file_name, file_hash) for incremental runs: saved with the rows read and the watermark of the
+    last loaded row once every chunk is in, in the same transaction.
+
+    Returns (records_read, duplicates_removed, missing_handled, orders_inserted, items_inserted, skipped).
+    """
+    records_read = dup_removed = missing_handled = orders_inserted = items_inserted = skipped = 0
+    last_transaction_id = last_order_date = None
+    writer = rejects.writer(os.path.basename(sales_path)) if rejects is not None else None
+
+    with transaction(engine) as conn:
+        conn.execute(text("""
+            CREATE TEMP TABLE stream_orders (
+                customer_id INT,
+                order_date  DATE,
+                status      TEXT,
+                order_id    INT,
+                PRIMARY KEY (customer_id, order_date, status)
+            ) ON COMMIT DROP;
+
+            CREATE TEMP TABLE stg_chunk_orders (
+                seq          BIGINT,
+                customer_id  INT,
+                order_date   DATE,
+                status       TEXT,
+                total_amount NUMERIC(12,2)
+            ) ON COMMIT DROP;
+
+            CREATE TEMP TABLE stream_seen_tx (
+                transaction_id TEXT PRIMARY KEY
+            ) ON COMMIT DROP;
+
+            CREATE TEMP TABLE stg_chunk_items (
+                seq         BIGINT,
+                customer_id INT,
+                order_date  DATE,
+                status      TEXT,
+                product_id  INT,
+                quantity    INT,
+                unit_price  NUMERIC(10,2),
+                subtotal    NUMERIC(10,2)
+            ) ON COMMIT DROP;
+        """))
+
+        for n, chunk in enumerate(safe_read_csv(sales_path, logger, chunksize=chunk_size, categorical=categorical), start=1):
+            records_read += len(chunk)
+            if incremental:
+                chunk, n_skipped = drop_loaded_sales(conn, chunk)
+                skipped += n_skipped
+            seen_before = fetch_seen_transaction_ids(conn, chunk)
+            seen = set(seen_before)
+            orders, items, dup, miss = transform_sales_to_orders(
+                chunk, customer_map, product_map, logger, seen, writer
+            )
+            record_seen_transaction_ids(conn, seen - seen_before)
+            dup_removed += dup
+            missing_handled += miss
+            if orders.empty:
+                continue
+
+            conn.execute(text("TRUNCATE stg_chunk_orders, stg_chunk_items;"))
+            copy_frame_to_table(
+                conn, orders.assign(seq=range(len(orders))), "stg_chunk_orders",
+                ["seq", "customer_id", "order_date", "status", "total_amount"], batch_size
+            )
+            copy_frame_to_table(
+                conn, items.assign(seq=range(len(items))), "stg_chunk_items",
+                ["seq", "customer_id", "order_date", "status", "product_id", "quantity", "unit_price", "subtotal"],
+                batch_size
+            )
+
+            # orders already created by an earlier chunk of this run
+            conn.execute(text("""
+                UPDATE orders o
+                SET total_amount = o.total_amount + s.total_amount
+                FROM stg_chunk_orders s
+                JOIN stream_orders r USING (customer_id, order_date, status)
+                WHERE o.order_id = r.order_id;
+            """))
+
+            new_orders = conn.execute(text("""
+                WITH ins AS (
+                    INSERT INTO orders (customer_id, order_date, total_amount, status)
+                    SELECT s.customer_id, s.order_date, s.total_amount, s.status
+                    FROM stg_chunk_orders s
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM stream_orders r
+                        WHERE r.customer_id = s.customer_id
+                          AND r.order_date = s.order_date
+                          AND r.status = s.status
+                    )
+                    ORDER BY s.seq
+                    RETURNING order_id, customer_id, order_date, status
+                )
+                INSERT INTO stream_orders (customer_id, order_date, status, order_id)
+                SELECT customer_id, order_date, status, order_id FROM ins;
+            """)).rowcount
+
+            new_items = conn.execute(text("""
+                INSERT INTO order_items (order_id, product_id, quantity, unit_price, subtotal)
+                SELECT r.order_id, i.product_id, i.quantity, i.unit_price, i.subtotal
+                FROM stg_chunk_items i
+                JOIN stream_orders r USING (customer_id, order_date, status)
+                ORDER BY i.seq;
+            """)).rowcount
+
+            orders_inserted += new_orders
+            items_inserted += new_items
+            if incremental:
+                record_loaded_sales(conn, items)
+            last_transaction_id = items["transaction_id"].iloc[-1]
+            chunk_last_date = items["order_date"].max()
+            last_order_date = chunk_last_date if last_order_date is None else max(last_order_date, chunk_last_date)
+            logger.info(f"Sales chunk {n}: {len(chunk)} rows -> {new_orders} new orders, {new_items} order_items.")
+
+        if file_state is not None:
+            save_file_state(conn, *file_state, records_read, last_transaction_id, last_order_date)
+
+    if writer is not None:
+        writer.close()
+    logger.info(f"Streamed {records_read} sales rows: loaded {orders_inserted} orders and {items_inserted} order_items.")
+    return records_read, dup_removed, missing_handled, orders_inserted, items_inserted, skipped
+
+
+def fetch_seen_transaction_ids(conn: Connection, chunk: pd.DataFrame) -> Set[str]:
+    """transaction_ids of this chunk that an earlier chunk of the stream already kept (stream_seen_tx)."""
+    candidates = pd.DataFrame({"transaction_id": normalize_nulls(chunk["transaction_id"]).dropna().unique()})
+    if candidates.empty:
+        return set()
+    conn.execute(text("""
+        CREATE TEMP TABLE IF NOT EXISTS stg_stream_tx (transaction_id TEXT) ON COMMIT DROP;
+        TRUNCATE stg_stream_tx;
+    """))
+    copy_frame_to_table(conn, candidates, "stg_stream_tx", ["transaction_id"])
+    return set(conn.execute(text("""
+        SELECT k.transaction_id FROM stg_stream_tx k JOIN stream_seen_tx s USING (transaction_id);
+    """)).scalars())
+
+
+def record_seen_transaction_ids(conn: Connection, transaction_ids: Set[str]):
+    if transaction_ids:
+        frame = pd.DataFrame({"transaction_id": sorted(transaction_ids)})
+        copy_frame_to_table(conn, frame, "stream_seen_tx", ["transaction_id"])
+
+
+def map_sales_with_rejects(
+    sales_clean: pd.DataFrame,
+    customer_map: Dict[str, int],
+    product_map: Dict[str, int],
+    logger: logging.Logger,
+    rejects: Optional[RejectStore]
+) -> Tuple[pd.DataFrame, pd.DataFrame, int]:
+    """map_sales_to_orders with its own reject writer (closed before the load starts)."""
+    writer = rejects.writer("sales_raw.csv") if rejects is not None else None
+    result = map_sales_to_orders(sales_clean, customer_map, product_map, logger, writer)
+    if writer is not None:
+        writer.close()
+    return result
+
+def map_and_load_sales(
+    engine: Engine,
+    sales_clean: pd.DataFrame,
+    customer_map: Dict[str, int],
+    product_map: Dict[str, int],
+    logger: logging.Logger,
+    mode: str = "bulk",
+    batch_size: int = 10000,
+    file_state: Optional[Tuple[str, str, int]] = None,
+    rejects: Optional[RejectStore] = None
+) -> Tuple[int, int, int]:
+    """
+    Join point of the pipeline: cleaned sales + ID maps -> orders/items -> load.
+    file_state=(file_name, file_hash, rows_read) for incremental runs: the loaded transaction_ids and the
+    file watermark are recorded in the same transaction as orders/items, so a rerun never double-loads.
+    rejects: rows without a customer/product mapping are written there.
+    Returns (orders_inserted, items_inserted, rows_dropped_for_missing_mapping).
+    """
+    with engine.begin() as conn:
+        orders_t, items_t, unmapped = map_sales_with_rejects(sales_clean, customer_map, product_map, logger, rejects)
+        o_loaded, i_loaded = load_orders_and_items(conn, orders_t, items_t, logger, mode, batch_size)
+
+        if file_state is not None:
+            record_loaded_sales(conn, items_t)
+            last = items_t.iloc[-1] if not items_t.empty else None
+            save_file_state(
+                conn, *file_state,
+                last["transaction_id"] if last is not None else None,
+                items_t["order_date"].max() if last is not None else None
+            )
+    return o_loaded, i_loaded, unmapped
+
+
+# ---------------------------- Incremental State ----------------------------
+
+SALES_STATE_SOURCE = "sales_raw.csv"
+
+def ensure_etl_state_tables(engine: Engine):
+    """
+    ETL-owned bookkeeping tables for incremental runs (created on first use):
+    - etl_file_state:        last seen content hash + watermark per source file
+    - etl_row_fingerprints:  per source row: fingerprint of the transformed row and the DB id it loaded to
+                             (customers/products), or the loaded transaction_id (sales)
+    - etl_load_checkpoint:   committed shards of an unfinished sharded sales load (cleared when it completes)
+    """
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS etl_file_state (
+                file_name           VARCHAR(255) PRIMARY KEY,
+                file_hash           CHAR(64) NOT NULL,
+                rows_read           BIGINT,
+                last_transaction_id VARCHAR(50),
+                last_order_date     DATE,
+                updated_at          TIMESTAMP NOT NULL DEFAULT now()
+            );
+
+            CREATE TABLE IF NOT EXISTS etl_row_fingerprints (
+                source      VARCHAR(255) NOT NULL,
+                source_key  VARCHAR(100) NOT NULL,
+                fingerprint BIGINT NOT NULL,
+                db_id       INT,
+                PRIMARY KEY (source, source_key)
+            );
+
+            CREATE TABLE IF NOT EXISTS etl_load_checkpoint (
+                run_key       CHAR(64) NOT NULL,
+                shard         INT NOT NULL,
+                orders_loaded INT NOT NULL,
+                items_loaded  INT NOT NULL,
+                committed_at  TIMESTAMP NOT NULL DEFAULT now(),
+                PRIMARY KEY (run_key, shard)
+            );
+        """))
+
+def file_fingerprint(path: str, block_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def row_fingerprints(df: pd.DataFrame, columns: List[str]) -> pd.Series:
+    """Vectorized 64-bit hash of each row's values (stored as signed BIGINT)."""
+    hashed = pd.util.hash_pandas_object(df[columns].astype(str), index=False)
+    return pd.Series(hashed.to_numpy().view("int64"), index=df.index)
+
+def fetch_file_hashes(engine: Engine) -> Dict[str, str]:
+    with engine.connect() as conn:
+        return dict(conn.execute(text("SELECT file_name, file_hash FROM etl_file_state;")).fetchall())
+
+def save_file_state(
+    bind: Union[Engine, Connection],
+    file_name: str,
+    file_hash: str,
+    rows_read: int,
+    last_transaction_id: Optional[str] = None,
+    last_order_date: Optional[str] = None
+):
+    with transaction(bind) as conn:
+        conn.execute(text("""
+            INSERT INTO etl_file_state (file_name, file_hash, rows_read, last_transaction_id, last_order_date, updated_at)
+            VALUES (:file_name, :file_hash, :rows_read, :last_transaction_id, :last_order_date, now())
+            ON CONFLICT (file_name) DO UPDATE SET
+                file_hash = EXCLUDED.file_hash,
+                rows_read = EXCLUDED.rows_read,
+                last_transaction_id = COALESCE(EXCLUDED.last_transaction_id, etl_file_state.last_transaction_id),
+                last_order_date = GREATEST(EXCLUDED.last_order_date, etl_file_state.last_order_date),
+                updated_at = now();
+        """), {
+            "file_name": file_name,
+            "file_hash": file_hash,
+            "rows_read": rows_read,
+            "last_transaction_id": last_transaction_id,
+            "last_order_date": last_order_date,
+        })
+
+def fetch_key_map(engine: Engine, source: str) -> Dict[str, int]:
+    """source_key -> db_id recorded by earlier incremental runs."""
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT source_key, db_id FROM etl_row_fingerprints
+            WHERE source = :source AND db_id IS NOT NULL;
+        """), {"source": source}).fetchall()
+    return {k: int(v) for k, v in rows}
+
+def load_dimension_incremental(
+    engine: Engine,
+    source: str,
+    transformed: pd.DataFrame,
+    key_col: str,
+    loader: Callable,
+    logger: logging.Logger,
+    mode: str = "bulk",
+    batch_size: int = 10000
+) -> Tuple[Dict[str, int], int]:
+    """
+    Load only new/changed rows of a transformed customers/products frame.
+    Unchanged rows (same source key + same fingerprint) reuse the recorded DB id without touching the table.
+    Returns (source_key -> db_id mapping for every row, number of unchanged rows skipped).
+    """
+    df = transformed.assign(fingerprint=row_fingerprints(transformed, list(transformed.columns)))
+
+    with engine.connect() as conn:
+        stored = pd.DataFrame(
+            conn.execute(text("""
+                SELECT source_key, fingerprint, db_id FROM etl_row_fingerprints WHERE source = :source;
+            """), {"source": source}).fetchall(),
+            columns=[key_col, "stored_fingerprint", "db_id"]
+        ).astype({"stored_fingerprint": "Int64", "db_id": "Int64"})
+
+    df = df.merge(stored, on=key_col, how="left")
+    unchanged = (df["fingerprint"] == df["stored_fingerprint"]).fillna(False).astype(bool) & df["db_id"].notna()
+    delta = df.loc[~unchanged, list(transformed.columns) + ["fingerprint"]]
+
+    mapping = {str(k): int(v) for k, v in zip(df.loc[unchanged, key_col], df.loc[unchanged, "db_id"])}
+    skipped = int(unchanged.sum())
+
+    delta_map = loader(engine, delta[transformed.columns], logger, mode, batch_size) if not delta.empty else {}
+    mapping.update(delta_map)
+
+    if not delta.empty:
+        state = pd.DataFrame({
+            "source": source,
+            "source_key": delta[key_col].astype(str),
+            "fingerprint": delta["fingerprint"],
+            "db_id": delta[key_col].astype(str).map(delta_map).astype("Int64"),
+        })
+        upsert_fingerprints(engine, state)
+
+    logger.info(f"{source}: {len(delta)} new/changed rows loaded, {skipped} unchanged rows skipped.")
+    return mapping, skipped
+
+def upsert_fingerprints(bind: Union[Engine, Connection], state: pd.DataFrame):
+    """state columns: source, source_key, fingerprint, db_id"""
+    with transaction(bind) as conn:
+        conn.execute(text("""
+            CREATE TEMP TABLE IF NOT EXISTS stg_fingerprints (
+                source VARCHAR(255), source_key VARCHAR(100), fingerprint BIGINT, db_id INT
+            ) ON COMMIT DROP;
+            TRUNCATE stg_fingerprints;
+        """))
+        copy_frame_to_table(conn, state, "stg_fingerprints", ["source", "source_key", "fingerprint", "db_id"])
+        conn.execute(text("""
+            INSERT INTO etl_row_fingerprints (source, source_key, fingerprint, db_id)
+            SELECT DISTINCT ON (source, source_key) source, source_key, fingerprint, db_id
+            FROM stg_fingerprints
+            ORDER BY source, source_key
+            ON CONFLICT (source, source_key) DO UPDATE SET
+                fingerprint = EXCLUDED.fingerprint,
+                db_id = EXCLUDED.db_id;
+        """))
+
+def drop_loaded_sales(conn: Connection, sales_df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+    """
+    Remove raw sales rows whose transaction_id was loaded by a previous run.
+    The anti-join runs in the DB, so only the (normally small) overlap comes back to Python.
+    """
+    tx = normalize_nulls(sales_df["transaction_id"])
+    candidates = pd.DataFrame({"transaction_id": tx.dropna().unique()})
+    if candidates.empty:
+        return sales_df, 0
+
+    conn.execute(text("""
+        CREATE TEMP TABLE IF NOT EXISTS stg_sales_keys (transaction_id VARCHAR(100)) ON COMMIT DROP;
+        TRUNCATE stg_sales_keys;
+    """))
+    copy_frame_to_table(conn, candidates, "stg_sales_keys", ["transaction_id"])
+    loaded = set(conn.execute(text("""
+        SELECT k.transaction_id
+        FROM stg_sales_keys k
+        JOIN etl_row_fingerprints f
+          ON f.source = :source AND f.source_key = k.transaction_id;
+    """), {"source": SALES_STATE_SOURCE}).scalars())
+
+    keep = ~tx.isin(loaded)
+    return sales_df[keep], int((~keep).sum())
+
+def record_loaded_sales(conn: Connection, items: pd.DataFrame):
+    """Mark the transaction_ids of loaded order_items as processed (same transaction as the load)."""
+    if items.empty:
+        return
+    upsert_fingerprints(conn, pd.DataFrame({
+        "source": SALES_STATE_SOURCE,
+        "source_key": items["transaction_id"].astype(str),
+        "fingerprint": row_fingerprints(items, ["customer_id", "product_id", "order_date", "quantity", "unit_price"]),
+        "db_id": None,
+    }))
+
+
+# ---------------------------- Key Map Store ----------------------------
+
+# Persistent source_key -> id maps, shared by the OLTP load (namespaces customers_raw.csv / products_raw.csv:
+# C001 -> customers.customer_id) and the warehouse load (dim_customer / dim_product: OLTP id -> surrogate key).
+# etl_key_map is the source of truth; every new or changed pair gets a fresh seq, so an on-disk index only
+# has to pull the rows with seq above the one it was built from.
+KEY_MAP_DDL = """
+    CREATE SEQUENCE IF NOT EXISTS etl_key_map_seq;
+
+    CREATE TABLE IF NOT EXISTS etl_key_map (
+        namespace  VARCHAR(63) NOT NULL,
+        source_key VARCHAR(100) NOT NULL,
+        db_id      BIGINT NOT NULL,
+        seq        BIGINT NOT NULL DEFAULT nextval('etl_key_map_seq'),
+        updated_at TIMESTAMP NOT NULL DEFAULT now(),
+        PRIMARY KEY (namespace, source_key)
+    );
+
+    CREATE INDEX IF NOT EXISTS ix_etl_key_map_namespace_seq ON etl_key_map (namespace, seq);
+"""
+
+# Fixed 16-byte SipHash key, so a key hashes the same in every process and every run.
+KEY_MAP_HASH_KEY = "fleximart-keymap"
+
+def ensure_key_map_table(bind: Union[Engine, Connection]):
+    with transaction(bind) as conn:
+        conn.execute(text(KEY_MAP_DDL))
+
+def hash_source_keys(keys) -> np.ndarray:
+    """64-bit hash (uint64) of each source key, as stored in a KeyIndex."""
+    return pd.util.hash_array(np.asarray(keys, dtype=str).astype(object), hash_key=KEY_MAP_HASH_KEY)
+
+def upsert_key_map(bind: Union[Engine, Connection], namespace: str, pairs: pd.DataFrame) -> int:
+    """
+    pairs columns: source_key, db_id (one row per source_key). COPY + one INSERT ... ON CONFLICT;
+    only new pairs and pairs whose id changed are written (and get a new seq). Returns rows written.
+    """
+    if pairs.empty:
+        return 0
+    with transaction(bind) as conn:
+        conn.execute(text("""
+            CREATE TEMP TABLE IF NOT EXISTS stg_key_map (source_key VARCHAR(100), db_id BIGINT) ON COMMIT DROP;
+            TRUNCATE stg_key_map;
+        """))
+        copy_frame_to_table(conn, pairs, "stg_key_map", ["source_key", "db_id"])
+        return conn.execute(text("""
+            INSERT INTO etl_key_map (namespace, source_key, db_id)
+            SELECT :namespace, source_key, db_id FROM stg_key_map
+            ON CONFLICT (namespace, source_key) DO UPDATE SET
+                db_id = EXCLUDED.db_id,
+                seq = nextval('etl_key_map_seq'),
+                updated_at = now()
+            WHERE etl_key_map.db_id IS DISTINCT FROM EXCLUDED.db_id;
+        """), {"namespace": namespace}).rowcount
+
+def bulk_load_key_map(bind: Union[Engine, Connection], namespace: str, source_query: str) -> int:
+    """
+    Server-side bulk load: source_query selects (source_key, db_id) pairs, e.g. from a dimension table.
+    Same write rules as upsert_key_map; nothing travels through Python. Returns rows written.
+    """
+    with transaction(bind) as conn:
+        return conn.execute(text(f"""
+            INSERT INTO etl_key_map (namespace, source_key, db_id)
+            SELECT :namespace, src.source_key, src.db_id FROM ({source_query}) AS src (source_key, db_id)
+            ON CONFLICT (namespace, source_key) DO UPDATE SET
+                db_id = EXCLUDED.db_id,
+                seq = nextval('etl_key_map_seq'),
+                updated_at = now()
+            WHERE etl_key_map.db_id IS DISTINCT FROM EXCLUDED.db_id;
+        """), {"namespace": namespace}).rowcount
+
+class KeyIndex:
+    """
+    Read-only source_key -> id lookup over one .npy file of shape (2, n): sorted key hashes (uint64)
+    and their ids (int64), opened with mmap_mode="r". Lookups are a vectorized binary search over the
+    mapped pages, so nothing is copied onto the heap and every process that opens the same file shares
+    it through the page cache. Pickles as its path (cheap to pass to worker processes).
+    Keys are compared by 64-bit hash only; KeyMapStore.sync rejects an index with colliding keys.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.ids = np.empty(0, dtype=np.int64)
+        if os.path.exists(path):
+            table = np.load(path, mmap_mode="r")
+            if table.shape[1]:
+                self.hashes, self.ids = table[0], table[1].view(np.int64)
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def lookup(self, keys: pd.Series) -> pd.Series:
+        """Same contract as map_source_keys: id per key (float), NaN for unknown/missing keys."""
+        codes, uniques = pd.factorize(keys, use_na_sentinel=True)
+        ids = np.full(len(uniques) + 1, np.nan)
+        if len(self) and len(uniques):
+            wanted = hash_source_keys(uniques)
+            pos = np.minimum(np.searchsorted(self.hashes, wanted), len(self) - 1)
+            found = self.hashes[pos] == wanted
+            ids[:-1][found] = self.ids[pos[found]]
+        return pd.Series(ids[codes], index=keys.index)
+
+class KeyMapStore:
+    """
+    etl_key_map plus one mmap-able KeyIndex per namespace in directory:
+      <directory>/<namespace>.keys.npy    the index (replaced atomically; open readers keep the old file)
+      <directory>/<namespace>.meta.json   highest seq the index contains
+    sync() pulls only the pairs written since the index was built; update() diffs a freshly loaded map
+    against the index and writes only the new/changed pairs. Single writer per namespace: a concurrent
+    load could commit a lower seq after sync has moved past it.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _prefix(self, namespace: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9_.-]", "_", namespace))
+
+    def index(self, namespace: str) -> KeyIndex:
+        return KeyIndex(self._prefix(namespace) + ".keys.npy")
+
+    def _indexed_seq(self, namespace: str) -> int:
+        path = self._prefix(namespace) + ".meta.json"
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as f:
+            return int(json.load(f)["seq"])
+
+    def _write(self, namespace: str, hashes: np.ndarray, ids: np.ndarray, seq: int):
+        os.makedirs(self.directory, exist_ok=True)
+        prefix, tmp = self._prefix(namespace), f".{os.getpid()}.tmp"
+        with open(prefix + ".keys.npy" + tmp, "wb") as f:
+            np.save(f, np.vstack([hashes, ids.astype(np.int64).view(np.uint64)]))
+        os.replace(prefix + ".keys.npy" + tmp, prefix + ".keys.npy")
+        with open(prefix + ".meta.json" + tmp, "w", encoding="utf-8") as f:
+            json.dump({"namespace": namespace, "seq": seq, "keys": len(hashes)}, f)
+        os.replace(prefix + ".meta.json" + tmp, prefix + ".meta.json")
+
+    def sync(self, bind: Union[Engine, Connection], namespace: str) -> KeyIndex:
+        """Bring the namespace's index up to date with etl_key_map (full rebuild if the table was reset)."""
+        index, after_seq = self.index(namespace), self._indexed_seq(namespace)
+        with transaction(bind) as conn:
+            total, max_seq = conn.execute(text("""
+                SELECT COUNT(*), COALESCE(MAX(seq), 0) FROM etl_key_map WHERE namespace = :namespace;
+            """), {"namespace": namespace}).one()
+            if max_seq == after_seq and total == len(index):
+                return index
+            if max_seq < after_seq or total < len(index) or not len(index):
+                index, after_seq = None, 0
+            rows = conn.execute(text("""
+                SELECT source_key, db_id FROM etl_key_map WHERE namespace = :namespace AND seq > :after_seq;
+            """), {"namespace": namespace, "after_seq": after_seq}).fetchall()
+
+        if not total:
+            for suffix in (".keys.npy", ".meta.json"):
+                if os.path.exists(self._prefix(namespace) + suffix):
+                    os.remove(self._prefix(namespace) + suffix)
+            return self.index(namespace)
+        new_hashes = hash_source_keys([k for k, _ in rows])
+        new_ids = np.array([v for _, v in rows], dtype=np.int64)
+        if len(np.unique(new_hashes)) != len(rows):
+            raise ValueError(f"Key map {namespace!r}: 64-bit hash collision between distinct source keys.")
+        hashes = new_hashes if index is None else np.concatenate([index.hashes, new_hashes])
+        ids = new_ids if index is None else np.concatenate([index.ids, new_ids])
+        # last occurrence wins (the pulled pairs are newer than the indexed ones); result is sorted by hash
+        hashes, last = np.unique(hashes[::-1], return_index=True)
+        ids = ids[::-1][last]
+        if len(hashes) != total:
+            raise ValueError(f"Key map {namespace!r}: index has {len(hashes)} keys, etl_key_map {total}; delete the index to rebuild it.")
+        self._write(namespace, hashes, ids, int(max_seq))
+        return self.index(namespace)
+
+    def update(
+        self,
+        bind: Union[Engine, Connection],
+        namespace: str,
+        mapping: Union[Dict[str, int], pd.Series]
+    ) -> Tuple[KeyIndex, Dict[str, int]]:
+        """
+        Record a freshly loaded source_key -> id map: only pairs the index does not already hold
+        are written to etl_key_map, then the index is synced. Returns (index, {new/changed key: id}).
+        """
+        mapping = mapping if isinstance(mapping, pd.Series) else pd.Series(mapping, dtype="float64")
+        known = self.index(namespace).lookup(pd.Series(mapping.index.astype(str), dtype=object)).to_numpy()
+        changed = mapping[known != mapping.to_numpy(dtype=float)]
+        upsert_key_map(bind, namespace, pd.DataFrame({
+            "source_key": changed.index.astype(str),
+            "db_id": changed.to_numpy(dtype=np.int64),
+        }))
+        return self.sync(bind, namespace), {str(k): int(v) for k, v in changed.items()}
+
+def update_key_maps(store: KeyMapStore, bind: Union[Engine, Connection], maps: Dict[str, Dict[str, int]]) -> List[Dict[str, int]]:
+    """KeyMapStore.update for every namespace -> freshly loaded map; returns their new/changed pairs, in order."""
+    return [store.update(bind, namespace, mapping)[1] for namespace, mapping in maps.items()]
+
+def premap_sales_keys(customer_index: KeyIndex, product_index: KeyIndex, sales_clean: pd.DataFrame) -> pd.DataFrame:
+    """db ids of every cleaned sales row from the persisted key maps (NaN where a key is not known yet)."""
+    return pd.DataFrame({
+        "db_customer_id": customer_index.lookup(sales_clean["customer_id"]),
+        "db_product_id": product_index.lookup(sales_clean["product_id"]),
+    }, index=sales_clean.index)
+
+def apply_premapped_keys(
+    sales_clean: pd.DataFrame,
+    premapped: pd.DataFrame,
+    customer_changes: Dict[str, int],
+    product_changes: Dict[str, int]
+) -> pd.DataFrame:
+    """
+    Attach premap_sales_keys ids to the cleaned sales, overridden for the keys this run's dimension
+    loads added or re-pointed. map_sales_to_orders then skips its own mapping.
+    """
+    out = sales_clean.assign(db_customer_id=premapped["db_customer_id"], db_product_id=premapped["db_product_id"])
+    for id_col, key_col, changes in (
+        ("db_customer_id", "customer_id", customer_changes),
+        ("db_product_id", "product_id", product_changes),
+    ):
+        if changes:
+            out[id_col] = map_source_keys(out[key_col], changes).fillna(out[id_col])
+    return out
+
+
+# ---------------------------- Sharded Sales Load ----------------------------
+
+def sales_load_run_key(sales_file_hash: str, shards: int) -> str:
+    """Checkpoint key of a sharded load: same file + same shard count -> same shards, so a rerun can resume."""
+    return hashlib.sha256(f"{sales_file_hash}|{shards}".encode()).hexdigest()
+
+def shard_sales(orders: pd.DataFrame, items: pd.DataFrame, shards: int) -> List[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """Split orders/items by DB customer_id modulo shards (an order and its items always share a shard)."""
+    order_shard = orders["customer_id"].astype(int) % shards
+    item_shard = items["customer_id"].astype(int) % shards
+    return [(orders[order_shard == s], items[item_shard == s]) for s in range(shards)]
+
+def fetch_load_checkpoint(engine: Engine, run_key: str) -> Dict[int, Tuple[int, int]]:
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT shard, orders_loaded, items_loaded FROM etl_load_checkpoint WHERE run_key = :run_key;
+        """), {"run_key": run_key})
+        return {shard: (o, i) for shard, o, i in rows}
+
+def load_sales_shard(
+    engine: Engine,
+    run_key: str,
+    shard: int,
+    orders: pd.DataFrame,
+    items: pd.DataFrame,
+    logger: logging.Logger,
+    batch_size: int,
+    record_sales: bool
+) -> Tuple[int, int]:
+    """One shard in its own transaction on its own pooled connection; the checkpoint row commits with it."""
+    with engine.begin() as conn:
+        o_loaded, i_loaded = load_orders_and_items(conn, orders, items, logger, "bulk", batch_size)
+        if record_sales:
+            record_loaded_sales(conn, items)
+        conn.execute(text("""
+            INSERT INTO etl_load_checkpoint (run_key, shard, orders_loaded, items_loaded)
+            VALUES (:run_key, :shard, :orders_loaded, :items_loaded);
+        """), {"run_key": run_key, "shard": shard, "orders_loaded": o_loaded, "items_loaded": i_loaded})
+    return o_loaded, i_loaded
+
+def map_and_load_sales_sharded(
+    engine: Engine,
+    sales_clean: pd.DataFrame,
+    customer_map: Dict[str, int],
+    product_map: Dict[str, int],
+    logger: logging.Logger,
+    batch_size: int,
+    workers: int,
+    shards: int,
+    run_key: str,
+    file_state: Optional[Tuple[str, str, int]] = None,
+    rejects: Optional[RejectStore] = None
+) -> Tuple[int, int, int]:
+    """
+    Concurrent variant of map_and_load_sales: orders/items are sharded by customer and the shards are
+    loaded by `workers` threads, each shard committing on its own. Shards already in etl_load_checkpoint
+    for run_key are skipped, so a rerun after a failed shard only loads what is missing. The checkpoint
+    is cleared (and file_state saved) once every shard has committed.
+    Order ids are assigned per shard, not in file order.
+    Returns (orders_inserted, items_inserted, rows_dropped_for_missing_mapping).
+    """
+    ensure_etl_state_tables(engine)
+    orders_t, items_t, unmapped = map_sales_with_rejects(sales_clean, customer_map, product_map, logger, rejects)
+
+    done = fetch_load_checkpoint(engine, run_key)
+    if done:
+        logger.info(f"Resuming sharded sales load: {len(done)}/{shards} shards already committed.")
+    o_loaded = sum(o for o, _ in done.values())
+    i_loaded = sum(i for _, i in done.values())
+
+    failed: Dict[int, Exception] = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(load_sales_shard, engine, run_key, shard, orders, items, logger, batch_size, file_state is not None): shard
+            for shard, (orders, items) in enumerate(shard_sales(orders_t, items_t, shards))
+            if shard not in done
+        }
+        for future in as_completed(futures):
+            shard = futures[future]
+            try:
+                o, i = future.result()
+            except Exception as e:  # psycopg2 errors from COPY are not wrapped by SQLAlchemy
+                failed[shard] = e
+                logger.error(f"Sales shard {shard} failed and was rolled back: {e}")
+                continue
+            o_loaded += o
+            i_loaded += i
+
+    if failed:
+        raise RuntimeError(
+            f"{len(failed)} of {shards} sales shards failed ({sorted(failed)}); "
+            f"committed shards are checkpointed, rerun to load the rest."
+        )
+
+    with engine.begin() as conn:
+        if file_state is not None:
+            last = items_t.iloc[-1] if not items_t.empty else None
+            save_file_state(
+                conn, *file_state,
+                last["transaction_id"] if last is not None else None,
+                items_t["order_date"].max() if last is not None else None
+            )
+        conn.execute(text("DELETE FROM etl_load_checkpoint WHERE run_key = :run_key;"), {"run_key": run_key})
+
+    logger.info(f"Loaded {o_loaded} orders and {i_loaded} order_items in {shards} shards ({workers} workers).")
+    return o_loaded, i_loaded, unmapped
+
+
+# ---------------------------- Transform Cache ----------------------------
+
+CACHE_FORMAT_VERSION = 2
+CACHE_META_KEY = b"fleximart_transform_cache"
+
+def transform_version(fn: Callable) -> str:
+    """
+    Hash of a transform's source plus every module-level function and constant it reaches
+    (transitively, through the names its code uses), the pandas version and the cache format.
+    Editing the transform or any helper it uses therefore invalidates its cache entries.
+    """
+    module_globals = sys.modules[fn.__module__].__dict__
+    h = hashlib.sha256(f"{CACHE_FORMAT_VERSION}|{pd.__version__}".encode())
+    seen: Set[str] = set()
+    todo = [fn.__name__]
+
+    def code_names(code: types.CodeType) -> Set[str]:
+        names = set(code.co_names)
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                names |= code_names(const)
+        return names
+
+    while todo:
+        name = todo.pop()
+        if name in seen or name not in module_globals:
+            continue
+        seen.add(name)
+        obj = module_globals[name]
+        func = getattr(obj, "__wrapped__", obj)  # lru_cache
+        if isinstance(func, types.FunctionType) and func.__module__ == fn.__module__:
+            h.update(name.encode() + inspect.getsource(func).encode())
+            todo.extend(sorted(code_names(func.__code__)))
+        elif isinstance(obj, (str, int, float, tuple, set, frozenset, dict, list, re.Pattern)):
+            h.update(name.encode() + stable_repr(obj).encode())
+    return h.hexdigest()
+
+def stable_repr(obj: Any) -> str:
+    """repr() that does not depend on set iteration order (which varies with hash randomization)."""
+    if isinstance(obj, (set, frozenset)):
+        return repr(sorted(stable_repr(o) for o in obj))
+    return repr(obj)
+
+class TransformCache:
+    """
+    Content-addressed store of transform outputs: <name>-<file hash>-<transform version>.parquet,
+    with the DQ counts and original dtypes in the Parquet metadata. Least recently used entries
+    are evicted once the directory grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, logger: logging.Logger):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.logger = logger
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, name: str, file_hash: str, version: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}-{file_hash[:20]}-{version[:20]}.parquet")
+
+    def get(self, name: str, file_hash: str, version: str) -> Optional[Tuple[int, pd.DataFrame, int, int]]:
+        path = self.path_for(name, file_hash, version)
+        if not os.path.exists(path):
+            return None
+        try:
+            table = pq.read_table(path)
+            meta = json.loads(table.schema.metadata[CACHE_META_KEY])
+            df = table.to_pandas()
+        except Exception as e:  # unreadable/partial entry: drop it and recompute
+            self.logger.warning(f"Transform cache entry {path} unreadable ({e}); recomputing.")
+            os.remove(path)
+            return None
+        for col, dtype in meta["dtypes"].items():
+            if dtype == "object":
+                df[col] = df[col].astype(object).where(df[col].notna(), None)
+            elif str(df[col].dtype) != dtype:
+                df[col] = df[col].astype(dtype)
+        df.attrs.update(meta["attrs"])
+        os.utime(path)  # LRU
+        return meta["records_read"], df, meta["duplicates_removed"], meta["missing_values_handled"]
+
+    def put(self, name: str, file_hash: str, version: str, result: Tuple[int, pd.DataFrame, int, int]):
+        records_read, df, dup, miss = result
+        meta = {
+            "records_read": int(records_read), "duplicates_removed": int(dup), "missing_values_handled": int(miss),
+            "dtypes": {c: str(t) for c, t in df.dtypes.items()},
+            "attrs": df.attrs,
+        }
+        table = pyarrow.Table.from_pandas(df)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), CACHE_META_KEY: json.dumps(meta).encode()})
+        path = self.path_for(name, file_hash, version)
+        pq.write_table(table, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        self.evict(keep=path)
+
+    def evict(self, keep: Optional[str] = None):
+        entries = [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir) if f.endswith(".parquet")]
+        entries.sort(key=os.path.getmtime)
+        total = sum(os.path.getsize(e) for e in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            total -= os.path.getsize(entry)
+            os.remove(entry)
+            self.logger.info(f"Transform cache: evicted {os.path.basename(entry)}.")
+
+def load_cached_transforms(
+    cache: TransformCache,
+    plan: List[Tuple[str, str, Callable, str]],
+    file_hashes: Dict[str, str],
+    timings: List["StageTiming"],
+    logger: logging.Logger
+) -> Tuple[Dict[str, Tuple[int, pd.DataFrame, int, int]], Dict[str, Tuple[str, str]]]:
+    """
+    plan: (stage name, file path, transform, variant) per file to look up; variant identifies
+    transform arguments that change its output (e.g. the price imputers), "" for none.
+    Returns (hits: stage name -> (records_read, output, duplicates_removed, missing_handled),
+             keys: stage name -> (file hash, transform version) for every planned stage).
+    Hits are recorded in timings under the stage name, so the DAG report stays complete.
+    """
+    hits, keys = {}, {}
+    for stage_name, path, fn, variant in plan:
+        file_hash = file_hashes.get(os.path.basename(path)) or file_fingerprint(path)
+        version = transform_version(fn)
+        if variant:
+            version = hashlib.sha256(f"{version}|{variant}".encode()).hexdigest()
+        keys[stage_name] = (file_hash, version)
+        out = timed_call(cache.get, (stage_name,) + keys[stage_name])
+        if out[0] is not None:
+            hits[stage_name] = out[0]
+            timings.append(make_timing(stage_name, (), *out, rows=out[0][0]))
+            logger.info(f"{os.path.basename(path)}: transform cache hit, skipping extract/transform.")
+    return hits, keys
+
+# ---------------------------- Stage DAG (parallel extract / transform) ----------------------------
+
+@dataclass
+class Stage:
+    """
+    One node of the extract/transform DAG.
+    deps:   stage names whose results are appended to args; use (name, i, j, ...) to pass result[i][j]...
+    inline: run in the parent process (cheap glue, or needs parent-only resources such as the engine)
+    """
+    name: str
+    fn: Callable
+    args: tuple = ()
+    deps: tuple = ()
+    inline: bool = False
+
+
+@dataclass
+class StageTiming:
+    name: str
+    start: float
+    end: float
+    pid: int
+    deps: Tuple[str, ...] = field(default_factory=tuple)
+    cpu: float = 0.0
+    rows: int = 0
+    process_peak_rss_mb: Optional[float] = None  # peak of the pid that ran the stage, up to its end
+    sql_round_trips: int = 0
+    sql_seconds: float = 0.0
+
+    @property
+    def seconds(self) -> float:
+        return self.end - self.start
+
+
+def dep_name(dep) -> str:
+    return dep if isinstance(dep, str) else dep[0]
+
+def timed_call(fn: Callable, args: tuple, profile_path: Optional[str] = None) -> Tuple[Any, float, float, int, float, Optional[float]]:
+    """
+    Run fn(*args) and return (result, start, end, pid, cpu_seconds, process_peak_rss_mb).
+    Start/end are epoch times so parent and worker processes compare.
+    profile_path: run under cProfile and dump stats there (open with pstats / snakeviz).
+    """
+    start, cpu_start = time.time(), time.process_time()
+    if profile_path:
+        profiler = cProfile.Profile()
+        result = profiler.runcall(fn, *args)
+        profiler.dump_stats(profile_path)
+    else:
+        result = fn(*args)
+    return result, start, time.time(), os.getpid(), time.process_time() - cpu_start, peak_rss_mb()
+
+def profile_path_for(name: str, profile_stage: Optional[str], profile_dir: str) -> Optional[str]:
+    if not profile_stage or name != profile_stage:
+        return None
+    return os.path.join(profile_dir, f"profile_{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}.prof")
+
+def make_timing(name: str, deps: tuple, result: Any, start: float, end: float, pid: int, cpu: float,
+                rss: Optional[float], rows: Optional[int] = None) -> StageTiming:
+    return StageTiming(
+        name, start, end, pid, tuple(dep_name(d) for d in deps), cpu,
+        count_rows(result) if rows is None else rows, rss,
+        SQL_STATS.round_trips.get(name, 0), SQL_STATS.seconds.get(name, 0.0)
+    )
+
+def time_stage(
+    timings: List[StageTiming],
+    name: str,
+    deps: tuple,
+    fn: Callable,
+    *args,
+    profile_stage: Optional[str] = None,
+    profile_dir: str = "."
+) -> Any:
+    """Run one parent-process stage (e.g. a loader) with timing, SQL accounting and optional profiling."""
+    path = profile_path_for(name, profile_stage, profile_dir)
+    if path:
+        logging.getLogger("fleximart_etl").info(f"Profiling stage {name} in pid {os.getpid()} -> {path}")
+    with SQL_STATS.scope(name):
+        out = timed_call(fn, args, path)
+    timings.append(make_timing(name, deps, *out))
+    return out[0]
+
+def run_stages(
+    stages: List[Stage],
+    workers: int,
+    logger: logging.Logger,
+    profile_stage: Optional[str] = None,
+    profile_dir: str = "."
+) -> Tuple[Dict[str, Any], List[StageTiming]]:
+    """
+    Run each stage as soon as all its deps have finished.
+    workers > 1: non-inline stages run in a process pool; workers <= 1: everything runs in-process.
+    profile_stage: name of one stage to run under cProfile (its pid is logged for py-spy attach).
+    """
+    results: Dict[str, Any] = {}
+    timings: List[StageTiming] = []
+    pending = list(stages)
+    running = {}
+
+    def resolve(dep):
+        if isinstance(dep, str):
+            return results[dep]
+        value = results[dep[0]]
+        for key in dep[1:]:
+            value = value[key]
+        return value
+
+    def finish(st: Stage, out: tuple):
+        results[st.name] = out[0]
+        timings.append(make_timing(st.name, st.deps, *out))
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while pending or running:
+            ready = [st for st in pending if all(dep_name(d) in results for d in st.deps)]
+            for st in ready:
+                pending.remove(st)
+                args = st.args + tuple(resolve(d) for d in st.deps)
+                path = profile_path_for(st.name, profile_stage, profile_dir)
+                if path:
+                    logger.info(f"Profiling stage {st.name} -> {path}")
+                if pool is None or st.inline:
+                    with SQL_STATS.scope(st.name):
+                        finish(st, timed_call(st.fn, args, path))
+                else:
+                    running[pool.submit(timed_call, st.fn, args, path)] = st
+            if ready:
+                continue
+            if not running:
+                raise ValueError(f"Stage DAG has unsatisfiable dependencies: {[st.name for st in pending]}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                finish(running.pop(fut), fut.result())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    return results, timings
+
+def critical_path(timings: List[StageTiming]) -> List[StageTiming]:
+    """Walk back from the last stage to finish, always through the dep that finished last."""
+    if not timings:
+        return []
+    by_name = {t.name: t for t in timings}
+    path = [max(timings, key=lambda t: t.end)]
+    while True:
+        deps = [by_name[d] for d in path[-1].deps if d in by_name]
+        if not deps:
+            break
+        path.append(max(deps, key=lambda t: t.end))
+    return path[::-1]
+
+def log_stage_timings(timings: List[StageTiming], logger: logging.Logger):
+    """Per-stage wall/CPU time, rows/sec, peak RSS and SQL usage, plus the critical path through the DAG."""
+    if not timings:
+        return
+    t0 = min(t.start for t in timings)
+
+    logger.info("Stage timings (seconds from pipeline start):")
+    for t in sorted(timings, key=lambda t: t.start):
+        rate = f"{t.rows / t.seconds:,.0f}" if t.seconds > 0 else "-"
+        rss = f"{t.process_peak_rss_mb:.0f}MB" if t.process_peak_rss_mb is not None else "n/a"
+        logger.info(
+            f"  {t.name:<22} start={t.start - t0:8.3f}  took={t.seconds:8.3f}  cpu={t.cpu:8.3f}  "
+            f"rows={t.rows:<9} rows/s={rate:<10} proc_peak_rss={rss:<7} sql={t.sql_round_trips}/{t.sql_seconds:.3f}s  pid={t.pid}"
+        )
+
+    path = critical_path(timings)
+    logger.info(f"Critical path ({path[-1].end - t0:.3f}s): " + " -> ".join(t.name for t in path))
+
+def extract_transform(path: str, transform: Callable, logger: logging.Logger, *transform_args) -> Tuple[int, pd.DataFrame, int, int]:
+    """Read + transform one dimension file. Returns (records_read, transformed, duplicates_removed, missing_handled)."""
+    raw = safe_read_csv(path, logger)
+    transformed, dup, miss = transform(raw, logger, *transform_args)
+    return len(raw), transformed, dup, miss
+
+def prepare_sales_partitions(
+    n_parts: int,
+    bind: Optional[Engine],
+    raw: pd.DataFrame
+) -> Tuple[List[pd.DataFrame], int, int]:
+    """
+    Split raw sales into n_parts by hash of the normalized transaction_id, so every duplicate of a
+    transaction lands in the same partition and per-partition dedupe is exact. Row index is kept
+    so the cleaned partitions can be put back into file order.
+    bind: when given (incremental runs), rows already loaded by earlier runs are removed first.
+    Returns (partitions, records_read, skipped_already_loaded).
+    """
+    records_read, skipped = len(raw), 0
+    if bind is not None:
+        with bind.begin() as conn:
+            raw, skipped = drop_loaded_sales(conn, raw)
+    if n_parts <= 1:
+        return [raw], records_read, skipped
+    tx = normalize_nulls(raw["transaction_id"]).fillna("").astype(str)
+    part = pd.util.hash_array(tx.to_numpy(dtype=object)) % n_parts
+    return [raw[part == i] for i in range(n_parts)], records_read, skipped
+
+def clean_sales_partition(
+    logger: logging.Logger,
+    rejects: Optional[RejectStore],
+    part: pd.DataFrame
+) -> Tuple[pd.DataFrame, int, int]:
+    writer = rejects.writer("sales_raw.csv") if rejects is not None else None
+    result = clean_sales(part, logger, reject_writer=writer)
+    if writer is not None:
+        writer.close()
+    return result
+
+def join_sales_partitions(*cleaned: Tuple[pd.DataFrame, int, int]) -> Tuple[pd.DataFrame, int, int]:
+    """Concatenate clean_sales outputs back into original file order and add up their DQ counts."""
+    df = pd.concat([c[0] for c in cleaned]).sort_index(kind="mergesort")
+    return df, sum(c[1] for c in cleaned), sum(c[2] for c in cleaned)
+
+def build_extract_transform_stages(
+    customers_path: Optional[str],
+    products_path: Optional[str],
+    sales_path: Optional[str],
+    sales_partitions: int,
+    incremental_bind: Optional[Engine],
+    logger: logging.Logger,
+    price_imputers: Optional[Sequence[PriceImputer]] = None,
+    sales_categorical: Sequence[str] = (),
+    rejects: Optional[RejectStore] = None,
+    key_indexes: Optional[Tuple[KeyIndex, KeyIndex]] = None
+) -> List[Stage]:
+    """
+    customers, products and sales cleaning are independent; they only meet at the ID-mapping step,
+    which runs after the dimension loads. Pass None for a file that should not be processed.
+    price_imputers: strategies for transform_products (None: its default); must be picklable for workers.
+    sales_categorical: sales columns read as categoricals (SALES_CATEGORICAL_COLUMNS for compact frames).
+    rejects: where every transform writes the rows it drops (None: rejects are only counted).
+    key_indexes: (customer, product) KeyIndex; cleaned sales are mapped against the keys earlier runs
+                 recorded in a premap_sales stage (skipped while both indexes are empty, i.e. on a first run).
+                 Like every stage here it finishes before the dimension loads start.
+    """
+    stages: List[Stage] = []
+    if customers_path:
+        stages.append(Stage("customers", extract_transform, (customers_path, transform_customers, logger, rejects)))
+    if products_path:
+        stages.append(Stage("products", extract_transform, (products_path, transform_products, logger, price_imputers, rejects)))
+    if sales_path:
+        n = max(sales_partitions, 1)
+        stages.append(Stage("extract_sales", safe_read_csv, (sales_path, logger, None, sales_categorical)))
+        stages.append(Stage("prepare_sales", prepare_sales_partitions, (n, incremental_bind), ("extract_sales",), inline=True))
+        for i in range(n):
+            stages.append(Stage(f"clean_sales[{i}]", clean_sales_partition, (logger, rejects), (("prepare_sales", 0, i),)))
+        stages.append(Stage("join_sales", join_sales_partitions, (), tuple(f"clean_sales[{i}]" for i in range(n)), inline=True))
+        if key_indexes is not None and any(len(ix) for ix in key_indexes):
+            stages.append(Stage("premap_sales", premap_sales_keys, tuple(key_indexes), (("join_sales", 0),)))
+    return stages
+
+
 # ---------------------------- Report ----------------------------
 
 def write_report(path: str, metrics: List[DQMetrics], logger: logging.Logger):
@@ -527,6 +2546,14 @@ def write_report(path: str, metrics: List[DQMetrics], logger: logging.Logger):
         lines.append(f"  Number of duplicates removed:     {m.duplicates_removed}")
         lines.append(f"  Number of missing values handled: {m.missing_values_handled}")
         lines.append(f"  Number loaded successfully:       {m.records_loaded_successfully}")
+        if m.records_skipped_unchanged:
+            lines.append(f"  Number skipped (already loaded):  {m.records_skipped_unchanged}")
+        for strategy, count in m.values_imputed.items():
+            lines.append(f"  Values imputed ({strategy}):".ljust(35) + f" {count}")
+        for reason, count in m.rejects.items():
+            lines.append(f"  Rejected ({reason}):".ljust(35) + f" {count}")
+            for sample in m.reject_samples.get(reason, []):
+                lines.append(f"    e.g. {json.dumps(sample, default=str)}")
         lines.append("")
 
     with open(path, "w", encoding="utf-8") as f:
@@ -544,13 +2571,44 @@ def main():
     raw_dir = os.getenv("RAW_DIR", "./data/raw").strip()
     report_path = os.getenv("REPORT_PATH", "./data_quality_report.txt").strip()
     log_path = os.getenv("LOG_PATH", "./etl.log").strip()
+    load_mode = os.getenv("LOAD_MODE", "bulk").strip().lower()
+    batch_size = int(os.getenv("LOAD_BATCH_SIZE", "10000"))
+    sales_chunk_size = int(os.getenv("SALES_CHUNK_SIZE", "0"))
+    incremental = os.getenv("INCREMENTAL", "0").strip().lower() in ("1", "true", "yes")
+    etl_workers = int(os.getenv("ETL_WORKERS", "1"))
+    sales_partitions = int(os.getenv("SALES_PARTITIONS", "1"))
+    metrics_path = os.getenv("METRICS_PATH", "").strip() or os.path.join(os.path.dirname(report_path) or ".", "etl_metrics.json")
+    metrics_dir = os.path.dirname(metrics_path) or "."
+    profile_stage = os.getenv("PROFILE_STAGE", "").strip() or None
+    cache_dir = os.getenv("ETL_CACHE_DIR", "").strip()
+    cache_max_mb = int(os.getenv("ETL_CACHE_MAX_MB", "1024"))
+    price_imputation = os.getenv("PRICE_IMPUTATION", "").strip()
+    load_workers = int(os.getenv("LOAD_WORKERS", "1"))
+    sales_frame = os.getenv("SALES_FRAME", "object").strip().lower()
+    load_shards = int(os.getenv("LOAD_SHARDS", "0")) or 4 * load_workers
+    rejects_dir = os.getenv("REJECTS_DIR", "").strip()
+    rejects_sample_size = int(os.getenv("REJECTS_SAMPLE_SIZE", "5"))
+    rejects_buffer_rows = int(os.getenv("REJECTS_BUFFER_ROWS", "10000"))
+    key_map_dir = os.getenv("KEY_MAP_DIR", "").strip()
 
     logger = setup_logger(log_path)
 
     if not db_url:
         raise ValueError("DB_URL is missing in .env")
-
-    engine = get_engine(db_url)
+    if load_mode not in LOAD_MODES:
+        raise ValueError(f"LOAD_MODE must be one of {LOAD_MODES}, got {load_mode!r}")
+    if sales_chunk_size > 0 and load_mode != "bulk":
+        raise ValueError("SALES_CHUNK_SIZE streaming loads through COPY only; use LOAD_MODE=bulk with it")
+    if sales_frame not in SALES_FRAME_MODES:
+        raise ValueError(f"SALES_FRAME must be one of {SALES_FRAME_MODES}, got {sales_frame!r}")
+    sales_categorical = SALES_CATEGORICAL_COLUMNS if sales_frame == "compact" else ()
+
+    engine = get_engine(db_url, pool_size=max(5, load_workers))
+    rejects = None
+    if rejects_dir:
+        run_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        rejects = RejectStore(rejects_dir, run_id, rejects_buffer_rows, rejects_sample_size)
+        logger.info(f"Rejected rows are written to: {rejects.run_dir}")
 
     customers_path = os.path.join(raw_dir, "customers_raw.csv")
     products_path = os.path.join(raw_dir, "products_raw.csv")
@@ -559,42 +2617,183 @@ def main():
     metrics = [DQMetrics("customers_raw.csv"), DQMetrics("products_raw.csv"), DQMetrics("sales_raw.csv")]
 
     try:
-        # Extract
-        customers_raw = safe_read_csv(customers_path, logger)
-        products_raw = safe_read_csv(products_path, logger)
-        sales_raw = safe_read_csv(sales_path, logger)
-
-        metrics[0].records_read = len(customers_raw)
-        metrics[1].records_read = len(products_raw)
-        metrics[2].records_read = len(sales_raw)
-
-        # Transform
-        customers_t, c_dup, c_miss = transform_customers(customers_raw, logger)
-        products_t, p_dup, p_miss = transform_products(products_raw, logger)
-
-        metrics[0].duplicates_removed = c_dup
-        metrics[0].missing_values_handled = c_miss
-        metrics[1].duplicates_removed = p_dup
-        metrics[1].missing_values_handled = p_miss
+        if incremental:
+            ensure_etl_state_tables(engine)
+            previous_hashes = fetch_file_hashes(engine)
+            file_hashes = {m.file_name: file_fingerprint(os.path.join(raw_dir, m.file_name)) for m in metrics}
+            unchanged_files = {name for name, h in file_hashes.items() if previous_hashes.get(name) == h}
+            for name in sorted(unchanged_files):
+                logger.info(f"{name}: unchanged since last run (hash match), skipping extract/transform/load.")
+        else:
+            file_hashes, unchanged_files = {}, set()
+
+        price_imputers = parse_price_imputers(price_imputation, engine) if price_imputation else None
+
+        # Persistent key maps: sales are premapped against the ids of earlier runs in the transform stages
+        key_maps = KeyMapStore(key_map_dir) if key_map_dir else None
+        key_indexes = None
+        if key_maps is not None:
+            ensure_key_map_table(engine)
+            key_indexes = (key_maps.sync(engine, metrics[0].file_name), key_maps.sync(engine, metrics[1].file_name))
+
+        stream_sales = sales_chunk_size > 0
+        todo = {
+            "customers": metrics[0].file_name not in unchanged_files,
+            "products": metrics[1].file_name not in unchanged_files,
+            "sales": metrics[2].file_name not in unchanged_files and not stream_sales,
+        }
+
+        # Transform cache: outputs of unchanged inputs + unchanged transform code are reused as is.
+        # Cleaned sales are only cached for full runs (incremental runs filter them against the DB first).
+        cache_hits, cache_keys, cache_timings = {}, {}, []
+        if cache_dir and pq is None:
+            logger.warning("ETL_CACHE_DIR is set but pyarrow is not installed; transform cache disabled.")
+        elif cache_dir:
+            cache = TransformCache(cache_dir, cache_max_mb * 1024 * 1024, logger)
+            plan = [
+                (name, path, fn, variant) for name, path, fn, variant, enabled in (
+                    ("customers", customers_path, transform_customers, "", todo["customers"]),
+                    ("products", products_path, transform_products,
+                     imputers_fingerprint(price_imputers) if price_imputers is not None else "", todo["products"]),
+                    ("join_sales", sales_path, clean_sales, ",".join(sales_categorical), todo["sales"] and not incremental),
+                ) if enabled
+            ]
+            cache_hits, cache_keys = load_cached_transforms(cache, plan, file_hashes, cache_timings, logger)
+            if rejects is not None and cache_hits:
+                logger.info(f"Cached transforms are not re-run, so no rejects are written for: {sorted(cache_hits)}")
+
+        # Extract + transform: independent stages, optionally in a process pool
+        stages = build_extract_transform_stages(
+            customers_path if todo["customers"] and "customers" not in cache_hits else None,
+            products_path if todo["products"] and "products" not in cache_hits else None,
+            sales_path if todo["sales"] and "join_sales" not in cache_hits else None,
+            sales_partitions,
+            engine if incremental else None,
+            logger,
+            price_imputers,
+            sales_categorical,
+            rejects,
+            key_indexes
+        )
+        results, timings = run_stages(stages, etl_workers, logger, profile_stage, metrics_dir)
+        timings = cache_timings + timings
+
+        for name, (file_hash, version) in cache_keys.items():
+            if name in cache_hits:
+                continue
+            result = results[name] if name != "join_sales" else (results["prepare_sales"][1],) + results["join_sales"]
+            cache.put(name, file_hash, version, result)
+        results.update({k: v for k, v in cache_hits.items() if k != "join_sales"})
+        if "join_sales" in cache_hits:
+            s_read, s_df, s_dup_cached, s_miss_cached = cache_hits["join_sales"]
+            results["prepare_sales"] = (None, s_read, 0)
+            results["join_sales"] = (s_df, s_dup_cached, s_miss_cached)
 
         # Load customers/products and build mapping from source keys (C001/P001) -> DB ids
-        customer_map = load_customers_and_build_map(engine, customers_t, logger)
-        product_map = load_products_and_build_map(engine, products_t, logger)
+        dimension_steps = [
+            (metrics[0], "customers", load_customers_and_build_map, "customer_id"),
+            (metrics[1], "products", load_products_and_build_map, "product_id"),
+        ]
+        maps = []
+        for m, stage_name, loader, key_col in dimension_steps:
+            if m.file_name in unchanged_files:
+                key_map = fetch_key_map(engine, m.file_name)
+                m.records_skipped_unchanged = len(key_map)
+                maps.append(key_map)
+                continue
 
-        metrics[0].records_loaded_successfully = len(customer_map)
-        metrics[1].records_loaded_successfully = len(product_map)
+            m.records_read, transformed, m.duplicates_removed, m.missing_values_handled = results[stage_name]
+            m.values_imputed = dict(transformed.attrs.get("price_imputed", {}))
+
+            if incremental:
+                key_map, m.records_skipped_unchanged = time_stage(
+                    timings, f"load_{stage_name}", (stage_name,), load_dimension_incremental,
+                    engine, m.file_name, transformed, key_col, loader, logger, load_mode, batch_size,
+                    profile_stage=profile_stage, profile_dir=metrics_dir
+                )
+                save_file_state(engine, m.file_name, file_hashes[m.file_name], m.records_read)
+            else:
+                key_map = time_stage(
+                    timings, f"load_{stage_name}", (stage_name,), loader,
+                    engine, transformed, logger, load_mode, batch_size,
+                    profile_stage=profile_stage, profile_dir=metrics_dir
+                )
+            m.records_loaded_successfully = len(key_map)
+            maps.append(key_map)
+
+        customer_map, product_map = maps
+        load_deps = tuple(t.name for t in timings if t.name in ("load_customers", "load_products"))
+        key_changes = ({}, {})
+        if key_maps is not None:
+            key_changes = time_stage(
+                timings, "update_key_maps", load_deps, update_key_maps,
+                key_maps, engine, {metrics[0].file_name: customer_map, metrics[1].file_name: product_map},
+                profile_stage=profile_stage, profile_dir=metrics_dir
+            )
+            timings[-1].rows = len(key_changes[0]) + len(key_changes[1])
+            logger.info(f"Key maps: {len(key_changes[0])} customer / {len(key_changes[1])} product keys new or re-pointed.")
+
+        # Sales -> orders/items
+        s_dup = s_miss = o_loaded = i_loaded = 0
+        if metrics[2].file_name in unchanged_files:
+            pass
+        elif stream_sales:
+            # Streaming mode: transform + load sales chunk by chunk (bounded memory)
+            with engine.begin() as conn:
+                s_read, s_dup, s_miss, o_loaded, i_loaded, s_skipped = time_stage(
+                    timings, "stream_sales", load_deps, stream_sales_to_orders,
+                    conn, sales_path, customer_map, product_map, logger, sales_chunk_size, batch_size, incremental,
+                    sales_categorical, rejects,
+                    (metrics[2].file_name, file_hashes[metrics[2].file_name]) if incremental else None,
+                    profile_stage=profile_stage, profile_dir=metrics_dir
+                )
+            timings[-1].rows = s_read
+            metrics[2].records_read = s_read
+            metrics[2].records_skipped_unchanged = s_skipped
+        else:
+            _, metrics[2].records_read, metrics[2].records_skipped_unchanged = results["prepare_sales"]
+            sales_clean, s_dup, s_miss = results["join_sales"]
+            if key_maps is not None and any(len(ix) for ix in key_indexes):
+                # on a first run nothing was premapped and every key is "changed": plain mapping is cheaper
+                premapped = results.get("premap_sales")
+                if premapped is None:  # cleaned sales came from the transform cache
+                    premapped = premap_sales_keys(*key_indexes, sales_clean)
+                sales_clean = apply_premapped_keys(sales_clean, premapped, *key_changes)
+            file_state = (metrics[2].file_name, file_hashes[metrics[2].file_name], metrics[2].records_read) if incremental else None
+
+            if load_workers > 1 and load_mode == "bulk":
+                sales_hash = file_hashes.get(metrics[2].file_name) or file_fingerprint(sales_path)
+                o_loaded, i_loaded, unmapped = time_stage(
+                    timings, "map_and_load_sales", ("join_sales",) + load_deps, map_and_load_sales_sharded,
+                    engine, sales_clean, customer_map, product_map, logger, batch_size, load_workers, load_shards,
+                    sales_load_run_key(sales_hash, load_shards), file_state, rejects,
+                    profile_stage=profile_stage, profile_dir=metrics_dir
+                )
+            else:
+                o_loaded, i_loaded, unmapped = time_stage(
+                    timings, "map_and_load_sales", ("join_sales",) + load_deps, map_and_load_sales,
+                    engine, sales_clean, customer_map, product_map, logger, load_mode, batch_size, file_state, rejects,
+                    profile_stage=profile_stage, profile_dir=metrics_dir
+                )
+            timings[-1].rows = len(sales_clean)
+            s_miss += unmapped
+
+        if rejects is not None:
+            summary = rejects.summary()
+            for m in metrics:
+                reasons = summary.get(m.file_name, {})
+                m.rejects = {reason: r["count"] for reason, r in reasons.items()}
+                m.reject_samples = {reason: r["samples"] for reason, r in reasons.items()}
+
+        log_stage_timings(timings, logger)
 
-        # Sales -> orders/items transform using mapping
-        orders_t, items_t, s_dup, s_miss = transform_sales_to_orders(sales_raw, customer_map, product_map, logger)
         metrics[2].duplicates_removed = s_dup
         metrics[2].missing_values_handled = s_miss
-
-        # Load orders/items
-        o_loaded, i_loaded = load_orders_and_items(engine, orders_t, items_t, logger)
         # For sales file, count inserted rows as orders+items (or you can change to just items if you prefer)
         metrics[2].records_loaded_successfully = o_loaded + i_loaded
 
         # Report
+        write_metrics_json(metrics_path, timings, metrics, logger)
         write_report(report_path, metrics, logger)
         logger.info("ETL Completed Successfully.")
 
@@ -0,0 +1,17 @@
+-- 001_products_name_category_unique.sql (PostgreSQL)
+-- Supports the product merge in etl_pipeline.py:
+-- - lookups by (product_name, category) become index scans
+-- - the bulk merge can use INSERT ... ON CONFLICT (product_name, category)
+--
+-- Run with psql (CONCURRENTLY cannot run inside a transaction block):
+--   psql -d fleximart -f part1-database-etl/migrations/001_products_name_category_unique.sql
+
+-- 1) Check for existing duplicates first - the index build fails if any are returned
+SELECT product_name, category, COUNT(*) AS copies, MIN(product_id) AS keep_product_id
+FROM products
+GROUP BY product_name, category
+HAVING COUNT(*) > 1;
+
+-- 2) Unique index on the natural key (name must match etl_pipeline.py)
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_products_name_category
+    ON products (product_name, category);
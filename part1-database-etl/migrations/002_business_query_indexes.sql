@@ -0,0 +1,33 @@
+-- 002_business_query_indexes.sql (PostgreSQL)
+-- Covering indexes for the access paths in business_queries.sql and the ETL:
+-- - orders (customer_id)         Query 1: customers -> orders (order_id via INCLUDE)
+-- - orders (order_date)          Query 3: 2024 range scan, index-only (order_id via INCLUDE)
+-- - order_items (order_id)       Query 1 / 3: orders -> order_items (product_id, quantity, subtotal via INCLUDE);
+--                                also backs the order_items -> orders foreign key
+-- - order_items (product_id)     Query 2: products -> order_items (quantity, subtotal via INCLUDE); also backs
+--                                the order_items -> products foreign key
+-- The (product_name, category) lookup in load_products_and_build_map uses uq_products_name_category (001).
+--
+-- Queries 1 and 2 aggregate over every row, so on a full table the planner may still prefer hash joins over
+-- sequential scans; the indexes pay off for filtered variants (one customer / product / date range) and for
+-- deletes and updates that check the foreign keys.
+--
+-- Run after 001, with psql (CONCURRENTLY cannot run inside a transaction block):
+--   psql -d fleximart -f part1-database-etl/migrations/002_business_query_indexes.sql
+-- Check the effect with benchmarks/bench_queries.py (EXPLAIN ANALYZE before/after on generated data).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_customer_id
+    ON orders (customer_id) INCLUDE (order_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_order_date
+    ON orders (order_date) INCLUDE (order_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_order_items_order_id
+    ON order_items (order_id) INCLUDE (product_id, quantity, subtotal);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_order_items_product_id
+    ON order_items (product_id) INCLUDE (quantity, subtotal);
+
+-- Fresh statistics so the planner costs the new paths correctly
+ANALYZE orders;
+ANALYZE order_items;
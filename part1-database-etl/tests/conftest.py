@@ -0,0 +1,86 @@
+"""
+Shared fixtures. Tests that load into PostgreSQL need a database they may create schemas in:
+    TEST_DB_URL=postgresql+psycopg2://postgres:<PASSWORD>@localhost:5432/fleximart_test
+and are skipped without it. Each test gets fresh schemas with the Part 1 tables (dropped afterwards).
+"""
+
+import os
+import shutil
+import sys
+import uuid
+
+import pytest
+from sqlalchemy import make_url
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, os.path.join(HERE, "..", "benchmarks"))
+
+from bench_etl import BENCH_SCHEMA_DDL, get_engine_with_schema  # noqa: E402
+from etl_pipeline import get_engine  # noqa: E402
+
+RAW_DIR = os.path.join(HERE, "..", "..", "data", "raw")
+
+
+@pytest.fixture
+def make_pg_schema():
+    """make_pg_schema() -> (engine bound to a fresh schema, DB_URL that main() can use for the same schema)."""
+    base_url = os.getenv("TEST_DB_URL", "").strip()
+    if not base_url:
+        pytest.skip("TEST_DB_URL is not set")
+    created = []
+
+    def make():
+        schema = f"etl_test_{uuid.uuid4().hex[:12]}"
+        engine = get_engine_with_schema(base_url, schema)
+        created.append((schema, engine))
+        with engine.begin() as conn:
+            conn.exec_driver_sql(BENCH_SCHEMA_DDL.format(schema=schema))
+        db_url = make_url(base_url).update_query_dict({"options": f"-csearch_path={schema}"})
+        return engine, db_url.render_as_string(hide_password=False)
+
+    yield make
+    admin = get_engine(base_url)
+    with admin.begin() as conn:
+        for schema, engine in created:
+            engine.dispose()
+            conn.exec_driver_sql(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+    admin.dispose()
+
+
+@pytest.fixture
+def pg_schema(make_pg_schema):
+    return make_pg_schema()
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    """Copy of data/raw that a test may edit."""
+    out = tmp_path / "raw"
+    shutil.copytree(RAW_DIR, out)
+    return out
+
+
+@pytest.fixture
+def run_etl(tmp_path, monkeypatch):
+    """run_etl(db_url, raw_dir, **env): etl_pipeline.main() with its outputs under tmp_path (env only applies to this run)."""
+    import etl_pipeline
+    extras = set()
+
+    def run(db_url: str, raw_dir, **env):
+        for key in extras - set(env):
+            monkeypatch.delenv(key, raising=False)
+        extras.update(env)
+        settings = {
+            "DB_URL": db_url,
+            "RAW_DIR": str(raw_dir),
+            "REPORT_PATH": str(tmp_path / "data_quality_report.txt"),
+            "LOG_PATH": str(tmp_path / "etl.log"),
+            "METRICS_PATH": str(tmp_path / "etl_metrics.json"),
+            **{k: str(v) for k, v in env.items()},
+        }
+        for key, value in settings.items():
+            monkeypatch.setenv(key, value)
+        etl_pipeline.main()
+
+    return run
@@ -0,0 +1,77 @@
+"""
+Vectorized cleaning kernels must return exactly what the scalar helpers they replace return
+(value for value, None for missing). Run from project root:
+    python -m pytest part1-database-etl/tests
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from etl_pipeline import (  # noqa: E402
+    normalize_null,
+    normalize_nulls,
+    standardize_categories,
+    standardize_category,
+    standardize_phone,
+    standardize_phones,
+)
+
+TEXT_VALUES = ["Rahul", "  Priya ", "nan", "NaN", "none", "None", "null", "NULL", "", "   ", "Mumbai", None]
+PHONE_VALUES = [
+    "9876543210", "-9988776564", "+91 98765 43210", "919812345678", "98765-43210", "9.87654321E9",
+    "12345", "", "NULL", "  9123456789  ", "(91) 9000000001", "0919812345678", "abc", None,
+]
+CATEGORY_VALUES = [
+    "Electronics", "electronics", "ELECTRONICS", "fashion", " Fashion ", "groceries",
+    "home & kitchen", "HOME & KITCHEN", "", "null", "None", None,
+]
+
+
+def scalar_result(values: pd.Series, fn) -> list:
+    out = values.apply(fn)
+    return out.astype(object).where(out.notna(), None).tolist()
+
+
+@pytest.mark.parametrize("dtype", [object, str])
+@pytest.mark.parametrize("scalar_fn, vector_fn, values", [
+    (normalize_null, normalize_nulls, TEXT_VALUES),
+    (standardize_phone, standardize_phones, PHONE_VALUES),
+    (standardize_category, standardize_categories, CATEGORY_VALUES),
+])
+def test_kernel_matches_scalar_helper(scalar_fn, vector_fn, values, dtype):
+    series = pd.Series(values, dtype=dtype)
+    assert vector_fn(series).tolist() == scalar_result(series, scalar_fn)
+
+
+@pytest.mark.parametrize("vector_fn, values", [
+    (normalize_nulls, TEXT_VALUES),
+    (standardize_phones, PHONE_VALUES),
+])
+def test_missing_values_come_back_as_none(vector_fn, values):
+    out = vector_fn(pd.Series(values, dtype=object))
+    assert out.dtype == object
+    assert all(v is None or isinstance(v, str) for v in out)
+
+
+def test_normalize_nulls_keeps_categoricals_categorical():
+    series = pd.Series(TEXT_VALUES, dtype="category")
+    out = normalize_nulls(series)
+    assert isinstance(out.dtype, pd.CategoricalDtype)
+    assert out.astype(object).where(out.notna(), None).tolist() == scalar_result(series.astype(object), normalize_null)
+
+
+def test_kernels_keep_the_index():
+    series = pd.Series(PHONE_VALUES, index=range(100, 100 + len(PHONE_VALUES)), dtype=object)
+    for kernel in (normalize_nulls, standardize_phones, standardize_categories):
+        assert kernel(series).index.equals(series.index)
+
+
+def test_empty_column():
+    empty = pd.Series([], dtype=object)
+    for kernel in (normalize_nulls, standardize_phones, standardize_categories):
+        assert kernel(empty).tolist() == []
@@ -0,0 +1,61 @@
+"""
+parse_dates_to_yyyy_mm_dd must return exactly what parse_date_to_yyyy_mm_dd returns for every value.
+Run from project root:
+    python -m pytest part1-database-etl/tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from etl_pipeline import parse_date_to_yyyy_mm_dd, parse_dates_to_yyyy_mm_dd  # noqa: E402
+
+DATE_CASES = {
+    "iso": ["2024-01-15", "2024-1-5", "2023-12-31", "2024-02-29", "2023-02-29", "2024-13-01", "2024-00-10"],
+    "month_first": ["1/15/2024", "12/31/2023", "02/29/2024", "2/30/2024", "1/5/2024"],
+    "day_first": ["15/04/2023", "31/12/2023", "29/02/2024", "30/02/2024", "13/13/2024"],
+    "ambiguous": ["03/04/2024", "3/4/2024", "12/11/2023", "01/01/2024", "11/12/2023"],
+    "other_formats": [
+        "2024/01/15", "15-01-2024", "01-15-2024", "Jan 15 2024", "15 January 2024", "2024-01-15 10:30:00",
+        "2024-01-15T10:30:00Z", "20240115", "1/15/24", "15/1/24", "0999-01-01", "5/6/0024",
+    ],
+    "blank_and_null": ["", "   ", None, np.nan, "nan", "NaN", "None", "null", "NULL"],
+    "garbage": ["abc", "not a date", "32/32/2024", "2024-99-99", "1/2", "??/??/????", "12345"],
+    "padded": ["  2024-01-15 ", "\t1/15/2024", "15/04/2023  "],
+}
+
+
+def scalar_result(values: pd.Series) -> list:
+    out = values.apply(parse_date_to_yyyy_mm_dd)
+    return out.astype(object).where(out.notna(), None).tolist()
+
+
+@pytest.mark.parametrize("dtype", [object, str])
+@pytest.mark.parametrize("case", sorted(DATE_CASES))
+def test_column_parser_matches_scalar_parser(case, dtype):
+    values = pd.Series(DATE_CASES[case], dtype=dtype)
+    assert parse_dates_to_yyyy_mm_dd(values).tolist() == scalar_result(values)
+
+
+def test_repeated_values_and_index_are_kept():
+    """Each distinct value is parsed once (factorize + cache); the result still lines up row by row."""
+    distinct = [v for values in DATE_CASES.values() for v in values]
+    rng = np.random.default_rng(7)
+    values = pd.Series([distinct[i] for i in rng.integers(0, len(distinct), 5000)], dtype=object)
+    values.index = values.index * 3 + 11
+
+    out = parse_dates_to_yyyy_mm_dd(values)
+    assert out.index.equals(values.index)
+    assert out.tolist() == scalar_result(values)
+    # second call goes through the warm cache
+    assert parse_dates_to_yyyy_mm_dd(values).tolist() == out.tolist()
+
+
+def test_empty_column():
+    out = parse_dates_to_yyyy_mm_dd(pd.Series([], dtype=object))
+    assert out.empty and out.dtype == object
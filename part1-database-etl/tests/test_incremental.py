@@ -0,0 +1,59 @@
+"""
+INCREMENTAL=1: an unchanged file is skipped by its hash, a changed sales file only loads the
+transaction_ids no earlier run loaded. Needs TEST_DB_URL (see conftest.py).
+"""
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from test_load_modes import table_contents
+from test_streaming import sales_metrics
+
+CHUNK_SIZES = pytest.mark.parametrize("chunk_size", [0, 5], ids=["in_memory", "streamed"])
+
+
+def row_counts(engine) -> dict:
+    with engine.connect() as conn:
+        return {
+            table: conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+            for table in ("customers", "products", "orders", "order_items")
+        }
+
+
+@CHUNK_SIZES
+def test_rerun_with_unchanged_files_loads_nothing(pg_schema, raw_dir, run_etl, tmp_path, chunk_size):
+    engine, db_url = pg_schema
+    run_etl(db_url, raw_dir, INCREMENTAL=1, SALES_CHUNK_SIZE=chunk_size)
+    before = table_contents(engine)
+
+    run_etl(db_url, raw_dir, INCREMENTAL=1, SALES_CHUNK_SIZE=chunk_size)
+
+    assert table_contents(engine) == before
+    sales = sales_metrics(tmp_path)
+    assert (sales["records_read"], sales["records_loaded_successfully"]) == (0, 0)
+    with engine.connect() as conn:
+        files = conn.execute(text("SELECT file_name FROM etl_file_state ORDER BY 1")).scalars().all()
+    assert files == ["customers_raw.csv", "products_raw.csv", "sales_raw.csv"]
+
+
+@CHUNK_SIZES
+def test_rerun_with_appended_sales_loads_only_new_rows(pg_schema, raw_dir, run_etl, tmp_path, chunk_size):
+    engine, db_url = pg_schema
+    run_etl(db_url, raw_dir, INCREMENTAL=1, SALES_CHUNK_SIZE=chunk_size)
+    before = row_counts(engine)
+
+    path = raw_dir / "sales_raw.csv"
+    sales = pd.read_csv(path, dtype=str, keep_default_na=False)
+    new_row = sales[sales["transaction_id"] == "T001"].assign(transaction_id="T999", transaction_date="2024-06-30")
+    pd.concat([sales, new_row]).to_csv(path, index=False)
+    run_etl(db_url, raw_dir, INCREMENTAL=1, SALES_CHUNK_SIZE=chunk_size)
+
+    after = row_counts(engine)
+    assert after == {**before, "orders": before["orders"] + 1, "order_items": before["order_items"] + 1}
+    assert sales_metrics(tmp_path)["records_skipped_unchanged"] >= before["order_items"]
+    with engine.connect() as conn:
+        last_date = conn.execute(text("""
+            SELECT last_order_date FROM etl_file_state WHERE file_name = 'sales_raw.csv'
+        """)).scalar()
+    assert str(last_date) == "2024-06-30"
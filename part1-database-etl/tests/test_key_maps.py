@@ -0,0 +1,70 @@
+"""
+KeyMapStore: the source_key -> id maps persisted in etl_key_map and the mmap KeyIndex files must give
+the same ids after the store is reopened, and KEY_MAP_DIR runs must load what plain runs load.
+Needs TEST_DB_URL (see conftest.py).
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from etl_pipeline import KeyMapStore, ensure_key_map_table
+from test_load_modes import table_contents
+
+NAMESPACE = "customers_raw.csv"
+
+
+def lookup(store: KeyMapStore, keys: list) -> list:
+    ids = store.index(NAMESPACE).lookup(pd.Series(keys, dtype=object))
+    return [None if np.isnan(v) else int(v) for v in ids]
+
+
+def test_index_lookup_after_reopening_the_store(pg_schema, tmp_path):
+    engine, _ = pg_schema
+    ensure_key_map_table(engine)
+    directory = str(tmp_path / "key_maps")
+
+    _, changes = KeyMapStore(directory).update(engine, NAMESPACE, {"C001": 1, "C002": 2, "C003": 3})
+    assert changes == {"C001": 1, "C002": 2, "C003": 3}
+
+    reopened = KeyMapStore(directory)
+    assert len(reopened.index(NAMESPACE)) == 3
+    assert lookup(reopened, ["C003", "C001", "C999", None, "C001"]) == [3, 1, None, None, 1]
+
+    # unchanged pairs are not written again; a re-pointed and a new key are
+    assert reopened.update(engine, NAMESPACE, {"C001": 1, "C002": 2, "C003": 3})[1] == {}
+    assert reopened.update(engine, NAMESPACE, {"C002": 20, "C004": 4})[1] == {"C002": 20, "C004": 4}
+    assert lookup(KeyMapStore(directory), ["C001", "C002", "C003", "C004"]) == [1, 20, 3, 4]
+
+
+def test_sync_rebuilds_a_stale_index(pg_schema, tmp_path):
+    engine, _ = pg_schema
+    ensure_key_map_table(engine)
+    directory = str(tmp_path / "key_maps")
+    KeyMapStore(directory).update(engine, NAMESPACE, {"C001": 1, "C002": 2})
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM etl_key_map"))
+    store = KeyMapStore(directory)
+    assert len(store.sync(engine, NAMESPACE)) == 0
+    assert not os.path.exists(os.path.join(directory, NAMESPACE + ".keys.npy"))
+
+    store.update(engine, NAMESPACE, {"C001": 7})
+    assert lookup(KeyMapStore(directory), ["C001", "C002"]) == [7, None]
+
+
+def test_key_map_runs_load_the_same_tables(make_pg_schema, raw_dir, run_etl, tmp_path):
+    (engine, db_url), (plain_engine, plain_url) = make_pg_schema(), make_pg_schema()
+    key_map_dir = tmp_path / "key_maps"
+
+    run_etl(db_url, raw_dir, KEY_MAP_DIR=key_map_dir)
+    # second run premaps the sales keys from the index files the first run wrote
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE order_items, orders"))
+    run_etl(db_url, raw_dir, KEY_MAP_DIR=key_map_dir)
+    run_etl(plain_url, raw_dir)
+
+    assert len(KeyMapStore(str(key_map_dir)).index("products_raw.csv")) > 0
+    assert table_contents(engine) == table_contents(plain_engine)
@@ -0,0 +1,45 @@
+"""
+LOAD_WORKERS > 1 loads sales in shards that commit on their own; a rerun after a failed shard loads
+only the shards missing from etl_load_checkpoint. Needs TEST_DB_URL (see conftest.py).
+"""
+
+import pytest
+from sqlalchemy import text
+
+import etl_pipeline
+from test_load_modes import table_contents
+
+SHARDED = {"LOAD_WORKERS": 2, "LOAD_SHARDS": 4}
+
+
+def test_resume_after_failed_shard(make_pg_schema, raw_dir, run_etl, monkeypatch):
+    (engine, db_url), (plain_engine, plain_url) = make_pg_schema(), make_pg_schema()
+    load_sales_shard = etl_pipeline.load_sales_shard
+    attempts = []
+
+    def fail_shard_1(engine, run_key, shard, *args, **kwargs):
+        attempts.append(shard)
+        if shard == 1:
+            raise RuntimeError("shard 1 lost its connection")
+        return load_sales_shard(engine, run_key, shard, *args, **kwargs)
+
+    monkeypatch.setattr(etl_pipeline, "load_sales_shard", fail_shard_1)
+    with pytest.raises(RuntimeError, match=r"1 of 4 sales shards failed \(\[1\]\)"):
+        run_etl(db_url, raw_dir, **SHARDED)
+    with engine.connect() as conn:
+        committed = conn.execute(text("SELECT shard FROM etl_load_checkpoint ORDER BY shard")).scalars().all()
+    assert committed == [0, 2, 3]
+
+    def record_shard(engine, run_key, shard, *args, **kwargs):
+        attempts.append(shard)
+        return load_sales_shard(engine, run_key, shard, *args, **kwargs)
+
+    attempts.clear()
+    monkeypatch.setattr(etl_pipeline, "load_sales_shard", record_shard)
+    run_etl(db_url, raw_dir, **SHARDED)
+    run_etl(plain_url, raw_dir)
+
+    assert attempts == [1]
+    assert table_contents(engine) == table_contents(plain_engine)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM etl_load_checkpoint")).scalar() == 0
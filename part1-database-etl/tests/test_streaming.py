@@ -0,0 +1,34 @@
+"""
+SALES_CHUNK_SIZE streaming must load what the in-memory path loads, including transaction_id dedupe
+across chunk boundaries. Needs TEST_DB_URL (see conftest.py).
+"""
+
+import json
+
+import pandas as pd
+from sqlalchemy import text
+
+from test_load_modes import table_contents
+
+
+def sales_metrics(tmp_path) -> dict:
+    with open(tmp_path / "etl_metrics.json", encoding="utf-8") as f:
+        return next(m for m in json.load(f)["data_quality"] if m["file_name"] == "sales_raw.csv")
+
+
+def test_duplicate_transaction_id_across_chunks_is_loaded_once(make_pg_schema, raw_dir, run_etl, tmp_path):
+    (stream_engine, stream_url), (batch_engine, batch_url) = make_pg_schema(), make_pg_schema()
+    path = raw_dir / "sales_raw.csv"
+    sales = pd.read_csv(path, dtype=str, keep_default_na=False)
+    # T001 again in the last chunk, with another quantity: the first occurrence wins
+    repeat = sales[sales["transaction_id"] == "T001"].assign(quantity="7")
+    pd.concat([sales, repeat]).to_csv(path, index=False)
+
+    run_etl(batch_url, raw_dir)
+    batch_dups = sales_metrics(tmp_path)["duplicates_removed"]
+    run_etl(stream_url, raw_dir, SALES_CHUNK_SIZE=5)
+
+    assert sales_metrics(tmp_path)["duplicates_removed"] == batch_dups
+    assert table_contents(stream_engine) == table_contents(batch_engine)
+    with stream_engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM order_items WHERE quantity = 7")).scalar() == 0
@@ -0,0 +1,284 @@
+"""
+Flexi Mart - Part 2 catalog load (MongoDB)
+
+Bulk replacement for Operation 1 (mongoimport) and Operation 4 (one updateOne/$push per review)
+in mongodb_operations.js:
+- products_catalog.json is streamed with an incremental JSON parser (ijson, if installed),
+  so memory stays flat however large the catalog grows
+- products are upserted by product_id with unordered bulk_write batches (one round trip per batch;
+  a bad document does not stop the rest of the batch); a reload $sets the catalog fields and
+  $addToSets the file's reviews, so reviews appended since are kept
+- reviews (JSON array of {"product_id": ..., <review fields>}) are grouped per product and appended
+  with one update per product, again in unordered batches
+- the indexes the operations filter on are created up front (idempotent)
+- every product carries review_count / rated_count / rating_sum / avg_rating, set on upsert, updated
+  in the same atomic update as each review append and backfilled server-side for documents loaded
+  without them (e.g. by mongoimport), so rating filters and sorts (Operation 3) are index scans, not
+  array walks. avg_rating = rating_sum / rated_count, the same value as $avg over reviews.rating
+  (reviews without a numeric rating count towards review_count only)
+
+Every function takes a pymongo Collection, so a mongomock collection works the same way in tests.
+
+Run (from project root), with MONGO_URL in .env (default mongodb://localhost:27017;
+mongomock:// for an in-memory database):
+    python part2-nosql/catalog_loader.py
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING, DESCENDING, IndexModel, MongoClient, UpdateOne
+from pymongo.collection import Collection
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError, PyMongoError
+
+try:
+    import ijson  # optional: incremental JSON parsing
+except ImportError:
+    ijson = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "part1-database-etl"))
+
+from etl_pipeline import setup_logger  # noqa: E402
+
+
+# ---------------------------- Metrics ----------------------------
+
+@dataclass
+class CatalogLoadStats:
+    products_read: int = 0
+    products_inserted: int = 0
+    products_updated: int = 0
+    reviews_read: int = 0
+    reviews_appended: int = 0
+    reviews_unmatched: int = 0
+    stats_backfilled: int = 0
+    write_errors: int = 0
+    batches: int = 0
+
+
+# ---------------------------- Indexes ----------------------------
+
+# Operation 2 filters on category + price range; Operation 4 and the upserts look up product_id;
+# Operation 3 filters and sorts on avg_rating.
+CATALOG_INDEXES = [
+    IndexModel([("product_id", ASCENDING)], name="uq_products_product_id", unique=True),
+    IndexModel([("category", ASCENDING), ("price", ASCENDING)], name="ix_products_category_price"),
+    IndexModel([("avg_rating", DESCENDING)], name="ix_products_avg_rating"),
+]
+
+def ensure_indexes(collection: Collection) -> List[str]:
+    return collection.create_indexes(CATALOG_INDEXES)
+
+
+# ---------------------------- Review statistics ----------------------------
+
+# Update-pipeline stage deriving avg_rating from the maintained counters (null without rated reviews).
+AVG_RATING_STAGE = {"$set": {"avg_rating": {"$cond": [
+    {"$gt": ["$rated_count", 0]}, {"$divide": ["$rating_sum", "$rated_count"]}, None
+]}}}
+
+# Recomputes the counters from the reviews array; used to backfill documents that lack them and after
+# a catalog upsert. The numeric ratings go through a scratch field (_ratings) so the sum is over a field
+# path, which mongomock evaluates like mongod; $project drops it again ($unset is not in mongomock).
+BACKFILL_PIPELINE = [
+    {"$set": {
+        "review_count": {"$size": {"$ifNull": ["$reviews", []]}},
+        "_ratings": {"$map": {
+            "input": {"$filter": {
+                "input": {"$ifNull": ["$reviews", []]}, "as": "r", "cond": {"$isNumber": "$$r.rating"},
+            }},
+            "as": "r", "in": "$$r.rating",
+        }},
+    }},
+    {"$set": {"rated_count": {"$size": "$_ratings"}, "rating_sum": {"$sum": "$_ratings"}}},
+    {"$project": {"_ratings": 0}},
+    AVG_RATING_STAGE,
+]
+
+def is_rating(value: Any) -> bool:
+    """Same test as $isNumber (a bool is not a rating)."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def review_stats(reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    review_count / rated_count / rating_sum / avg_rating for a product's reviews array (same rules as
+    BACKFILL_PIPELINE): unrated reviews count towards review_count only.
+    """
+    ratings = [r["rating"] for r in reviews if is_rating(r.get("rating"))]
+    return {
+        "review_count": len(reviews),
+        "rated_count": len(ratings),
+        "rating_sum": sum(ratings),
+        "avg_rating": sum(ratings) / len(ratings) if ratings else None,
+    }
+
+def append_reviews_pipeline(items: List[Dict[str, Any]], updated_at: str) -> List[Dict[str, Any]]:
+    """Single-document update: append items to reviews and bump the counters in one atomic write."""
+    added = review_stats(items)
+    return [
+        {"$set": {
+            "reviews": {"$concatArrays": [{"$ifNull": ["$reviews", []]}, {"$literal": items}]},
+            "review_count": {"$add": [{"$ifNull": ["$review_count", 0]}, added["review_count"]]},
+            "rated_count": {"$add": [{"$ifNull": ["$rated_count", 0]}, added["rated_count"]]},
+            "rating_sum": {"$add": [{"$ifNull": ["$rating_sum", 0]}, added["rating_sum"]]},
+            "updated_at": updated_at,
+        }},
+        AVG_RATING_STAGE,
+    ]
+
+def upsert_product_update(product: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Single-document upsert: $set the catalog fields and $addToSet the file's reviews, so the stored
+    reviews (e.g. from append_reviews) are kept and a review already stored is not added twice.
+    The counters are recomputed afterwards (upsert_products).
+    """
+    fields = {k: v for k, v in product.items() if k not in ("_id", "reviews")}
+    return {"$set": fields, "$addToSet": {"reviews": {"$each": product.get("reviews") or []}}}
+
+def backfill_review_stats(collection: Collection, only_missing: bool = True) -> int:
+    """Recompute the review counters server-side in one update_many; returns documents modified."""
+    query = {"rated_count": {"$exists": False}} if only_missing else {}
+    return collection.update_many(query, BACKFILL_PIPELINE).modified_count
+
+
+# ---------------------------- Source ----------------------------
+
+def iter_json_array(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the objects of a top-level JSON array one at a time (whole file at once without ijson)."""
+    with open(path, "rb") as f:
+        if ijson is not None:
+            yield from ijson.items(f, "item", use_float=True)
+        else:
+            yield from json.load(f)
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ---------------------------- Writes ----------------------------
+
+def run_bulk(collection: Collection, ops: List[Any], stats: CatalogLoadStats, logger: logging.Logger) -> Dict[str, int]:
+    """Unordered bulk_write; write errors are counted and logged, the rest of the batch still applies."""
+    stats.batches += 1
+    try:
+        result = collection.bulk_write(ops, ordered=False).bulk_api_result
+    except BulkWriteError as e:
+        result = e.details
+        errors = result.get("writeErrors", [])
+        stats.write_errors += len(errors)
+        logger.warning(f"{len(errors)} write errors in batch of {len(ops)} (first: {errors[0].get('errmsg') if errors else '?'})")
+    return result
+
+def upsert_products(collection: Collection, products: Iterable[Dict[str, Any]], logger: logging.Logger,
+                    batch_size: int = 1000, stats: CatalogLoadStats = None) -> CatalogLoadStats:
+    """
+    Upsert each product by product_id (upsert_product_update), batch_size documents per round trip,
+    then recompute the batch's review counters from the merged reviews in one update_many.
+    """
+    stats = stats or CatalogLoadStats()
+    for batch in batched(products, batch_size):
+        stats.products_read += len(batch)
+        ops = [
+            UpdateOne({"product_id": p["product_id"]}, upsert_product_update(p), upsert=True)
+            for p in batch
+        ]
+        result = run_bulk(collection, ops, stats, logger)
+        collection.update_many({"product_id": {"$in": [p["product_id"] for p in batch]}}, BACKFILL_PIPELINE)
+        stats.products_inserted += result.get("nUpserted", 0)
+        stats.products_updated += result.get("nModified", 0)
+    return stats
+
+def append_reviews(collection: Collection, reviews: Iterable[Dict[str, Any]], logger: logging.Logger,
+                   batch_size: int = 1000, stats: CatalogLoadStats = None) -> CatalogLoadStats:
+    """
+    reviews: {"product_id": ..., <review fields>} each. Reviews for the same product within a batch
+    become one append (in input order) that also updates the review counters (review_stats);
+    reviews for unknown products are counted, not inserted.
+    """
+    stats = stats or CatalogLoadStats()
+    for batch in batched(reviews, batch_size):
+        stats.reviews_read += len(batch)
+        by_product: Dict[str, List[Dict[str, Any]]] = {}
+        for review in batch:
+            review = dict(review)
+            by_product.setdefault(review.pop("product_id"), []).append(review)
+
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        ops = [
+            UpdateOne({"product_id": pid}, append_reviews_pipeline(items, now))
+            for pid, items in by_product.items()
+        ]
+        result = run_bulk(collection, ops, stats, logger)
+        unmatched_reviews = 0
+        if result.get("nMatched", 0) < len(ops):
+            unmatched = set(by_product) - set(
+                collection.distinct("product_id", {"product_id": {"$in": list(by_product)}})
+            )
+            unmatched_reviews = sum(len(by_product[pid]) for pid in unmatched)
+            logger.warning(f"Reviews for unknown products skipped: {sorted(unmatched)}")
+        stats.reviews_unmatched += unmatched_reviews
+        stats.reviews_appended += len(batch) - unmatched_reviews
+    return stats
+
+def load_catalog(collection: Collection, catalog_path: str, logger: logging.Logger, batch_size: int = 1000,
+                 reviews_path: str = None) -> CatalogLoadStats:
+    ensure_indexes(collection)
+    stats = upsert_products(collection, iter_json_array(catalog_path), logger, batch_size)
+    stats.stats_backfilled = backfill_review_stats(collection)
+    if reviews_path:
+        append_reviews(collection, iter_json_array(reviews_path), logger, batch_size, stats)
+    return stats
+
+
+# ---------------------------- Main ----------------------------
+
+def get_database(url: str, db_name: str) -> Database:
+    if url.startswith("mongomock://"):
+        import mongomock
+        return mongomock.MongoClient()[db_name]
+    return MongoClient(url)[db_name]
+
+def main():
+    load_dotenv()
+
+    mongo_url = os.getenv("MONGO_URL", "mongodb://localhost:27017").strip()
+    db_name = os.getenv("MONGO_DB", "fleximart").strip()
+    catalog_path = os.getenv("CATALOG_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "products_catalog.json")).strip()
+    reviews_path = os.getenv("REVIEWS_PATH", "").strip() or None
+    batch_size = int(os.getenv("MONGO_BATCH_SIZE", "1000"))
+    log_path = os.getenv("LOG_PATH", "./etl.log").strip()
+
+    logger = setup_logger(log_path)
+
+    try:
+        start = time.perf_counter()
+        stats = load_catalog(get_database(mongo_url, db_name)["products"], catalog_path, logger, batch_size, reviews_path)
+        logger.info(
+            f"Catalog load done in {time.perf_counter() - start:.2f}s: "
+            f"{stats.products_read} products read ({stats.products_inserted} inserted, {stats.products_updated} updated), "
+            f"{stats.reviews_appended} reviews appended, {stats.reviews_unmatched} unmatched, "
+            f"{stats.stats_backfilled} review stats backfilled, "
+            f"{stats.write_errors} write errors in {stats.batches} batches."
+        )
+    except (PyMongoError, ValueError) as e:
+        logger.exception(f"Catalog load failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+catalog_loader.py against an in-memory mongomock collection. Run from project root:
+    python -m pytest part2-nosql/tests
+"""
+
+import json
+import logging
+import os
+import sys
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from catalog_loader import append_reviews, load_catalog  # noqa: E402
+
+CATALOG_PATH = os.path.join(HERE, "..", "products_catalog.json")
+LOGGER = logging.getLogger("catalog_loader_tests")
+
+
+@pytest.fixture
+def products():
+    return mongomock.MongoClient().db.products
+
+
+@pytest.fixture
+def catalog():
+    with open(CATALOG_PATH, encoding="utf-8") as f:
+        return {p["product_id"]: p for p in json.load(f)}
+
+
+def test_load_keeps_every_review_and_its_counts(products, catalog):
+    load_catalog(products, CATALOG_PATH, LOGGER)
+
+    for product_id, source in catalog.items():
+        doc = products.find_one({"product_id": product_id})
+        ratings = [r["rating"] for r in source.get("reviews", [])]
+        assert doc["reviews"] == source.get("reviews", [])
+        assert doc["review_count"] == doc["rated_count"] == len(ratings)
+        assert doc["rating_sum"] == sum(ratings)
+        assert doc["avg_rating"] == (sum(ratings) / len(ratings) if ratings else None)
+        assert "_ratings" not in doc
+
+
+def test_reload_keeps_appended_reviews(products, catalog):
+    load_catalog(products, CATALOG_PATH, LOGGER)
+    append_reviews(products, [{"product_id": "ELEC001", "user_id": "U999", "rating": 1}], LOGGER)
+
+    load_catalog(products, CATALOG_PATH, LOGGER)
+
+    doc = products.find_one({"product_id": "ELEC001"})
+    assert doc["reviews"] == catalog["ELEC001"]["reviews"] + [{"user_id": "U999", "rating": 1}]
+    assert doc["review_count"] == len(catalog["ELEC001"]["reviews"]) + 1
+
+
+def test_avg_rating_matches_avg_over_numeric_ratings(products):
+    """Unrated reviews count towards review_count but not avg_rating, like $avg over reviews.rating."""
+    load_catalog(products, CATALOG_PATH, LOGGER)
+    append_reviews(products, [
+        {"product_id": "ELEC002", "user_id": "U901", "comment": "no rating"},
+        {"product_id": "ELEC002", "user_id": "U902", "rating": "n/a"},
+        {"product_id": "ELEC002", "user_id": "U903", "rating": 2},
+    ], LOGGER)
+
+    doc = products.find_one({"product_id": "ELEC002"})
+    ratings = [r["rating"] for r in doc["reviews"] if isinstance(r.get("rating"), (int, float))]
+    assert doc["review_count"] == len(doc["reviews"])
+    assert doc["rated_count"] == len(ratings)
+    assert doc["avg_rating"] == sum(ratings) / len(ratings)
+
+    products.update_many({}, {"$unset": {"review_count": "", "rated_count": "", "rating_sum": "", "avg_rating": ""}})
+    load_catalog(products, CATALOG_PATH, LOGGER)  # reload + backfill recompute from the stored arrays
+    assert products.find_one({"product_id": "ELEC002"})["avg_rating"] == sum(ratings) / len(ratings)
+
+
+def test_indexes_are_created(products):
+    load_catalog(products, CATALOG_PATH, LOGGER)
+
+    indexes = products.index_information()
+    assert list(indexes["uq_products_product_id"]["key"]) == [("product_id", 1)]
+    assert indexes["uq_products_product_id"]["unique"]
+    assert list(indexes["ix_products_category_price"]["key"]) == [("category", 1), ("price", 1)]
+    assert list(indexes["ix_products_avg_rating"]["key"]) == [("avg_rating", -1)]
+
+
+def test_rerun_is_idempotent(products, catalog):
+    first = load_catalog(products, CATALOG_PATH, LOGGER, batch_size=5)
+    before = {d["product_id"]: d for d in products.find({}, {"_id": 0})}
+
+    second = load_catalog(products, CATALOG_PATH, LOGGER, batch_size=5)
+
+    assert (first.products_read, first.products_inserted, first.batches) == (len(catalog), len(catalog), 3)
+    assert (second.products_inserted, second.products_updated, second.write_errors) == (0, 0, 0)
+    assert {d["product_id"]: d for d in products.find({}, {"_id": 0})} == before
+
+
+def test_bulk_review_append(products, catalog, tmp_path):
+    reviews = [
+        {"product_id": "FASH001", "user_id": "U801", "rating": 5},
+        {"product_id": "ELEC003", "user_id": "U802", "rating": 3},
+        {"product_id": "FASH001", "user_id": "U803", "rating": 4},
+        {"product_id": "NOPE999", "user_id": "U804", "rating": 1},
+    ]
+    reviews_path = tmp_path / "reviews.json"
+    reviews_path.write_text(json.dumps(reviews), encoding="utf-8")
+
+    stats = load_catalog(products, CATALOG_PATH, LOGGER, batch_size=3, reviews_path=str(reviews_path))
+
+    assert (stats.reviews_read, stats.reviews_appended, stats.reviews_unmatched) == (4, 3, 1)
+    fash = products.find_one({"product_id": "FASH001"})
+    assert fash["reviews"][-2:] == [{"user_id": "U801", "rating": 5}, {"user_id": "U803", "rating": 4}]
+    ratings = [r["rating"] for r in fash["reviews"]]
+    assert (fash["review_count"], fash["rating_sum"]) == (len(ratings), sum(ratings))
+    assert products.find_one({"product_id": "ELEC003"})["review_count"] == len(catalog["ELEC003"]["reviews"]) + 1
+    assert products.count_documents({"product_id": "NOPE999"}) == 0
@@ -1,5 +1,7 @@
 -- analytics_queries.sql
 -- Task 3.3: OLAP Analytics Queries
+-- All three read the aggregate layer (warehouse_aggregates.sql), kept current by warehouse_loader.py,
+-- so their cost depends on products/customers x months, not on the size of fact_sales.
 
 -- =========================================================
 -- Query 1: Monthly Sales Drill-Down Analysis
@@ -8,24 +10,22 @@
 -- Demonstrates: Drill-down from Year → Quarter → Month
 -- =========================================================
 SELECT
-    d.year,
-    d.quarter,
-    d.month_name,
-    SUM(f.total_amount)    AS total_sales,
-    SUM(f.quantity_sold)   AS total_quantity
-FROM fact_sales f
-JOIN dim_date d
-  ON f.date_key = d.date_key
-WHERE d.year = 2024
+    a.year,
+    a.quarter,
+    a.month_name,
+    SUM(a.total_amount)    AS total_sales,
+    SUM(a.quantity_sold)   AS total_quantity
+FROM agg_sales_monthly_product a
+WHERE a.year = 2024
 GROUP BY
-    d.year,
-    d.quarter,
-    d.month,
-    d.month_name
+    a.year,
+    a.quarter,
+    a.month,
+    a.month_name
 ORDER BY
-    d.year,
-    d.quarter,
-    d.month;
+    a.year,
+    a.quarter,
+    a.month;
 
 -- =========================================================
 -- Query 2: Product Performance Analysis (Top 10 Products)
@@ -37,15 +37,15 @@ ORDER BY
 SELECT
     p.product_name,
     p.category,
-    SUM(f.quantity_sold) AS units_sold,
-    SUM(f.total_amount)  AS revenue,
+    SUM(a.quantity_sold) AS units_sold,
+    SUM(a.total_amount)  AS revenue,
     ROUND(
-        (SUM(f.total_amount) / NULLIF(SUM(SUM(f.total_amount)) OVER (), 0)) * 100,
+        (SUM(a.total_amount) / NULLIF(SUM(SUM(a.total_amount)) OVER (), 0)) * 100,
         2
     ) AS revenue_percentage
-FROM fact_sales f
+FROM agg_sales_monthly_product a
 JOIN dim_product p
-  ON f.product_key = p.product_key
+  ON a.product_key = p.product_key
 GROUP BY
     p.product_name,
     p.category
@@ -65,10 +65,10 @@ WITH customer_spend AS (
     SELECT
         c.customer_key,
         c.customer_name,
-        SUM(f.total_amount) AS total_spent
-    FROM fact_sales f
+        SUM(a.total_amount) AS total_spent
+    FROM agg_sales_monthly_customer a
     JOIN dim_customer c
-      ON f.customer_key = c.customer_key
+      ON a.customer_key = c.customer_key
     GROUP BY
         c.customer_key,
         c.customer_name
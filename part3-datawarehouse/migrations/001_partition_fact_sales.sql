@@ -0,0 +1,98 @@
+-- 001_partition_fact_sales.sql (PostgreSQL 14+)
+-- Converts an existing single-table fact_sales into the monthly-partitioned layout of
+-- warehouse_schema.sql (partitions fact_sales_YYYY_MM on date_key, BRIN on date_key).
+-- Copies every fact once (sale_key values are kept), so run it in a maintenance window:
+--   psql -d fleximart_dw -f part3-datawarehouse/migrations/001_partition_fact_sales.sql
+
+BEGIN;
+
+-- 1) Move the old table aside; free the index names the new table uses
+ALTER TABLE fact_sales ADD COLUMN IF NOT EXISTS order_item_id INT;
+ALTER TABLE fact_sales RENAME TO fact_sales_unpartitioned;
+ALTER INDEX IF EXISTS fact_sales_pkey RENAME TO fact_sales_unpartitioned_pkey;
+DROP INDEX IF EXISTS idx_fact_sales_date_key, idx_fact_sales_product_key,
+                     idx_fact_sales_customer_key, uq_fact_sales_order_item_id;
+
+-- 2) Partitioned table + partition helper (same definitions as warehouse_schema.sql)
+CREATE TABLE fact_sales (
+    sale_key INT GENERATED ALWAYS AS IDENTITY,
+    date_key INT NOT NULL,
+    product_key INT NOT NULL,
+    customer_key INT NOT NULL,
+    quantity_sold INT NOT NULL,
+    unit_price NUMERIC(10,2) NOT NULL,
+    discount_amount NUMERIC(10,2) DEFAULT 0,
+    total_amount NUMERIC(10,2) NOT NULL,
+    order_item_id INT,
+    CONSTRAINT pk_fact_sales
+        PRIMARY KEY (sale_key, date_key),
+    CONSTRAINT fk_fact_sales_date
+        FOREIGN KEY (date_key) REFERENCES dim_date(date_key),
+    CONSTRAINT fk_fact_sales_product
+        FOREIGN KEY (product_key) REFERENCES dim_product(product_key),
+    CONSTRAINT fk_fact_sales_customer
+        FOREIGN KEY (customer_key) REFERENCES dim_customer(customer_key)
+) PARTITION BY RANGE (date_key);
+
+CREATE OR REPLACE FUNCTION ensure_fact_sales_partitions(from_date DATE, to_date DATE)
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    m DATE;
+    part TEXT;
+    created INT := 0;
+BEGIN
+    FOR m IN
+        SELECT generate_series(date_trunc('month', from_date), date_trunc('month', to_date), INTERVAL '1 month')::DATE
+    LOOP
+        part := 'fact_sales_' || TO_CHAR(m, 'YYYY_MM');
+        IF to_regclass(part) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF fact_sales FOR VALUES FROM (%s) TO (%s)',
+                part, TO_CHAR(m, 'YYYYMMDD'), TO_CHAR(m + INTERVAL '1 month', 'YYYYMMDD')
+            );
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+
+-- 3) Partitions for the months present, then copy the facts (keeping sale_key)
+SELECT ensure_fact_sales_partitions(
+    TO_DATE(MIN(date_key)::TEXT, 'YYYYMMDD'),
+    TO_DATE(MAX(date_key)::TEXT, 'YYYYMMDD')
+)
+FROM fact_sales_unpartitioned;
+
+INSERT INTO fact_sales (
+    sale_key, date_key, product_key, customer_key, quantity_sold,
+    unit_price, discount_amount, total_amount, order_item_id
+)
+OVERRIDING SYSTEM VALUE
+SELECT
+    sale_key, date_key, product_key, customer_key, quantity_sold,
+    unit_price, discount_amount, total_amount, order_item_id
+FROM fact_sales_unpartitioned;
+
+SELECT setval(pg_get_serial_sequence('fact_sales', 'sale_key'), COALESCE(MAX(sale_key), 0) + 1, false)
+FROM fact_sales;
+
+-- 4) Indexes (built once, after the copy)
+CREATE INDEX idx_fact_sales_date_key_brin ON fact_sales USING BRIN (date_key);
+CREATE INDEX idx_fact_sales_product_key  ON fact_sales(product_key);
+CREATE INDEX idx_fact_sales_customer_key ON fact_sales(customer_key);
+CREATE UNIQUE INDEX uq_fact_sales_order_item_id ON fact_sales(order_item_id, date_key);
+
+CREATE TABLE IF NOT EXISTS fact_sales_archive_log (
+    partition_name VARCHAR(63) PRIMARY KEY,
+    archived_to VARCHAR(130) NOT NULL,
+    row_count BIGINT NOT NULL,
+    max_order_item_id INT,
+    archived_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+DROP TABLE fact_sales_unpartitioned;
+
+COMMIT;
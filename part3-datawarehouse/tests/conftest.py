@@ -0,0 +1,74 @@
+"""
+Warehouse loader tests need a PostgreSQL they may create schemas in:
+    TEST_DB_URL=postgresql+psycopg2://postgres:<PASSWORD>@localhost:5432/fleximart_test
+and are skipped without it. Each test gets an OLTP schema loaded from data/raw by the Part 1 ETL and an
+empty warehouse schema (warehouse_schema.sql + warehouse_aggregates.sql); both are dropped afterwards.
+"""
+
+import os
+import sys
+import uuid
+
+import pytest
+from sqlalchemy import make_url
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PART3_DIR = os.path.join(HERE, "..")
+PART1_DIR = os.path.join(HERE, "..", "..", "part1-database-etl")
+sys.path.insert(0, PART3_DIR)
+sys.path.insert(0, PART1_DIR)
+sys.path.insert(0, os.path.join(PART1_DIR, "benchmarks"))
+
+from bench_etl import BENCH_SCHEMA_DDL, get_engine_with_schema  # noqa: E402
+from etl_pipeline import get_engine  # noqa: E402
+
+RAW_DIR = os.path.join(HERE, "..", "..", "data", "raw")
+
+
+def run_sql_file(conn, name: str) -> None:
+    """Run a Part 3 .sql file as one script (raw DBAPI cursor: the files contain %, $$ bodies and UTF-8 comments)."""
+    with open(os.path.join(PART3_DIR, name), encoding="utf-8") as f:
+        sql = f.read()
+    with conn.connection.cursor() as cur:
+        cur.execute(sql.encode("utf-8"))
+
+
+@pytest.fixture
+def warehouse(tmp_path, monkeypatch):
+    """(OLTP engine loaded from data/raw, empty warehouse engine)."""
+    base_url = os.getenv("TEST_DB_URL", "").strip()
+    if not base_url:
+        pytest.skip("TEST_DB_URL is not set")
+    import etl_pipeline
+
+    suffix = uuid.uuid4().hex[:12]
+    oltp_schema, dw_schema = f"oltp_test_{suffix}", f"dw_test_{suffix}"
+    oltp, dw = get_engine_with_schema(base_url, oltp_schema), get_engine_with_schema(base_url, dw_schema)
+    try:
+        with oltp.begin() as conn:
+            conn.exec_driver_sql(BENCH_SCHEMA_DDL.format(schema=oltp_schema))
+        with dw.begin() as conn:
+            conn.exec_driver_sql(f"CREATE SCHEMA {dw_schema}")
+            run_sql_file(conn, "warehouse_schema.sql")
+            run_sql_file(conn, "warehouse_aggregates.sql")
+
+        oltp_url = make_url(base_url).update_query_dict({"options": f"-csearch_path={oltp_schema}"})
+        for key, value in {
+            "DB_URL": oltp_url.render_as_string(hide_password=False),
+            "RAW_DIR": RAW_DIR,
+            "REPORT_PATH": str(tmp_path / "data_quality_report.txt"),
+            "LOG_PATH": str(tmp_path / "etl.log"),
+            "METRICS_PATH": str(tmp_path / "etl_metrics.json"),
+        }.items():
+            monkeypatch.setenv(key, value)
+        etl_pipeline.main()
+
+        yield oltp, dw
+    finally:
+        oltp.dispose()
+        dw.dispose()
+        admin = get_engine(base_url)
+        with admin.begin() as conn:
+            conn.exec_driver_sql(f"DROP SCHEMA IF EXISTS {oltp_schema} CASCADE")
+            conn.exec_driver_sql(f"DROP SCHEMA IF EXISTS {dw_schema} CASCADE")
+        admin.dispose()
@@ -0,0 +1,74 @@
+"""
+warehouse_loader.refresh_warehouse against a warehouse schema loaded from the Part 1 OLTP tables.
+Needs TEST_DB_URL (see conftest.py).
+"""
+
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from conftest import run_sql_file
+from warehouse_loader import refresh_warehouse
+
+LOGGER = logging.getLogger("warehouse_loader_tests")
+
+
+def scalar(engine, sql: str):
+    with engine.connect() as conn:
+        return conn.execute(text(sql)).scalar()
+
+
+def refresh(oltp, dw, **kwargs):
+    return refresh_warehouse(oltp, dw, LOGGER, settle_timeout=5.0, **kwargs)
+
+
+def assert_one_key_domain(oltp, dw):
+    """Every OLTP customer/product has exactly one dimension row (keyed by its id) and every line item one fact."""
+    for table, source, key in (("dim_customer", "customers", "customer_id"), ("dim_product", "products", "product_id")):
+        with oltp.connect() as conn:
+            source_ids = sorted(str(i) for i in conn.execute(text(f"SELECT {key} FROM {source}")).scalars())
+        with dw.connect() as conn:
+            dim_ids = sorted(conn.execute(text(f"SELECT {key} FROM {table}")).scalars())
+        assert dim_ids == source_ids
+    assert scalar(dw, "SELECT COUNT(*) FROM fact_sales") == scalar(oltp, "SELECT COUNT(*) FROM order_items")
+    assert scalar(dw, "SELECT COUNT(*) FROM fact_sales WHERE order_item_id IS NULL") == 0
+    assert scalar(dw, "SELECT SUM(total_amount) FROM fact_sales") == scalar(oltp, "SELECT SUM(subtotal) FROM order_items")
+    assert scalar(dw, "SELECT SUM(total_amount) FROM agg_sales_daily_product") == scalar(dw, "SELECT SUM(total_amount) FROM fact_sales")
+
+
+def test_refresh_keys_dimensions_by_oltp_id(warehouse):
+    oltp, dw = warehouse
+
+    first = refresh(oltp, dw)
+    second = refresh(oltp, dw)
+
+    assert first.facts_loaded > 0
+    assert (second.facts_loaded, second.customers_upserted, second.products_upserted) == (0, 0, 0)
+    assert_one_key_domain(oltp, dw)
+
+
+def test_seeded_warehouse_is_refused(warehouse):
+    oltp, dw = warehouse
+    with dw.begin() as conn:
+        run_sql_file(conn, "warehouse_data.sql")
+    dims_before = scalar(dw, "SELECT COUNT(*) FROM dim_customer")
+
+    with pytest.raises(ValueError, match="WAREHOUSE_REPLACE_SAMPLE"):
+        refresh(oltp, dw)
+
+    assert scalar(dw, "SELECT COUNT(*) FROM dim_customer") == dims_before
+    assert scalar(dw, "SELECT COUNT(*) FROM fact_sales WHERE order_item_id IS NOT NULL") == 0
+
+
+def test_replace_sample_leaves_one_key_per_customer_and_product(warehouse):
+    oltp, dw = warehouse
+    with dw.begin() as conn:
+        run_sql_file(conn, "warehouse_data.sql")
+
+    stats = refresh(oltp, dw, replace_sample=True)
+
+    assert stats.sample_rows_removed > 0 and stats.aggregates_rebuilt
+    assert scalar(dw, "SELECT COUNT(*) FROM dim_customer WHERE customer_id LIKE 'C%'") == 0
+    assert scalar(dw, "SELECT COUNT(*) FROM dim_product WHERE product_id LIKE 'P%'") == 0
+    assert_one_key_domain(oltp, dw)
@@ -0,0 +1,57 @@
+-- warehouse_aggregates.sql (PostgreSQL)
+-- Aggregate layer read by analytics_queries.sql: daily and monthly sales by product and by customer.
+-- Idempotent (IF NOT EXISTS); warehouse_loader.py runs it on every refresh, fills the tables on
+-- first use (or with AGG_REBUILD=1) and then adds each appended fact batch to them in the same
+-- transaction, so they always match fact_sales.
+
+CREATE TABLE IF NOT EXISTS agg_sales_daily_product (
+    date_key INT NOT NULL REFERENCES dim_date(date_key),
+    product_key INT NOT NULL REFERENCES dim_product(product_key),
+    quantity_sold BIGINT NOT NULL,
+    discount_amount NUMERIC(14,2) NOT NULL,
+    total_amount NUMERIC(14,2) NOT NULL,
+    line_count BIGINT NOT NULL,
+    PRIMARY KEY (date_key, product_key)
+);
+
+CREATE TABLE IF NOT EXISTS agg_sales_daily_customer (
+    date_key INT NOT NULL REFERENCES dim_date(date_key),
+    customer_key INT NOT NULL REFERENCES dim_customer(customer_key),
+    quantity_sold BIGINT NOT NULL,
+    discount_amount NUMERIC(14,2) NOT NULL,
+    total_amount NUMERIC(14,2) NOT NULL,
+    line_count BIGINT NOT NULL,
+    PRIMARY KEY (date_key, customer_key)
+);
+
+-- month_key = YYYYMM; calendar attributes copied from dim_date so dashboards need no join
+CREATE TABLE IF NOT EXISTS agg_sales_monthly_product (
+    month_key INT NOT NULL,
+    year INT NOT NULL,
+    quarter VARCHAR(2) NOT NULL,
+    month INT NOT NULL,
+    month_name VARCHAR(10) NOT NULL,
+    product_key INT NOT NULL REFERENCES dim_product(product_key),
+    quantity_sold BIGINT NOT NULL,
+    discount_amount NUMERIC(16,2) NOT NULL,
+    total_amount NUMERIC(16,2) NOT NULL,
+    line_count BIGINT NOT NULL,
+    PRIMARY KEY (month_key, product_key)
+);
+
+CREATE TABLE IF NOT EXISTS agg_sales_monthly_customer (
+    month_key INT NOT NULL,
+    year INT NOT NULL,
+    quarter VARCHAR(2) NOT NULL,
+    month INT NOT NULL,
+    month_name VARCHAR(10) NOT NULL,
+    customer_key INT NOT NULL REFERENCES dim_customer(customer_key),
+    quantity_sold BIGINT NOT NULL,
+    discount_amount NUMERIC(16,2) NOT NULL,
+    total_amount NUMERIC(16,2) NOT NULL,
+    line_count BIGINT NOT NULL,
+    PRIMARY KEY (month_key, customer_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_agg_monthly_product_year  ON agg_sales_monthly_product(year);
+CREATE INDEX IF NOT EXISTS idx_agg_monthly_customer_key  ON agg_sales_monthly_customer(customer_key);
@@ -1,41 +1,23 @@
 -- warehouse_data.sql
 -- Load dimensions first, then facts (to satisfy FK constraints)
 
--- 1) dim_date: 30 dates (Jan-Feb 2024)
+-- 1) dim_date: every day of 2024, generated from the range (no literal rows)
+-- Attributes match warehouse_loader.py (build_date_dimension); extend the range or let the
+-- loader extend it automatically to cover the order dates it loads.
 INSERT INTO dim_date (
     date_key, full_date, day_of_week, day_of_month, month, month_name, quarter, year, is_weekend
-) VALUES
-(20240101, '2024-01-01', 'Monday', 1, 1, 'January', 'Q1', 2024, FALSE),
-(20240102, '2024-01-02', 'Tuesday', 2, 1, 'January', 'Q1', 2024, FALSE),
-(20240103, '2024-01-03', 'Wednesday', 3, 1, 'January', 'Q1', 2024, FALSE),
-(20240104, '2024-01-04', 'Thursday', 4, 1, 'January', 'Q1', 2024, FALSE),
-(20240105, '2024-01-05', 'Friday', 5, 1, 'January', 'Q1', 2024, FALSE),
-(20240106, '2024-01-06', 'Saturday', 6, 1, 'January', 'Q1', 2024, TRUE),
-(20240107, '2024-01-07', 'Sunday', 7, 1, 'January', 'Q1', 2024, TRUE),
-(20240108, '2024-01-08', 'Monday', 8, 1, 'January', 'Q1', 2024, FALSE),
-(20240109, '2024-01-09', 'Tuesday', 9, 1, 'January', 'Q1', 2024, FALSE),
-(20240110, '2024-01-10', 'Wednesday', 10, 1, 'January', 'Q1', 2024, FALSE),
-(20240111, '2024-01-11', 'Thursday', 11, 1, 'January', 'Q1', 2024, FALSE),
-(20240112, '2024-01-12', 'Friday', 12, 1, 'January', 'Q1', 2024, FALSE),
-(20240113, '2024-01-13', 'Saturday', 13, 1, 'January', 'Q1', 2024, TRUE),
-(20240114, '2024-01-14', 'Sunday', 14, 1, 'January', 'Q1', 2024, TRUE),
-(20240115, '2024-01-15', 'Monday', 15, 1, 'January', 'Q1', 2024, FALSE),
-(20240201, '2024-02-01', 'Thursday', 1, 2, 'February', 'Q1', 2024, FALSE),
-(20240202, '2024-02-02', 'Friday', 2, 2, 'February', 'Q1', 2024, FALSE),
-(20240203, '2024-02-03', 'Saturday', 3, 2, 'February', 'Q1', 2024, TRUE),
-(20240204, '2024-02-04', 'Sunday', 4, 2, 'February', 'Q1', 2024, TRUE),
-(20240205, '2024-02-05', 'Monday', 5, 2, 'February', 'Q1', 2024, FALSE),
-(20240206, '2024-02-06', 'Tuesday', 6, 2, 'February', 'Q1', 2024, FALSE),
-(20240207, '2024-02-07', 'Wednesday', 7, 2, 'February', 'Q1', 2024, FALSE),
-(20240208, '2024-02-08', 'Thursday', 8, 2, 'February', 'Q1', 2024, FALSE),
-(20240209, '2024-02-09', 'Friday', 9, 2, 'February', 'Q1', 2024, FALSE),
-(20240210, '2024-02-10', 'Saturday', 10, 2, 'February', 'Q1', 2024, TRUE),
-(20240211, '2024-02-11', 'Sunday', 11, 2, 'February', 'Q1', 2024, TRUE),
-(20240212, '2024-02-12', 'Monday', 12, 2, 'February', 'Q1', 2024, FALSE),
-(20240213, '2024-02-13', 'Tuesday', 13, 2, 'February', 'Q1', 2024, FALSE),
-(20240214, '2024-02-14', 'Wednesday', 14, 2, 'February', 'Q1', 2024, FALSE),
-(20240215, '2024-02-15', 'Thursday', 15, 2, 'February', 'Q1', 2024, FALSE)
-;
+)
+SELECT
+    TO_CHAR(d, 'YYYYMMDD')::INT,
+    d::DATE,
+    TRIM(TO_CHAR(d, 'Day')),
+    EXTRACT(DAY FROM d)::INT,
+    EXTRACT(MONTH FROM d)::INT,
+    TRIM(TO_CHAR(d, 'Month')),
+    'Q' || EXTRACT(QUARTER FROM d),
+    EXTRACT(YEAR FROM d)::INT,
+    EXTRACT(ISODOW FROM d) IN (6, 7)
+FROM generate_series(DATE '2024-01-01', DATE '2024-12-31', INTERVAL '1 day') AS g(d);
 
 -- 2) dim_product: 15 products across 3 categories (Electronics, Home & Kitchen, Grocery)
 -- Prices varied from ₹100 to ₹100,000
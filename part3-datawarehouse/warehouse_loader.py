@@ -0,0 +1,735 @@
+"""
+Flexi Mart - Part 3 warehouse load (PostgreSQL)
+
+Moves what part1-database-etl/etl_pipeline.py loaded into the OLTP tables
+(customers / products / orders / order_items) into the star schema
+(dim_customer / dim_product / dim_date / fact_sales):
+- dimensions are upserted by natural key (SCD type 1) with one set-based merge per dimension
+- surrogate keys (customer_key / product_key / date_key) are resolved with in-memory hash lookups,
+  not per-row subqueries; with KEY_MAP_DIR set, the customer/product keys come from the persistent
+  key maps shared with the OLTP load (etl_key_map + a memory-mapped index), so a refresh only reads
+  back the dimension rows it wrote instead of every key
+- only order_items newer than the highest order_item_id already in fact_sales are appended,
+  read in keyset batches and bulk-COPYed, so a refresh scales with new sales, not history
+
+Natural keys in the dimensions are the OLTP ids (customers.customer_id / products.product_id as text);
+fact_sales.order_item_id keeps the source line item (degenerate dimension) and is the load watermark.
+A warehouse still holding the warehouse_data.sql sample (keyed by source codes) is refused unless
+WAREHOUSE_REPLACE_SAMPLE=1, which deletes the sample first.
+
+Run (from project root), with DB_URL (OLTP) and DW_DB_URL (warehouse) in .env:
+    python part3-datawarehouse/warehouse_loader.py
+"""
+
+import io
+import re
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "part1-database-etl"))
+
+from etl_pipeline import (  # noqa: E402
+    SQL_STATS,
+    KeyIndex,
+    KeyMapStore,
+    bulk_load_key_map,
+    copy_frame_to_table,
+    ensure_key_map_table,
+    get_engine,
+    setup_logger,
+    transaction,
+    upsert_key_map,
+)
+
+
+# ---------------------------- Metrics ----------------------------
+
+@dataclass
+class WarehouseLoadStats:
+    customers_upserted: int = 0
+    products_upserted: int = 0
+    dates_added: int = 0
+    facts_loaded: int = 0
+    facts_skipped_unmapped: int = 0
+    facts_retried: int = 0
+    facts_skipped_duplicate: int = 0
+    batches: int = 0
+    aggregates_rebuilt: bool = False
+    partitions_created: int = 0
+    partitions_archived: int = 0
+    sample_rows_removed: int = 0
+
+
+# ---------------------------- Warehouse keys ----------------------------
+
+# Natural-key uniqueness (needed for ON CONFLICT) and the fact watermark column.
+# All idempotent, so older warehouses created from warehouse_schema.sql are upgraded in place.
+WAREHOUSE_KEY_DDL = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_dim_customer_customer_id ON dim_customer (customer_id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_dim_product_product_id ON dim_product (product_id)",
+    "ALTER TABLE fact_sales ADD COLUMN IF NOT EXISTS order_item_id INT",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_fact_sales_order_item_id ON fact_sales (order_item_id, date_key)",
+    """CREATE TABLE IF NOT EXISTS fact_sales_archive_log (
+        partition_name VARCHAR(63) PRIMARY KEY,
+        archived_to VARCHAR(130) NOT NULL,
+        row_count BIGINT NOT NULL,
+        max_order_item_id INT,
+        archived_at TIMESTAMP NOT NULL DEFAULT NOW()
+    )""",
+    # line items skipped for a missing customer/product; retried on every refresh until they resolve
+    """CREATE TABLE IF NOT EXISTS fact_sales_unmapped (
+        order_item_id INT PRIMARY KEY,
+        first_seen TIMESTAMP NOT NULL DEFAULT NOW()
+    )""",
+]
+
+# dimension -> natural key, surrogate key, OLTP source query (columns named as in the dimension)
+DIMENSIONS = {
+    "dim_customer": (
+        "customer_id", "customer_key",
+        "SELECT customer_id::text AS customer_id, first_name || ' ' || last_name AS customer_name, city FROM customers",
+    ),
+    "dim_product": (
+        "product_id", "product_key",
+        "SELECT product_id::text AS product_id, product_name, category, price AS unit_price FROM products",
+    ),
+}
+
+FACT_COLUMNS = [
+    "date_key", "product_key", "customer_key", "quantity_sold",
+    "unit_price", "discount_amount", "total_amount", "order_item_id",
+]
+
+def ensure_warehouse_keys(engine: Engine):
+    with engine.begin() as conn:
+        for ddl in WAREHOUSE_KEY_DDL:
+            conn.exec_driver_sql(ddl)
+
+
+# ---------------------------- Helpers ----------------------------
+
+def copy_query_to_frame(conn: Connection, query: str, dtype=None) -> pd.DataFrame:
+    """
+    Run a SELECT through COPY ... TO STDOUT (CSV) and parse it with read_csv.
+    Much faster than fetching row tuples for large result sets; NULL and '' both come back as NaN.
+    """
+    buf = io.StringIO()
+    cur = conn.connection.cursor()
+    start = time.perf_counter()
+    try:
+        cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", buf)
+    finally:
+        cur.close()
+        SQL_STATS.record(time.perf_counter() - start)
+    buf.seek(0)
+    return pd.read_csv(buf, dtype=dtype, keep_default_na=False, na_values=[""])
+
+def lookup_keys(key_map: Union[pd.Series, KeyIndex], natural_keys: pd.Series) -> np.ndarray:
+    """
+    Vectorized natural key -> surrogate key lookup against an in-memory hash index (or a KeyIndex).
+    Returns an int64 array with -1 where the natural key is unknown.
+    """
+    if isinstance(key_map, KeyIndex):
+        return key_map.lookup(natural_keys).fillna(-1).to_numpy(dtype="int64")
+    pos = key_map.index.get_indexer(natural_keys)
+    out = key_map.to_numpy()[pos]
+    out[pos == -1] = -1
+    return out
+
+def build_date_rows(dates: pd.DatetimeIndex) -> pd.DataFrame:
+    """dim_date rows (every attribute) for the given dates, computed column-wise."""
+    return pd.DataFrame({
+        "date_key": dates.year * 10000 + dates.month * 100 + dates.day,
+        "full_date": dates.strftime("%Y-%m-%d"),
+        "day_of_week": dates.day_name(),
+        "day_of_month": dates.day,
+        "month": dates.month,
+        "month_name": dates.month_name(),
+        "quarter": "Q" + dates.quarter.astype(str),
+        "year": dates.year,
+        "is_weekend": dates.dayofweek >= 5,
+    })
+
+
+# ---------------------------- Load: Dimensions ----------------------------
+
+def refresh_dimension(oltp: Union[Engine, Connection], dw: Union[Engine, Connection], table: str,
+                      logger: logging.Logger, batch_size: int = 10000,
+                      key_maps: Optional[KeyMapStore] = None) -> Tuple[Union[pd.Series, KeyIndex], int]:
+    """
+    Snapshot the OLTP source of one dimension, merge it in with a single
+    INSERT ... ON CONFLICT (natural key) DO UPDATE (only rows whose attributes changed are written),
+    and return (natural key -> surrogate key map as a pd.Series indexed by natural key, rows written).
+    key_maps: the written rows' keys are recorded in etl_key_map (namespace = table; bulk-loaded from the
+    whole dimension on first use) and the map is returned as the namespace's KeyIndex instead.
+    """
+    natural_key, surrogate_key, source_query = DIMENSIONS[table]
+    with transaction(oltp) as conn:
+        src = copy_query_to_frame(conn, source_query, dtype={natural_key: str})
+    columns = list(src.columns)
+    attrs = [c for c in columns if c != natural_key]
+
+    with transaction(dw) as conn:
+        conn.exec_driver_sql(
+            f"CREATE TEMP TABLE stg_{table} ON COMMIT DROP AS "
+            f"SELECT {', '.join(columns)} FROM {table} WITH NO DATA"
+        )
+        copy_frame_to_table(conn, src, f"stg_{table}", columns, batch_size)
+        res = conn.exec_driver_sql(f"""
+            INSERT INTO {table} ({', '.join(columns)})
+            SELECT {', '.join(columns)} FROM stg_{table}
+            ON CONFLICT ({natural_key}) DO UPDATE
+            SET {', '.join(f'{c} = EXCLUDED.{c}' for c in attrs)}
+            WHERE ({', '.join(f'{table}.{c}' for c in attrs)})
+                  IS DISTINCT FROM ({', '.join(f'EXCLUDED.{c}' for c in attrs)})
+            {f'RETURNING {natural_key}, {surrogate_key}' if key_maps is not None else ''}
+        """)
+        upserted = res.rowcount
+        if key_maps is None:
+            keys = copy_query_to_frame(
+                conn, f"SELECT {natural_key}, {surrogate_key} FROM {table}", dtype={natural_key: str}
+            )
+        else:
+            written = pd.DataFrame(res.fetchall(), columns=["source_key", "db_id"])
+            if conn.execute(text("SELECT NOT EXISTS (SELECT 1 FROM etl_key_map WHERE namespace = :ns)"), {"ns": table}).scalar():
+                bulk_load_key_map(conn, table, f"SELECT {natural_key}::text, {surrogate_key} FROM {table}")
+            else:
+                upsert_key_map(conn, table, written.astype({"source_key": str}))
+
+    if key_maps is not None:
+        index = key_maps.sync(dw, table)
+        logger.info(f"{table}: {len(src)} source rows, {upserted} inserted/updated, {len(index)} keys in key map.")
+        return index, upserted
+
+    logger.info(f"{table}: {len(src)} source rows, {upserted} inserted/updated, {len(keys)} keys in lookup.")
+    return pd.Series(keys[surrogate_key].to_numpy(dtype="int64"), index=pd.Index(keys[natural_key]), name=surrogate_key), upserted
+
+
+# ---------------------------- Sample data ----------------------------
+
+# Rows from warehouse_data.sql: its dimensions are keyed by source codes (C001, P001), the loader's by OLTP ids
+# (DIMENSIONS), and its facts have no order_item_id. Loading on top would give every customer/product a second
+# surrogate key and split the facts between them, so a warehouse holds one natural-key domain or the other.
+SAMPLE_ROW_FILTERS = {
+    "fact_sales": "order_item_id IS NULL",
+    "dim_customer": "customer_id !~ '^[0-9]+$'",
+    "dim_product": "product_id !~ '^[0-9]+$'",
+}
+
+def count_sample_rows(dw: Union[Engine, Connection]) -> Dict[str, int]:
+    with transaction(dw) as conn:
+        return {
+            table: int(conn.exec_driver_sql(f"SELECT COUNT(*) FROM {table} WHERE {where}").scalar())
+            for table, where in SAMPLE_ROW_FILTERS.items()
+        }
+
+def remove_sample_data(dw: Union[Engine, Connection], logger: logging.Logger) -> Dict[str, int]:
+    """
+    Delete the warehouse_data.sql rows (facts first, then the dimension rows keyed by source codes, plus
+    any etl_key_map pairs recorded for them). The aggregates must be rebuilt afterwards.
+    """
+    removed = {}
+    with transaction(dw) as conn:
+        removed["fact_sales"] = conn.exec_driver_sql(f"""
+            DELETE FROM fact_sales f
+            WHERE {SAMPLE_ROW_FILTERS['fact_sales']}
+               OR f.customer_key IN (SELECT customer_key FROM dim_customer WHERE {SAMPLE_ROW_FILTERS['dim_customer']})
+               OR f.product_key IN (SELECT product_key FROM dim_product WHERE {SAMPLE_ROW_FILTERS['dim_product']})
+        """).rowcount
+        for table in ("dim_customer", "dim_product"):
+            removed[table] = conn.exec_driver_sql(f"DELETE FROM {table} WHERE {SAMPLE_ROW_FILTERS[table]}").rowcount
+        if conn.exec_driver_sql("SELECT to_regclass('etl_key_map') IS NOT NULL").scalar():
+            conn.execute(text("""
+                DELETE FROM etl_key_map
+                WHERE namespace IN ('dim_customer', 'dim_product') AND source_key !~ '^[0-9]+$'
+            """))
+    logger.warning(f"Removed warehouse_data.sql sample rows: {removed}.")
+    return removed
+
+
+# ---------------------------- Load: Date dimension ----------------------------
+
+def build_date_dimension(start, end) -> pd.DataFrame:
+    """Every dim_date row from start to end (inclusive), built in one vectorized pass."""
+    return build_date_rows(pd.date_range(pd.Timestamp(start), pd.Timestamp(end), freq="D"))
+
+def load_date_range(conn: Connection, start, end, batch_size: int = 10000) -> int:
+    """Bulk-load dim_date for [start, end]; dates already present are left as is. Returns rows added."""
+    rows = build_date_dimension(start, end)
+    if rows.empty:
+        return 0
+    conn.exec_driver_sql(
+        "CREATE TEMP TABLE stg_dim_date ON COMMIT DROP AS SELECT * FROM dim_date WITH NO DATA"
+    )
+    copy_frame_to_table(conn, rows, "stg_dim_date", list(rows.columns), batch_size)
+    res = conn.exec_driver_sql(
+        "INSERT INTO dim_date SELECT * FROM stg_dim_date ON CONFLICT (date_key) DO NOTHING"
+    )
+    conn.exec_driver_sql("DROP TABLE stg_dim_date")
+    return res.rowcount
+
+def extend_dim_date(dw: Union[Engine, Connection], start, end, logger: logging.Logger,
+                    batch_size: int = 10000) -> int:
+    """
+    Make dim_date a gap-free calendar covering [start, end] and everything it already spans.
+    A no-op (one query) when it already does. Returns rows added.
+    """
+    with transaction(dw) as conn:
+        lo, hi, days = conn.exec_driver_sql("SELECT MIN(full_date), MAX(full_date), COUNT(*) FROM dim_date").one()
+        want_lo = min(d for d in (lo, pd.Timestamp(start).date()) if d is not None)
+        want_hi = max(d for d in (hi, pd.Timestamp(end).date()) if d is not None)
+        if (lo, hi) == (want_lo, want_hi) and days == (hi - lo).days + 1:
+            return 0
+        added = load_date_range(conn, want_lo, want_hi, batch_size)
+
+    logger.info(f"dim_date: extended to {want_lo} .. {want_hi} ({added} dates added).")
+    return added
+
+
+# ---------------------------- Load: Facts ----------------------------
+
+def fact_watermark(dw: Union[Engine, Connection]) -> int:
+    """Highest order_item_id loaded so far, including partitions that were archived."""
+    with transaction(dw) as conn:
+        return int(conn.exec_driver_sql("""
+            SELECT GREATEST(
+                (SELECT COALESCE(MAX(order_item_id), 0) FROM fact_sales),
+                (SELECT COALESCE(MAX(max_order_item_id), 0) FROM fact_sales_archive_log)
+            )
+        """).scalar())
+
+def source_high_water_mark(oltp: Engine, logger: logging.Logger, settle_timeout: float = 60.0) -> Optional[int]:
+    """
+    Highest order_item_id such that every line item at or below it is committed (or rolled back).
+    Identity values are handed out before commit, so concurrent writers (e.g. the sharded sales load)
+    can commit id 200 while id 150 is still in flight; a watermark past 150 would skip it for good.
+    MAX(order_item_id) is read first, then this waits until every transaction that had an xid at that
+    moment has finished (pg_current_snapshot, PostgreSQL 13+); ids handed out later are all higher.
+    Returns None if they are still running after settle_timeout seconds (defer the facts to the next run).
+    """
+    with transaction(oltp) as conn:
+        upto_id = int(conn.exec_driver_sql("SELECT COALESCE(MAX(order_item_id), 0) FROM order_items").scalar())
+        horizon = int(conn.exec_driver_sql("SELECT pg_snapshot_xmax(pg_current_snapshot())::text::bigint").scalar())
+    deadline = time.perf_counter() + settle_timeout
+    while True:
+        with transaction(oltp) as conn:
+            oldest = int(conn.exec_driver_sql("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint").scalar())
+        if oldest >= horizon:
+            return upto_id
+        if time.perf_counter() >= deadline:
+            logger.warning(
+                f"OLTP transactions older than xid {horizon} still running after {settle_timeout:.0f}s; "
+                f"new facts are deferred to the next refresh."
+            )
+            return None
+        time.sleep(0.5)
+
+ORDER_ITEMS_QUERY = """
+    SELECT oi.order_item_id, o.order_date, o.customer_id::text AS customer_id,
+           oi.product_id::text AS product_id, oi.quantity, oi.unit_price, oi.subtotal
+    FROM order_items oi
+    JOIN orders o ON o.order_id = oi.order_id
+"""
+
+def extract_order_items(conn: Connection, after_id: int, upto_id: int, limit: int) -> pd.DataFrame:
+    """Next keyset batch of line items (order_item_id in (after_id, upto_id]) joined to their order."""
+    return copy_query_to_frame(conn, f"""
+        {ORDER_ITEMS_QUERY}
+        WHERE oi.order_item_id > {int(after_id)} AND oi.order_item_id <= {int(upto_id)}
+        ORDER BY oi.order_item_id
+        LIMIT {int(limit)}
+    """, dtype={"customer_id": str, "product_id": str, "order_date": str})
+
+def extract_order_items_by_id(conn: Connection, ids: List[int]) -> pd.DataFrame:
+    """The given line items joined to their order (ids that no longer exist are simply absent)."""
+    return copy_query_to_frame(conn, f"""
+        {ORDER_ITEMS_QUERY}
+        WHERE oi.order_item_id IN ({', '.join(str(int(i)) for i in ids)})
+        ORDER BY oi.order_item_id
+    """, dtype={"customer_id": str, "product_id": str, "order_date": str})
+
+def build_fact_rows(items: pd.DataFrame, customer_keys: Union[pd.Series, KeyIndex],
+                    product_keys: Union[pd.Series, KeyIndex]) -> pd.DataFrame:
+    """Resolve surrogate keys and measures for a batch of line items (unmapped rows get -1 keys)."""
+    return pd.DataFrame({
+        "date_key": items["order_date"].str.replace("-", "", regex=False).astype("int64").to_numpy(),
+        "product_key": lookup_keys(product_keys, items["product_id"]),
+        "customer_key": lookup_keys(customer_keys, items["customer_id"]),
+        "quantity_sold": items["quantity"].to_numpy(),
+        "unit_price": items["unit_price"].to_numpy(),
+        "discount_amount": 0,
+        "total_amount": items["subtotal"].to_numpy(),
+        "order_item_id": items["order_item_id"].to_numpy(),
+    })
+
+def source_date_range(oltp: Union[Engine, Connection], after_id: int, upto_id: int):
+    """(min, max) order_date of the line items in (after_id, upto_id]; (None, None) if there are none."""
+    with transaction(oltp) as conn:
+        return tuple(conn.exec_driver_sql(f"""
+            SELECT MIN(o.order_date), MAX(o.order_date)
+            FROM order_items oi
+            JOIN orders o ON o.order_id = oi.order_id
+            WHERE oi.order_item_id > {int(after_id)} AND oi.order_item_id <= {int(upto_id)}
+        """).one())
+
+def split_unmapped(facts: pd.DataFrame, logger: logging.Logger, stats: WarehouseLoadStats) -> Tuple[pd.DataFrame, List[int]]:
+    """(facts whose customer and product resolved, order_item_ids of the rest)."""
+    unmapped = (facts["product_key"] == -1) | (facts["customer_key"] == -1)
+    if not unmapped.any():
+        return facts, []
+    logger.warning(
+        f"Deferring {int(unmapped.sum())} line items with no customer/product in the dimensions "
+        f"(e.g. order_item_id {facts.loc[unmapped, 'order_item_id'].iloc[0]}); retried on the next refresh."
+    )
+    stats.facts_skipped_unmapped += int(unmapped.sum())
+    return facts[~unmapped], [int(i) for i in facts.loc[unmapped, "order_item_id"]]
+
+# update_aggregates filter for the rows the last append_facts call inserted
+STAGED_FACTS = "(f.order_item_id, f.date_key) IN (SELECT order_item_id, date_key FROM stg_fact_sales)"
+
+def append_facts(conn: Connection, facts: pd.DataFrame, logger: logging.Logger, stats: WarehouseLoadStats,
+                 copy_batch_size: int = 10000) -> int:
+    """
+    COPY facts into stg_fact_sales, drop the ones whose order_item_id is already in fact_sales and
+    insert the rest. uq_fact_sales_order_item_id has to include the partition key, so it only rejects
+    a line item loaded again under the same date_key; the anti-join covers the batch's date range
+    (the target partitions). stg_fact_sales keeps exactly the inserted rows until commit, for
+    update_aggregates(conn, STAGED_FACTS). Returns the number of rows inserted.
+    """
+    conn.exec_driver_sql(
+        f"CREATE TEMP TABLE IF NOT EXISTS stg_fact_sales ON COMMIT DROP AS "
+        f"SELECT {', '.join(FACT_COLUMNS)} FROM fact_sales WITH NO DATA"
+    )
+    conn.exec_driver_sql("TRUNCATE stg_fact_sales")
+    if facts.empty:
+        return 0
+    copy_frame_to_table(conn, facts, "stg_fact_sales", FACT_COLUMNS, copy_batch_size)
+    duplicates = conn.execute(text("""
+        DELETE FROM stg_fact_sales s
+        USING fact_sales f
+        WHERE f.order_item_id = s.order_item_id AND f.date_key BETWEEN :lo AND :hi
+    """), {"lo": int(facts["date_key"].min()), "hi": int(facts["date_key"].max())}).rowcount
+    if duplicates:
+        logger.warning(f"Skipped {duplicates} line items already in fact_sales.")
+        stats.facts_skipped_duplicate += duplicates
+    return conn.exec_driver_sql(
+        f"INSERT INTO fact_sales ({', '.join(FACT_COLUMNS)}) SELECT {', '.join(FACT_COLUMNS)} FROM stg_fact_sales"
+    ).rowcount
+
+def record_unmapped(conn: Connection, ids: List[int]):
+    if ids:
+        conn.execute(text("""
+            INSERT INTO fact_sales_unmapped (order_item_id)
+            SELECT unnest(CAST(:ids AS INT[]))
+            ON CONFLICT (order_item_id) DO NOTHING
+        """), {"ids": ids})
+
+def fetch_unmapped_items(oltp: Union[Engine, Connection], dw: Union[Engine, Connection]) -> pd.DataFrame:
+    """Line items in fact_sales_unmapped, re-read from the OLTP database."""
+    with transaction(dw) as conn:
+        ids = [int(i) for i in conn.exec_driver_sql("SELECT order_item_id FROM fact_sales_unmapped").scalars()]
+    if not ids:
+        return pd.DataFrame()
+    with transaction(oltp) as conn:
+        return extract_order_items_by_id(conn, ids)
+
+def retry_unmapped_facts(dw: Engine, items: pd.DataFrame, customer_keys: Union[pd.Series, KeyIndex],
+                         product_keys: Union[pd.Series, KeyIndex], logger: logging.Logger,
+                         stats: WarehouseLoadStats, copy_batch_size: int = 10000):
+    """
+    Load the previously unmapped line items (fetch_unmapped_items) that resolve now; they leave
+    fact_sales_unmapped in the same transaction. Items deleted from the OLTP database are dropped from it.
+    """
+    with transaction(dw) as conn:
+        pending = [int(i) for i in conn.exec_driver_sql("SELECT order_item_id FROM fact_sales_unmapped").scalars()]
+        if not pending:
+            return
+        facts = build_fact_rows(items, customer_keys, product_keys) if not items.empty else pd.DataFrame(columns=FACT_COLUMNS)
+        resolved = (facts["product_key"] != -1) & (facts["customer_key"] != -1)
+        still_unmapped = [int(i) for i in facts.loc[~resolved, "order_item_id"]]
+        facts = facts[resolved]
+        loaded = append_facts(conn, facts, logger, stats, copy_batch_size)
+        if loaded:
+            update_aggregates(conn, STAGED_FACTS)
+        conn.execute(text("""
+            DELETE FROM fact_sales_unmapped WHERE NOT (order_item_id = ANY(CAST(:keep AS INT[])))
+        """), {"keep": still_unmapped})
+    stats.facts_retried += loaded
+    stats.facts_loaded += loaded
+    logger.info(f"Retried {len(pending)} unmapped line items: {loaded} loaded, {len(still_unmapped)} still unmapped.")
+
+def load_facts(oltp: Engine, dw: Engine, customer_keys: Union[pd.Series, KeyIndex], product_keys: Union[pd.Series, KeyIndex],
+               after_id: int, upto_id: int, logger: logging.Logger, stats: WarehouseLoadStats,
+               fact_batch_size: int = 500000, copy_batch_size: int = 10000):
+    """
+    Append line items with order_item_id in (after_id, upto_id] to fact_sales.
+    Each batch is one COPY + anti-join insert (append_facts) plus its aggregate deltas, committed on its own, so an interrupted
+    refresh resumes from the last committed batch. dim_date must already cover the batch dates
+    (extend_dim_date).
+    """
+    while after_id < upto_id:
+        with transaction(oltp) as conn:
+            items = extract_order_items(conn, after_id, upto_id, fact_batch_size)
+        if items.empty:
+            break
+        facts = build_fact_rows(items, customer_keys, product_keys)
+
+        facts, unmapped_ids = split_unmapped(facts, logger, stats)
+
+        last_id = int(items["order_item_id"].iloc[-1])
+        with transaction(dw) as conn:
+            loaded = append_facts(conn, facts, logger, stats, copy_batch_size)
+            stats.facts_loaded += loaded
+            record_unmapped(conn, unmapped_ids)
+            update_aggregates(conn, STAGED_FACTS)
+
+        stats.batches += 1
+        after_id = last_id
+        logger.info(f"Batch {stats.batches}: {loaded} facts appended (through order_item_id {after_id}).")
+
+
+# ---------------------------- Fact partitions ----------------------------
+
+PARTITION_NAME_RE = re.compile(r"^fact_sales_(\d{4})_(\d{2})$")
+
+def fact_sales_is_partitioned(conn: Connection) -> bool:
+    return conn.exec_driver_sql("SELECT relkind FROM pg_class WHERE oid = 'fact_sales'::regclass").scalar() == "p"
+
+def ensure_fact_partitions(dw: Union[Engine, Connection], start, end, logger: logging.Logger) -> int:
+    """
+    Create the missing monthly fact_sales partitions for [start, end] (ensure_fact_sales_partitions()
+    in warehouse_schema.sql). A no-op on an unpartitioned fact_sales. Returns partitions created.
+    """
+    with transaction(dw) as conn:
+        if not fact_sales_is_partitioned(conn):
+            return 0
+        created = conn.execute(
+            text("SELECT ensure_fact_sales_partitions(:start, :end)"),
+            {"start": pd.Timestamp(start).date(), "end": pd.Timestamp(end).date()},
+        ).scalar()
+    if created:
+        logger.info(f"fact_sales: created {created} monthly partitions for {pd.Timestamp(start).date()} .. {pd.Timestamp(end).date()}.")
+    return created
+
+def archive_fact_partitions(dw: Engine, before, logger: logging.Logger, archive_schema: str = "archive") -> List[str]:
+    """
+    Detach every monthly partition that ends on or before the first day of `before`'s month and move
+    it to archive_schema. DETACH ... CONCURRENTLY (PostgreSQL 14+) only takes brief locks and there is
+    no DELETE or table rewrite; the archived table can later be dumped and dropped.
+    Aggregate tables keep their totals for archived months.
+    """
+    cutoff = pd.Timestamp(before).to_period("M").start_time
+    with dw.connect() as conn:
+        names = [r[0] for r in conn.exec_driver_sql(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'fact_sales'::regclass ORDER BY c.relname"
+        )]
+    expired = [
+        n for n in names
+        if (m := PARTITION_NAME_RE.match(n)) and pd.Timestamp(int(m[1]), int(m[2]), 1) < cutoff
+    ]
+
+    # DETACH CONCURRENTLY cannot run inside a transaction block
+    with dw.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"')
+        for name in expired:
+            row_count, max_id = conn.exec_driver_sql(f'SELECT COUNT(*), MAX(order_item_id) FROM "{name}"').one()
+            conn.exec_driver_sql(f'ALTER TABLE fact_sales DETACH PARTITION "{name}" CONCURRENTLY')
+            conn.exec_driver_sql(f'ALTER TABLE "{name}" SET SCHEMA "{archive_schema}"')
+            conn.execute(text("""
+                INSERT INTO fact_sales_archive_log (partition_name, archived_to, row_count, max_order_item_id)
+                VALUES (:name, :to, :rows, :max_id)
+                ON CONFLICT (partition_name) DO UPDATE
+                SET archived_to = EXCLUDED.archived_to, row_count = EXCLUDED.row_count,
+                    max_order_item_id = EXCLUDED.max_order_item_id, archived_at = NOW()
+            """), {"name": name, "to": f"{archive_schema}.{name}", "rows": row_count, "max_id": max_id})
+            logger.info(f"fact_sales: archived partition {name} ({row_count} rows) to {archive_schema}.{name}.")
+    return expired
+
+
+# ---------------------------- Aggregates ----------------------------
+
+AGGREGATES_SQL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "warehouse_aggregates.sql")
+
+# aggregate table -> (grain: column -> expression over fact_sales f JOIN dim_date d, primary key)
+AGGREGATES = {
+    "agg_sales_daily_product": (
+        {"date_key": "f.date_key", "product_key": "f.product_key"},
+        ("date_key", "product_key"),
+    ),
+    "agg_sales_daily_customer": (
+        {"date_key": "f.date_key", "customer_key": "f.customer_key"},
+        ("date_key", "customer_key"),
+    ),
+    "agg_sales_monthly_product": (
+        {"month_key": "d.year * 100 + d.month", "year": "d.year", "quarter": "d.quarter", "month": "d.month",
+         "month_name": "d.month_name", "product_key": "f.product_key"},
+        ("month_key", "product_key"),
+    ),
+    "agg_sales_monthly_customer": (
+        {"month_key": "d.year * 100 + d.month", "year": "d.year", "quarter": "d.quarter", "month": "d.month",
+         "month_name": "d.month_name", "customer_key": "f.customer_key"},
+        ("month_key", "customer_key"),
+    ),
+}
+
+AGGREGATE_MEASURES = {
+    "quantity_sold": "SUM(f.quantity_sold)",
+    "discount_amount": "SUM(f.discount_amount)",
+    "total_amount": "SUM(f.total_amount)",
+    "line_count": "COUNT(*)",
+}
+
+def ensure_aggregate_tables(dw: Union[Engine, Connection]):
+    with transaction(dw) as conn:
+        with open(AGGREGATES_SQL_PATH, encoding="utf-8") as f:
+            conn.exec_driver_sql(f.read())
+
+def update_aggregates(conn: Connection, fact_filter: str = "TRUE"):
+    """
+    Add the facts matching fact_filter to every aggregate table: one grouped
+    INSERT ... ON CONFLICT DO UPDATE (measure += delta) per table.
+    """
+    for table, (grain, key) in AGGREGATES.items():
+        columns = list(grain) + list(AGGREGATE_MEASURES)
+        conn.exec_driver_sql(f"""
+            INSERT INTO {table} ({', '.join(columns)})
+            SELECT {', '.join(list(grain.values()) + list(AGGREGATE_MEASURES.values()))}
+            FROM fact_sales f
+            JOIN dim_date d ON d.date_key = f.date_key
+            WHERE {fact_filter}
+            GROUP BY {', '.join(grain.values())}
+            ON CONFLICT ({', '.join(key)}) DO UPDATE
+            SET {', '.join(f'{m} = {table}.{m} + EXCLUDED.{m}' for m in AGGREGATE_MEASURES)}
+        """)
+
+def rebuild_aggregates(dw: Union[Engine, Connection], logger: logging.Logger):
+    """Recompute every aggregate table from all of fact_sales (first use, or facts loaded outside the loader)."""
+    start = time.perf_counter()
+    with transaction(dw) as conn:
+        conn.exec_driver_sql(f"TRUNCATE {', '.join(AGGREGATES)}")
+        update_aggregates(conn)
+    logger.info(f"Aggregates rebuilt from fact_sales in {time.perf_counter() - start:.2f}s.")
+
+def aggregates_need_rebuild(dw: Union[Engine, Connection]) -> bool:
+    """True when fact_sales has rows but the aggregates were never filled."""
+    with transaction(dw) as conn:
+        return bool(conn.exec_driver_sql(
+            "SELECT EXISTS (SELECT 1 FROM fact_sales) AND NOT EXISTS (SELECT 1 FROM agg_sales_daily_product)"
+        ).scalar())
+
+
+# ---------------------------- Main ----------------------------
+
+def refresh_warehouse(oltp: Engine, dw: Engine, logger: logging.Logger,
+                      fact_batch_size: int = 500000, copy_batch_size: int = 10000,
+                      date_range: Tuple[Optional[str], Optional[str]] = (None, None),
+                      rebuild_aggregates_first: bool = False, archive_before: Optional[str] = None,
+                      archive_schema: str = "archive", key_maps: Optional[KeyMapStore] = None,
+                      settle_timeout: float = 60.0, replace_sample: bool = False) -> WarehouseLoadStats:
+    """
+    replace_sample: delete the warehouse_data.sql sample rows first (remove_sample_data); without it a
+    warehouse that holds them is refused, since its natural keys are not OLTP ids.
+    """
+    stats = WarehouseLoadStats()
+    ensure_warehouse_keys(dw)
+    if key_maps is not None:
+        ensure_key_map_table(dw)
+    ensure_aggregate_tables(dw)
+    sample = count_sample_rows(dw)
+    if any(sample.values()):
+        if not replace_sample:
+            raise ValueError(
+                f"The warehouse holds warehouse_data.sql sample rows {sample}, keyed by source codes instead of "
+                "OLTP ids; loading on top of them would give each customer/product a second key. Load into a "
+                "warehouse without the sample, or set WAREHOUSE_REPLACE_SAMPLE=1 to delete it first."
+            )
+        stats.sample_rows_removed = sum(remove_sample_data(dw, logger).values())
+        rebuild_aggregates_first = True
+    if rebuild_aggregates_first or aggregates_need_rebuild(dw):
+        rebuild_aggregates(dw, logger)
+        stats.aggregates_rebuilt = True
+
+    # Settle the source high-water mark before the dimension snapshot: once every transaction that could
+    # hold an id up to it has finished, those line items (and the customers/products they reference)
+    # are all committed, so the snapshot below resolves them.
+    after_id = fact_watermark(dw)
+    upto_id = source_high_water_mark(oltp, logger, settle_timeout)
+    upto_id = after_id if upto_id is None else max(upto_id, after_id)
+
+    customer_keys, stats.customers_upserted = refresh_dimension(oltp, dw, "dim_customer", logger, copy_batch_size, key_maps)
+    product_keys, stats.products_upserted = refresh_dimension(oltp, dw, "dim_product", logger, copy_batch_size, key_maps)
+
+    logger.info(f"fact_sales watermark: order_item_id {after_id}; source high-water mark {upto_id}.")
+    unmapped_items = fetch_unmapped_items(oltp, dw)
+
+    # One dim_date extension up front for the whole refresh (plus any explicitly requested range)
+    retry_dates = (unmapped_items["order_date"].min(), unmapped_items["order_date"].max()) if not unmapped_items.empty else ()
+    bounds = [pd.Timestamp(d) for d in (*date_range, *source_date_range(oltp, after_id, upto_id), *retry_dates) if d is not None]
+    if bounds:
+        stats.dates_added = extend_dim_date(dw, min(bounds), max(bounds), logger, copy_batch_size)
+        stats.partitions_created = ensure_fact_partitions(dw, min(bounds), max(bounds), logger)
+
+    retry_unmapped_facts(dw, unmapped_items, customer_keys, product_keys, logger, stats, copy_batch_size)
+    load_facts(oltp, dw, customer_keys, product_keys, after_id, upto_id, logger, stats,
+               fact_batch_size, copy_batch_size)
+
+    if archive_before:
+        stats.partitions_archived = len(archive_fact_partitions(dw, archive_before, logger, archive_schema))
+    return stats
+
+def main():
+    load_dotenv()
+
+    oltp_url = os.getenv("DB_URL", "").strip()
+    dw_url = os.getenv("DW_DB_URL", "").strip() or oltp_url
+    log_path = os.getenv("LOG_PATH", "./etl.log").strip()
+    fact_batch_size = int(os.getenv("WAREHOUSE_BATCH_SIZE", "500000"))
+    copy_batch_size = int(os.getenv("LOAD_BATCH_SIZE", "10000"))
+    date_range = (os.getenv("DIM_DATE_START", "").strip() or None, os.getenv("DIM_DATE_END", "").strip() or None)
+    agg_rebuild = os.getenv("AGG_REBUILD", "0").strip().lower() in ("1", "true", "yes")
+    archive_before = os.getenv("FACT_ARCHIVE_BEFORE", "").strip() or None
+    archive_schema = os.getenv("ARCHIVE_SCHEMA", "archive").strip()
+    key_map_dir = os.getenv("KEY_MAP_DIR", "").strip()
+    settle_timeout = float(os.getenv("WAREHOUSE_SETTLE_TIMEOUT", "60"))
+    replace_sample = os.getenv("WAREHOUSE_REPLACE_SAMPLE", "0").strip().lower() in ("1", "true", "yes")
+
+    logger = setup_logger(log_path)
+
+    if not oltp_url:
+        raise ValueError("DB_URL is missing in .env")
+
+    try:
+        start = time.perf_counter()
+        stats = refresh_warehouse(get_engine(oltp_url), get_engine(dw_url), logger,
+                                  fact_batch_size, copy_batch_size, date_range, agg_rebuild,
+                                  archive_before, archive_schema,
+                                  KeyMapStore(key_map_dir) if key_map_dir else None, settle_timeout, replace_sample)
+        logger.info(
+            f"Warehouse refresh done in {time.perf_counter() - start:.2f}s: "
+            f"{stats.facts_loaded} facts appended in {stats.batches} batches, "
+            f"{stats.facts_skipped_unmapped} deferred (unmapped), {stats.facts_retried} loaded on retry, "
+            f"{stats.facts_skipped_duplicate} skipped (already loaded), "
+            f"{stats.dates_added} dates added, "
+            f"{stats.customers_upserted} customers / {stats.products_upserted} products inserted or updated, "
+            f"{stats.partitions_created} partitions created, {stats.partitions_archived} archived, "
+            f"{stats.sample_rows_removed} sample rows removed."
+        )
+    except (SQLAlchemyError, ValueError) as e:
+        logger.exception(f"Warehouse load failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Flexi Mart - Part 3 columnar snapshot of the warehouse (Parquet + pyarrow)
+
+export: writes the dimensions and fact_sales from the PostgreSQL warehouse to Parquet
+  <out>/dim_date.parquet, dim_product.parquet, dim_customer.parquet   (full snapshot each run)
+  <out>/fact_sales/year=YYYY/month=MM/part-0.parquet                  (hive-partitioned by month)
+  Only months whose row count / max sale_key changed since the last export are rewritten
+  (tracked in <out>/_manifest.json); months archived out of the warehouse keep their files.
+
+query: WarehouseSnapshot runs the analytics_queries.sql workloads (Year->Quarter->Month drill-down,
+  top-N products with revenue share, customer segmentation) in-process with pyarrow compute,
+  so heavy analytical reads never touch the warehouse database.
+
+Usage (from project root; DW_DB_URL in .env for export):
+    python part3-datawarehouse/warehouse_parquet.py export [--out ./data/warehouse_parquet]
+    python part3-datawarehouse/warehouse_parquet.py query  [--out ./data/warehouse_parquet] [--year 2024]
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+from sqlalchemy.engine import Connection, Engine
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "part1-database-etl"))
+
+from etl_pipeline import SQL_STATS, get_engine, setup_logger, transaction  # noqa: E402
+
+MONEY = pa.decimal128(14, 2)
+
+# table -> (SELECT list, arrow column types)
+SNAPSHOT_TABLES = {
+    "dim_date": (
+        "date_key, full_date, day_of_week, day_of_month, month, month_name, quarter, year, is_weekend",
+        {"date_key": pa.int32(), "full_date": pa.date32(), "day_of_week": pa.string(), "day_of_month": pa.int8(),
+         "month": pa.int8(), "month_name": pa.string(), "quarter": pa.string(), "year": pa.int16(),
+         "is_weekend": pa.bool_()},
+    ),
+    "dim_product": (
+        "product_key, product_id, product_name, category, subcategory, unit_price",
+        {"product_key": pa.int32(), "product_id": pa.string(), "product_name": pa.string(),
+         "category": pa.string(), "subcategory": pa.string(), "unit_price": MONEY},
+    ),
+    "dim_customer": (
+        "customer_key, customer_id, customer_name, city, state, customer_segment",
+        {"customer_key": pa.int32(), "customer_id": pa.string(), "customer_name": pa.string(),
+         "city": pa.string(), "state": pa.string(), "customer_segment": pa.string()},
+    ),
+    "fact_sales": (
+        "sale_key, date_key, product_key, customer_key, quantity_sold, unit_price, discount_amount, "
+        "total_amount, order_item_id",
+        {"sale_key": pa.int32(), "date_key": pa.int32(), "product_key": pa.int32(), "customer_key": pa.int32(),
+         "quantity_sold": pa.int32(), "unit_price": MONEY, "discount_amount": MONEY, "total_amount": MONEY,
+         "order_item_id": pa.int32()},
+    ),
+}
+
+
+# ---------------------------- Export ----------------------------
+
+def copy_query_to_arrow(conn: Connection, query: str, column_types: Dict[str, pa.DataType]) -> pa.Table:
+    """Run a SELECT through COPY ... TO STDOUT (CSV) and parse it straight into a typed Arrow table."""
+    buf = io.BytesIO()
+    cur = conn.connection.cursor()
+    start = time.perf_counter()
+    try:
+        cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", buf)
+    finally:
+        cur.close()
+        SQL_STATS.record(time.perf_counter() - start)
+    buf.seek(0)
+    return pa_csv.read_csv(buf, convert_options=pa_csv.ConvertOptions(
+        column_types=column_types,
+        true_values=["t"], false_values=["f"],
+        strings_can_be_null=True, quoted_strings_can_be_null=False,  # NULL -> null, '' stays ''
+    ))
+
+def write_parquet_atomic(table: pa.Table, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)
+
+def load_manifest(out_dir: str) -> dict:
+    path = os.path.join(out_dir, "_manifest.json")
+    if not os.path.exists(path):
+        return {"fact_sales": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def export_warehouse(dw: Engine, out_dir: str, logger: logging.Logger) -> dict:
+    """Write the Parquet snapshot. Returns the updated manifest."""
+    manifest = load_manifest(out_dir)
+    exported_months = manifest["fact_sales"]
+
+    with transaction(dw) as conn:
+        for table in ("dim_date", "dim_product", "dim_customer"):
+            columns, types = SNAPSHOT_TABLES[table]
+            data = copy_query_to_arrow(conn, f"SELECT {columns} FROM {table}", types)
+            write_parquet_atomic(data, os.path.join(out_dir, f"{table}.parquet"))
+            logger.info(f"{table}: {data.num_rows} rows exported.")
+
+        # one pass for per-month change detection; a month is rewritten only if it changed
+        months = {
+            str(ym): {"rows": int(rows), "max_sale_key": int(max_key)}
+            for ym, rows, max_key in conn.exec_driver_sql(
+                "SELECT date_key / 100, COUNT(*), MAX(sale_key) FROM fact_sales GROUP BY 1"
+            )
+        }
+        columns, types = SNAPSHOT_TABLES["fact_sales"]
+        rewritten = 0
+        for ym, state in sorted(months.items()):
+            if exported_months.get(ym) == state:
+                continue
+            data = copy_query_to_arrow(
+                conn,
+                f"SELECT {columns} FROM fact_sales "
+                f"WHERE date_key >= {int(ym) * 100} AND date_key < {int(ym) * 100 + 100} ORDER BY sale_key",
+                types,
+            )
+            write_parquet_atomic(data, os.path.join(
+                out_dir, "fact_sales", f"year={ym[:4]}", f"month={ym[4:]}", "part-0.parquet"
+            ))
+            exported_months[ym] = state
+            rewritten += 1
+
+    kept = sorted(set(exported_months) - set(months))
+    if kept:
+        logger.info(f"fact_sales: {len(kept)} exported months no longer in the warehouse (archived?) kept as is.")
+    logger.info(f"fact_sales: {rewritten} of {len(months)} months rewritten.")
+
+    manifest["exported_at"] = pd.Timestamp.now().isoformat(timespec="seconds")
+    with open(os.path.join(out_dir, "_manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+# ---------------------------- Query ----------------------------
+
+class WarehouseSnapshot:
+    """The analytics_queries.sql workloads over a Parquet snapshot, with pyarrow compute."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.dim_date = pq.read_table(os.path.join(path, "dim_date.parquet"))
+        self.dim_product = pq.read_table(os.path.join(path, "dim_product.parquet"))
+        self.dim_customer = pq.read_table(os.path.join(path, "dim_customer.parquet"))
+        self.fact_sales = ds.dataset(os.path.join(path, "fact_sales"), format="parquet", partitioning="hive")
+
+    def facts(self, columns, year: Optional[int] = None) -> pa.Table:
+        """Fact columns, reading only the year=... partitions that match."""
+        return self.fact_sales.to_table(
+            columns=columns, filter=(ds.field("year") == year) if year is not None else None
+        )
+
+    def monthly_drilldown(self, year: int = 2024) -> pd.DataFrame:
+        """Query 1: sales by Year -> Quarter -> Month."""
+        f = self.facts(["date_key", "total_amount", "quantity_sold"], year)
+        d = self.dim_date.select(["date_key", "year", "quarter", "month", "month_name"])
+        out = (
+            f.join(d, "date_key", join_type="inner")
+            .group_by(["year", "quarter", "month", "month_name"])
+            .aggregate([("total_amount", "sum"), ("quantity_sold", "sum")])
+            .sort_by([("year", "ascending"), ("quarter", "ascending"), ("month", "ascending")])
+        )
+        return pd.DataFrame({
+            "year": out["year"], "quarter": out["quarter"], "month_name": out["month_name"],
+            "total_sales": out["total_amount_sum"], "total_quantity": out["quantity_sold_sum"],
+        })
+
+    def top_products(self, n: int = 10) -> pd.DataFrame:
+        """Query 2: top-N products by revenue, with units sold and revenue share."""
+        per_key = (
+            self.facts(["product_key", "quantity_sold", "total_amount"])
+            .group_by("product_key")
+            .aggregate([("quantity_sold", "sum"), ("total_amount", "sum")])
+        )
+        out = (
+            per_key.join(self.dim_product.select(["product_key", "product_name", "category"]), "product_key",
+                         join_type="inner")
+            .group_by(["product_name", "category"])
+            .aggregate([("quantity_sold_sum", "sum"), ("total_amount_sum", "sum")])
+        )
+        revenue = out["total_amount_sum_sum"]
+        total = pc.sum(revenue).as_py()
+        share = pc.round(pc.multiply(pc.divide(pc.cast(revenue, pa.float64()), float(total)), 100.0), 2) \
+            if total else pa.nulls(len(revenue), pa.float64())
+        result = pd.DataFrame({
+            "product_name": out["product_name"], "category": out["category"],
+            "units_sold": out["quantity_sold_sum_sum"], "revenue": revenue, "revenue_percentage": share,
+        })
+        return result.sort_values("revenue", ascending=False, kind="mergesort").head(n).reset_index(drop=True)
+
+    def customer_segments(self, high: float = 50000, medium: float = 20000) -> pd.DataFrame:
+        """Query 3: High (> high) / Medium ([medium, high]) / Low value customers by total spend."""
+        spend = (
+            self.facts(["customer_key", "total_amount"])
+            .group_by("customer_key")
+            .aggregate([("total_amount", "sum")])
+            .join(self.dim_customer.select(["customer_key"]), "customer_key", join_type="inner")
+        )
+        spent = pc.cast(spend["total_amount_sum"], pa.float64())
+        segment = pc.case_when(
+            pc.make_struct(pc.greater(spent, high), pc.greater_equal(spent, medium)),
+            "High Value", "Medium Value", "Low Value",
+        )
+        out = (
+            pa.table({"customer_segment": segment, "total_spent": spend["total_amount_sum"], "spent": spent})
+            .group_by("customer_segment")
+            .aggregate([("total_spent", "count"), ("total_spent", "sum"), ("spent", "mean")])
+        )
+        result = pd.DataFrame({
+            "customer_segment": out["customer_segment"],
+            "customer_count": out["total_spent_count"],
+            "total_revenue": out["total_spent_sum"],
+            "avg_revenue_per_customer": pc.round(out["spent_mean"], 2),
+        })
+        order = {"High Value": 1, "Medium Value": 2}
+        return result.sort_values("customer_segment", key=lambda s: s.map(order).fillna(3)).reset_index(drop=True)
+
+
+# ---------------------------- Main ----------------------------
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Parquet snapshot of the Flexi Mart warehouse")
+    parser.add_argument("command", choices=["export", "query"])
+    parser.add_argument("--out", default=os.getenv("PARQUET_DIR", "./data/warehouse_parquet"))
+    parser.add_argument("--year", type=int, default=2024, help="year for the drill-down query")
+    parser.add_argument("--top", type=int, default=10, help="N for the top products query")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        logger = setup_logger(os.getenv("LOG_PATH", "./etl.log").strip())
+        dw_url = os.getenv("DW_DB_URL", "").strip() or os.getenv("DB_URL", "").strip()
+        if not dw_url:
+            raise ValueError("DW_DB_URL is missing in .env")
+        start = time.perf_counter()
+        export_warehouse(get_engine(dw_url), args.out, logger)
+        logger.info(f"Parquet export to {args.out} done in {time.perf_counter() - start:.2f}s.")
+        return
+
+    snapshot = WarehouseSnapshot(args.out)
+    with pd.option_context("display.width", 120, "display.max_columns", 10):
+        print(f"-- Monthly drill-down ({args.year})\n{snapshot.monthly_drilldown(args.year)}\n")
+        print(f"-- Top {args.top} products\n{snapshot.top_products(args.top)}\n")
+        print(f"-- Customer segments\n{snapshot.customer_segments()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -30,8 +30,11 @@ CREATE TABLE dim_customer (
     customer_segment VARCHAR(20)
 );
 
+-- Range-partitioned by month on date_key (YYYYMMDD): partition fact_sales_YYYY_MM holds
+-- [YYYYMM01, next month's YYYYMM01). Date-filtered queries on date_key only scan matching months,
+-- and old months can be detached/archived instead of DELETEd (warehouse_loader.py, FACT_ARCHIVE_BEFORE).
 CREATE TABLE fact_sales (
-    sale_key INT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    sale_key INT GENERATED ALWAYS AS IDENTITY,
     date_key INT NOT NULL,
     product_key INT NOT NULL,
     customer_key INT NOT NULL,
@@ -39,15 +42,66 @@ CREATE TABLE fact_sales (
     unit_price NUMERIC(10,2) NOT NULL,
     discount_amount NUMERIC(10,2) DEFAULT 0,
     total_amount NUMERIC(10,2) NOT NULL,
+    order_item_id INT,  -- source line item (OLTP order_items); NULL for hand-loaded sample rows
+    CONSTRAINT pk_fact_sales
+        PRIMARY KEY (sale_key, date_key),  -- must include the partition key
     CONSTRAINT fk_fact_sales_date
         FOREIGN KEY (date_key) REFERENCES dim_date(date_key),
     CONSTRAINT fk_fact_sales_product
         FOREIGN KEY (product_key) REFERENCES dim_product(product_key),
     CONSTRAINT fk_fact_sales_customer
         FOREIGN KEY (customer_key) REFERENCES dim_customer(customer_key)
-);
+) PARTITION BY RANGE (date_key);
+
+-- Creates the monthly partitions covering [from_date, to_date] that do not exist yet; returns how many.
+-- warehouse_loader.py calls it before each refresh for the order dates it is about to load.
+CREATE OR REPLACE FUNCTION ensure_fact_sales_partitions(from_date DATE, to_date DATE)
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    m DATE;
+    part TEXT;
+    created INT := 0;
+BEGIN
+    FOR m IN
+        SELECT generate_series(date_trunc('month', from_date), date_trunc('month', to_date), INTERVAL '1 month')::DATE
+    LOOP
+        part := 'fact_sales_' || TO_CHAR(m, 'YYYY_MM');
+        IF to_regclass(part) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF fact_sales FOR VALUES FROM (%s) TO (%s)',
+                part, TO_CHAR(m, 'YYYYMMDD'), TO_CHAR(m + INTERVAL '1 month', 'YYYYMMDD')
+            );
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+
+-- partitions for the sample data year (warehouse_data.sql)
+SELECT ensure_fact_sales_partitions(DATE '2024-01-01', DATE '2024-12-31');
 
---  indexes for faster joins
-CREATE INDEX idx_fact_sales_date_key     ON fact_sales(date_key);
+--  indexes for faster joins (created on every partition)
+-- BRIN on date_key: facts arrive roughly in date order, so a tiny block-range index narrows
+-- day/week ranges inside a month partition
+CREATE INDEX idx_fact_sales_date_key_brin ON fact_sales USING BRIN (date_key);
 CREATE INDEX idx_fact_sales_product_key  ON fact_sales(product_key);
 CREATE INDEX idx_fact_sales_customer_key ON fact_sales(customer_key);
+
+-- natural keys / load watermark used by warehouse_loader.py
+CREATE UNIQUE INDEX uq_dim_customer_customer_id ON dim_customer(customer_id);
+CREATE UNIQUE INDEX uq_dim_product_product_id   ON dim_product(product_id);
+-- a unique index on a partitioned table must include the partition key, so this only rejects a line
+-- item loaded twice under the same date_key; the loader's anti-join keeps one row per order_item_id
+CREATE UNIQUE INDEX uq_fact_sales_order_item_id ON fact_sales(order_item_id, date_key);
+
+-- partitions detached by warehouse_loader.py (FACT_ARCHIVE_BEFORE); keeps the load watermark
+CREATE TABLE fact_sales_archive_log (
+    partition_name VARCHAR(63) PRIMARY KEY,
+    archived_to VARCHAR(130) NOT NULL,
+    row_count BIGINT NOT NULL,
+    max_order_item_id INT,
+    archived_at TIMESTAMP NOT NULL DEFAULT NOW()
+);